@@ -1,11 +1,17 @@
 """Main entry point for the GhostShell tool."""
 
 import argparse
+import glob
+import os
 import sys
-from typing import Optional
+import time
+from typing import List, Optional
 
-from .core import GeminiModel, Config
-from .utils import FileHandler
+from . import __version__
+from .utils.metrics import metrics
+
+# Start of the run for --profile, as close to interpreter startup as the CLI gets
+_STARTED = time.perf_counter()
 
 
 def create_parser() -> argparse.ArgumentParser:
@@ -20,7 +26,9 @@ Examples:
   %(prog)s /code "create a python script to sort a list"
   %(prog)s /explain "how does git rebase work"
   %(prog)s /summarize -f document.txt
+  %(prog)s /explain "how do these modules fit together" -f src/ -f "tests/*.py"
   %(prog)s /command "install nodejs on ubuntu" -o install_commands.txt
+  journalctl -f | %(prog)s /summarize --rolling 60
         """
     )
     
@@ -38,18 +46,65 @@ Examples:
     
     parser.add_argument(
         "-f", "--file",
-        help="Input file to include in the prompt"
+        action="append",
+        help="Input file, directory or glob to include in the prompt (repeatable)"
+    )
+    
+    parser.add_argument(
+        "--max-file-size",
+        type=int,
+        metavar="BYTES",
+        help="Skip files larger than this found in -f directories and globs (default: 1048576)"
     )
     
     parser.add_argument(
         "-o", "--output",
-        help="Output file to save the response"
+        help="Output file to save the response, written as it streams and replaced atomically"
+    )
+    
+    parser.add_argument(
+        "--code-only",
+        action="store_true",
+        help="With -o, write only the contents of the response's code blocks "
+             "(e.g. a runnable script)"
     )
     
     parser.add_argument(
         "-m", "--model",
-        default="gemini-2.5-flash",
-        help="AI model to use (default: gemini-2.5-flash)"
+        help="AI model to use, overriding model routing (default: chosen by task and input size)"
+    )
+    
+    parser.add_argument(
+        "--routing",
+        metavar="FILE",
+        help="JSON model routing policy (default: ~/.ghostshell/routing.json, or built-in rules)"
+    )
+    
+    parser.add_argument(
+        "--latency-target",
+        type=float,
+        metavar="SECONDS",
+        help="Prefer routes meant to answer within SECONDS, e.g. with thinking turned off"
+    )
+    
+    parser.add_argument(
+        "--backend",
+        choices=["gemini", "fake"],
+        help="Model backend; 'fake' replays canned responses offline (default: gemini, "
+             "or GHOSTSHELL_BACKEND)"
+    )
+    
+    parser.add_argument(
+        "--local-first",
+        action="store_true",
+        help="For /command, answer from the commands that worked for a near-identical "
+             "earlier prompt and skip the API call; confirmed unless the prompt matches exactly"
+    )
+    
+    parser.add_argument(
+        "--no-suggest",
+        action="store_true",
+        help="Don't show commands from history for similar /command prompts"
     )
     
     parser.add_argument(
@@ -58,6 +113,37 @@ Examples:
         help="Auto-execute commands without prompting (use with caution)"
     )
     
+    parser.add_argument(
+        "--parallel",
+        type=int,
+        default=1,
+        metavar="N",
+        help="Run extracted commands that touch separate files on N workers; the rest run in order"
+    )
+    
+    parser.add_argument(
+        "--pipeline",
+        action="store_true",
+        help="For /command, run each command as soon as its code block is complete, "
+             "while the rest of the response is still streaming"
+    )
+    
+    parser.add_argument(
+        "--cmd-timeout",
+        type=float,
+        default=600,
+        metavar="SECONDS",
+        help="Stop an executed command after this long, 0 for no limit (default: 600)"
+    )
+    
+    parser.add_argument(
+        "--idle-timeout",
+        type=float,
+        default=120,
+        metavar="SECONDS",
+        help="Stop an executed command with no output for this long, 0 for no limit (default: 120)"
+    )
+    
     parser.add_argument(
         "--history",
         type=int,
@@ -65,16 +151,268 @@ Examples:
         help="Show last N command history entries"
     )
     
+    parser.add_argument(
+        "--history-search",
+        metavar="PATTERN",
+        help="Search command history for PATTERN (limit with --history N)"
+    )
+    
     parser.add_argument(
         "--clear-history",
         action="store_true",
         help="Clear command history"
     )
     
+    parser.add_argument(
+        "--session",
+        metavar="NAME",
+        help="Continue the named conversation, stored across runs"
+    )
+    
+    parser.add_argument(
+        "-i", "--interactive",
+        action="store_true",
+        help="Start an interactive prompt that keeps one client and one chat per task "
+             "(type /help inside)"
+    )
+    
+    parser.add_argument(
+        "--session-budget",
+        type=int,
+        metavar="TOKENS",
+        help="Fold older session turns into a summary beyond this size (default: 32000)"
+    )
+    
+    parser.add_argument(
+        "--list-sessions",
+        action="store_true",
+        help="List stored sessions"
+    )
+    
+    parser.add_argument(
+        "--delete-session",
+        metavar="NAME",
+        help="Delete a stored session"
+    )
+    
+    parser.add_argument(
+        "--max-bytes",
+        type=int,
+        metavar="N",
+        help="Stop reading piped input after N bytes (default: 8 MiB, unlimited when summarizing)"
+    )
+    
+    parser.add_argument(
+        "--tail",
+        type=int,
+        metavar="BYTES",
+        help="Keep only the last BYTES of piped input"
+    )
+    
+    parser.add_argument(
+        "--rolling",
+        type=float,
+        metavar="SECONDS",
+        help="Summarize piped input every SECONDS while it streams in (Ctrl-C to finish)"
+    )
+    
+    parser.add_argument(
+        "--stdin",
+        action="store_true",
+        help="Wait for standard input even when a prompt is given (same as a prompt of -)"
+    )
+    
+    parser.add_argument(
+        "--no-stdin",
+        action="store_true",
+        help="Ignore standard input, e.g. inside a `while read` loop, where gsh would "
+             "otherwise consume the lines meant for the loop"
+    )
+    
+    parser.add_argument(
+        "--max-input-tokens",
+        type=int,
+        metavar="N",
+        help="Trim -f content so a request stays within N tokens (default: 200000)"
+    )
+    
+    parser.add_argument(
+        "--trim",
+        metavar="STRATEGIES",
+        help="Comma-separated order of head-tail, drop, collapse and chunk used to fit "
+             "-f content into the budget (default: collapse,head-tail)"
+    )
+    
+    parser.add_argument(
+        "--drop-pattern",
+        metavar="REGEX",
+        help="Drop -f lines matching REGEX when the file is over budget"
+    )
+    
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        metavar="CHARS",
+        help="Summarize files larger than this in concurrent chunks (default: 200000)"
+    )
+    
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=4,
+        metavar="N",
+        help="Maximum concurrent API requests for chunked and batch work (default: 4)"
+    )
+    
+    parser.add_argument(
+        "--rpm",
+        type=float,
+        metavar="N",
+        help="Limit API requests per minute for chunked and batch work"
+    )
+    
+    parser.add_argument(
+        "--tpm",
+        type=float,
+        metavar="N",
+        help="Limit estimated tokens per minute for batch mode"
+    )
+    
+    parser.add_argument(
+        "--compare",
+        metavar="MODELS",
+        help="Send the prompt to these comma-separated models at once and compare "
+             "TTFT, latency, tokens and tokens/s"
+    )
+    
+    parser.add_argument(
+        "--first-wins",
+        action="store_true",
+        help="With --compare, show only the first model to finish and cancel the others"
+    )
+    
+    parser.add_argument(
+        "--batch",
+        metavar="FILE",
+        help="Run a JSONL file of {task, prompt, file, id} records concurrently"
+    )
+    
+    parser.add_argument(
+        "--out",
+        metavar="FILE",
+        default="results.jsonl",
+        help="JSONL results file for --batch; finished records are skipped on rerun"
+    )
+    
+    parser.add_argument(
+        "--retries",
+        type=int,
+        default=2,
+        metavar="N",
+        help="Retries per failed request, before falling back to the next model (default: 2)"
+    )
+    
+    parser.add_argument(
+        "--request-timeout",
+        type=float,
+        metavar="SECONDS",
+        help="Give up on a streamed request after this long, 0 for no limit (default: 300)"
+    )
+    
+    parser.add_argument(
+        "--chunk-timeout",
+        type=float,
+        metavar="SECONDS",
+        help="Retry a stream that goes quiet for longer than this between chunks, "
+             "0 for no limit (default: 60)"
+    )
+    
+    parser.add_argument(
+        "--first-chunk-timeout",
+        type=float,
+        metavar="SECONDS",
+        help="Retry a request whose first chunk takes longer than this "
+             "(default: only --request-timeout applies)"
+    )
+    
+    parser.add_argument(
+        "--hedge-after",
+        type=float,
+        metavar="SECONDS",
+        help="Send a duplicate request if nothing arrived after SECONDS and keep the faster one"
+    )
+    
+    parser.add_argument(
+        "--fallback",
+        metavar="MODELS",
+        help="Comma-separated models to try when retries are exhausted, "
+             "e.g. gemini-2.5-flash-lite (default: GHOSTSHELL_FALLBACK)"
+    )
+    
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Bypass the response cache for this request"
+    )
+    
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="Ignore any cached response and store the fresh one"
+    )
+    
+    parser.add_argument(
+        "--no-context-cache",
+        action="store_true",
+        help="Always send -f content inline instead of caching large repeated files on the server"
+    )
+    
+    parser.add_argument(
+        "--cache-stats",
+        action="store_true",
+        help="Show response cache hit/miss statistics"
+    )
+    
+    parser.add_argument(
+        "--clear-cache",
+        action="store_true",
+        help="Clear the response cache"
+    )
+    
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help="Run a background server that keeps the model client warm"
+    )
+    
+    parser.add_argument(
+        "--stop-daemon",
+        action="store_true",
+        help="Stop a running background server"
+    )
+    
+    parser.add_argument(
+        "--no-daemon",
+        action="store_true",
+        help="Always run requests in-process, even if a daemon is running"
+    )
+    
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Print time spent in each phase, time to first token and throughput"
+    )
+    
+    parser.add_argument(
+        "--metrics-file",
+        metavar="FILE",
+        help="Append run metrics to FILE as one JSON line (default: GHOSTSHELL_METRICS)"
+    )
+    
     parser.add_argument(
         "--version",
         action="version",
-        version="GhostShell {__import__('Ghost_shell').__version__}"
+        version=f"GhostShell {__version__}"
     )
     
     return parser
@@ -105,37 +443,310 @@ def determine_task_type(task_arg: Optional[str]) -> tuple[str, Optional[str]]:
         return "default", task_arg
 
 
+def show_history(limit: Optional[int], pattern: Optional[str] = None) -> None:
+    """
+    Print command history without loading the AI model.
+    
+    Args:
+        limit: Maximum number of entries to show
+        pattern: Only show entries whose command contains this text
+    """
+    from .core.config import Config
+    from .utils.logger import CommandLogger
+    
+    logger = CommandLogger(Config().log_file)
+    if pattern is not None:
+        history = logger.search(pattern, limit or 50)
+        title = f"Command History matching '{pattern}' ({len(history)} entries):"
+    else:
+        history = logger.get_history(limit)
+        title = f"Command History (last {len(history)} entries):"
+    
+    if not history:
+        print("No command history found.")
+        return
+    
+    print(title)
+    for entry in history:
+        print(f"  {entry}")
+
+
+def parse_trim_strategies(value: str) -> List[str]:
+    """
+    Parse a comma-separated list of trim strategies.
+    
+    Args:
+        value: The --trim argument
+        
+    Returns:
+        Strategy names in order
+        
+    Raises:
+        ValueError: If a strategy is unknown
+    """
+    from .utils.context_budget import TRIM_STRATEGIES
+    
+    strategies = [name.strip() for name in value.split(",") if name.strip()]
+    unknown = [name for name in strategies if name not in TRIM_STRATEGIES]
+    if unknown:
+        raise ValueError(
+            f"Unknown trim strategy: {', '.join(unknown)} "
+            f"(choose from {', '.join(TRIM_STRATEGIES)})"
+        )
+    return strategies
+
+
+def manage_sessions(list_sessions: bool, delete_name: Optional[str]) -> None:
+    """
+    List or delete stored sessions without loading the AI model.
+    
+    Args:
+        list_sessions: Whether to print the stored session names
+        delete_name: Session to delete, if any
+    """
+    from .core.config import Config
+    from .core.session import SessionStore
+    
+    store = SessionStore(Config().sessions_dir)
+    if delete_name:
+        if store.delete(delete_name):
+            print(f"✓ Session '{delete_name}' deleted")
+        else:
+            print(f"No session named '{delete_name}'")
+    
+    if list_sessions:
+        names = store.names()
+        if not names:
+            print("No sessions found.")
+            return
+        print("Sessions (most recent first):")
+        for name in names:
+            session = store.load(name)
+            print(f"  {name}: {len(session.turns) // 2} exchanges, ~{session.tokens():,} tokens")
+
+
+def suggest_from_history(args: argparse.Namespace) -> bool:
+    """
+    Show commands that worked for a similar earlier /command prompt.
+    
+    Runs before any heavy imports, so the suggestion appears at once.
+    
+    Args:
+        args: Parsed command line
+        
+    Returns:
+        True if the request was answered locally (--local-first)
+    """
+    task_type, remaining_prompt = determine_task_type(args.task)
+    prompt = " ".join(part for part in (remaining_prompt, args.prompt) if part)
+    if task_type != "command" or not prompt or args.file:
+        return False
+    
+    from .core.config import Config
+    from .utils.suggestions import SuggestionIndex, normalize_prompt
+    
+    config = Config()
+    with metrics.span("suggest"):
+        matches = SuggestionIndex(config.log_file).lookup(prompt, config.suggest_min_score)
+    if not matches:
+        return False
+    
+    match = matches[0]
+    print(f'From history ({match.score:.0%} match for "{match.prompt}"):')
+    # Similar prompts can differ in exactly the detail that matters (a path,
+    # a platform), so only a near-identical one is answered locally
+    if not args.local_first or match.score < config.replay_min_score:
+        for command in match.commands:
+            print(f"  $ {command}")
+        print()
+        return False
+    
+    from .utils import CommandExecutor, CommandLogger
+    
+    executor = CommandExecutor(
+        CommandLogger(config.log_file),
+        timeout=args.cmd_timeout,
+        idle_timeout=args.idle_timeout,
+        parallel=args.parallel
+    )
+    # Without an exact match, ask even with --auto-execute
+    exact = normalize_prompt(prompt) == match.prompt
+    executor.run_commands(match.commands, args.auto_execute and exact, prompt)
+    return True
+
+
+def finish_metrics(profile: bool, metrics_file: Optional[str]) -> None:
+    """
+    Print and export the metrics collected during the run.
+    
+    Args:
+        profile: Whether to print the summary table
+        metrics_file: JSONL file to append the run to, if any
+    """
+    if profile:
+        from rich.console import Console
+        
+        metrics.print_summary(Console(stderr=True))
+    if metrics_file:
+        try:
+            metrics.write_jsonl(metrics_file)
+        except OSError as e:
+            print(f"Warning: Could not write metrics to {metrics_file}: {e}", file=sys.stderr)
+
+
 def main():
     """Main entry point."""
     parser = create_parser()
     args = parser.parse_args()
     
+    metrics_file = args.metrics_file or os.getenv("GHOSTSHELL_METRICS")
+    if args.profile or metrics_file:
+        metrics.enable(_STARTED)
+    
     try:
+        _run(parser, args)
+    finally:
+        if metrics.enabled:
+            finish_metrics(args.profile, metrics_file)
+
+
+def _run(parser: argparse.ArgumentParser, args: argparse.Namespace) -> None:
+    """Dispatch the parsed command line."""
+    try:
+        # History commands only need the logger, so handle them before any
+        # heavy imports or client setup
+        if args.clear_history:
+            from .core.config import Config
+            from .utils.logger import CommandLogger
+            
+            CommandLogger(Config().log_file).clear_history()
+            return
+        
+        if args.history is not None or args.history_search is not None:
+            show_history(args.history, args.history_search)
+            return
+        
+        if args.list_sessions or args.delete_session:
+            manage_sessions(args.list_sessions, args.delete_session)
+            return
+        
+        if not args.no_suggest and not args.interactive and suggest_from_history(args):
+            return
+        
+        with metrics.span("import"):
+            from .core import GeminiModel, Config, GhostShellDaemon, DaemonClient
+            from .utils import FileHandler, StdinReader
+            from .utils.stdin_reader import stdin_is_piped
+        
         # Initialize configuration
-        config = Config()
+        with metrics.span("config"):
+            config = Config()
         if args.model:
             config.set_model(args.model)
+        if args.routing:
+            config.routing_path = args.routing
+        config.latency_target = args.latency_target
+        if args.backend:
+            config.backend = args.backend
+        if args.chunk_size:
+            config.summarize_chunk_chars = args.chunk_size
+        config.summarize_concurrency = args.concurrency
+        config.requests_per_minute = args.rpm
+        config.command_timeout = args.cmd_timeout
+        config.idle_timeout = args.idle_timeout
+        config.parallel_commands = args.parallel
+        config.pipeline_commands = args.pipeline
+        if args.session_budget:
+            config.session_token_budget = args.session_budget
+        if args.max_input_tokens:
+            config.max_input_tokens = args.max_input_tokens
+        if args.trim:
+            config.trim_strategies = parse_trim_strategies(args.trim)
+        config.drop_pattern = args.drop_pattern
+        if args.max_file_size:
+            config.max_file_bytes = args.max_file_size
+        config.stdin_tail_bytes = args.tail
+        config.stdin_rolling_interval = args.rolling
+        config.request_retries = args.retries
+        if args.request_timeout is not None:
+            config.request_timeout = args.request_timeout
+        if args.chunk_timeout is not None:
+            config.chunk_timeout = args.chunk_timeout
+        if args.first_chunk_timeout is not None:
+            config.first_chunk_timeout = args.first_chunk_timeout
+        config.hedge_after = args.hedge_after
+        config.context_cache = not args.no_context_cache
+        if args.fallback:
+            config.fallback_models = [name.strip() for name in args.fallback.split(",") if name.strip()]
+        
+        if args.stop_daemon:
+            client = DaemonClient.connect(config.socket_path)
+            if client is None:
+                print("No GhostShell daemon is running")
+            else:
+                client.shutdown()
+                print("✓ GhostShell daemon stopped")
+            return
         
         # Initialize the AI model
-        model = GeminiModel(config)
+        with metrics.span("model_init"):
+            model = GeminiModel(config)
         
-        # Handle special commands
-        if args.clear_history:
-            model.logger.clear_history()
+        if args.daemon:
+            GhostShellDaemon(model, config.socket_path).serve_forever()
             return
         
-        if args.history is not None:
-            model.show_history(args.history)
+        if args.batch:
+            from .core.batch import BatchRunner
+            
+            counts = BatchRunner(
+                model,
+                concurrency=args.concurrency,
+                requests_per_minute=args.rpm,
+                tokens_per_minute=args.tpm,
+                retries=args.retries,
+                use_cache=not args.no_cache
+            ).run(args.batch, args.out)
+            if counts["failed"]:
+                sys.exit(1)
             return
         
-        # Validate input file if provided
-        if args.file and not FileHandler.validate_file_exists(args.file):
-            print(f"Error: File '{args.file}' not found", file=sys.stderr)
-            sys.exit(1)
+        # Hand requests to a running daemon when there is one; the interactive
+        # prompt is itself long-lived and keeps its chats in-process
+        if not args.no_daemon and not args.interactive:
+            model.remote = DaemonClient.connect(config.socket_path)
+        
+        if args.clear_cache:
+            model.cache.clear()
+            return
+        
+        if args.cache_stats:
+            model.show_cache_stats()
+            return
+        
+        if args.session:
+            model.open_session(args.session)
+        
+        # Validate input files if provided; glob patterns are expanded later
+        for path in args.file or []:
+            if not glob.has_magic(path) and not FileHandler.validate_file_exists(path):
+                print(f"Error: File '{path}' not found", file=sys.stderr)
+                sys.exit(1)
         
         # Determine task type and prompt
         task_type, remaining_prompt = determine_task_type(args.task)
         
+        if args.interactive:
+            from .core.repl import Repl
+            
+            repl = Repl(model, task_type, args.auto_execute, not args.no_cache)
+            repl.attached = list(args.file or [])
+            first = " ".join(part for part in (remaining_prompt, args.prompt) if part)
+            if first:
+                repl.handle(first)
+            repl.run()
+            return
+        
         # Build the full prompt
         prompt_parts = []
         if remaining_prompt:
@@ -143,22 +754,76 @@ def main():
         if args.prompt:
             prompt_parts.append(args.prompt)
         
-        if not prompt_parts:
+        # A prompt of - asks for standard input like --stdin
+        wait_for_stdin = args.stdin or "-" in prompt_parts
+        prompt_parts = [part for part in prompt_parts if part != "-"]
+        
+        stdin = None
+        if not args.no_stdin and (wait_for_stdin or stdin_is_piped()):
+            stdin = StdinReader(max_bytes=args.max_bytes)
+            # Input is waited for only when it is needed; with a prompt, an
+            # open pipe that nobody writes to must not hang the request
+            needed = (
+                wait_for_stdin or not prompt_parts or args.tail is not None or args.rolling
+            )
+            if not needed and not stdin.ready(config.stdin_probe_seconds):
+                print(
+                    "Warning: Standard input sent nothing and was ignored; "
+                    "pass --stdin to wait for it",
+                    file=sys.stderr
+                )
+                stdin = None
+            # An upstream command that printed nothing is not input
+            elif stdin.at_eof():
+                stdin = None
+        if stdin is not None:
+            if not prompt_parts:
+                if task_type == "default":
+                    # Without any prompt argument, piped input is the prompt
+                    if stdin.max_bytes is None:
+                        stdin.max_bytes = config.stdin_max_bytes
+                    prompt_parts.append(stdin.read_head().strip())
+                    stdin = None
+                else:
+                    prompt_parts.append("Use the input below.")
+        
+        if not any(prompt_parts):
             print("Error: No prompt provided", file=sys.stderr)
             parser.print_help()
             sys.exit(1)
         
         full_prompt = " ".join(prompt_parts)
         
-        # Generate response
-        model.generate_response(
-            content=full_prompt,
-            task_type=task_type,
-            input_file=args.file,
-            output_file=args.output,
-            auto_execute=args.auto_execute
-        )
+        metrics.set("version", __version__)
+        metrics.set("task", task_type)
+        metrics.set("backend", "daemon" if model.remote is not None else config.backend)
+        
+        if args.compare:
+            from .core.compare import ModelComparison
+            
+            names = [name.strip() for name in args.compare.split(",") if name.strip()]
+            with metrics.span("request"):
+                runs = ModelComparison(model, names, args.first_wins).run(
+                    full_prompt, task_type, args.file, stdin
+                )
+            if not any(run.status == "done" for run in runs):
+                sys.exit(1)
+            return
         
+        # Generate response
+        with metrics.span("request"):
+            model.generate_response(
+                content=full_prompt,
+                task_type=task_type,
+                input_file=args.file,
+                output_file=args.output,
+                auto_execute=args.auto_execute,
+                use_cache=not args.no_cache,
+                refresh_cache=args.refresh,
+                stdin=stdin,
+                code_only=args.code_only
+            )
+            
     except KeyboardInterrupt:
         print("\n\nOperation cancelled by user", file=sys.stderr)
         sys.exit(1)
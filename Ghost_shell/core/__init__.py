@@ -1,6 +1,47 @@
 """Core components for the Terminal LLM tool."""
 
-from .ai_model import GeminiModel
-from .config import Config
+from typing import Any
 
-__all__ = ["GeminiModel", "Config"]
+__all__ = [
+    "GeminiModel",
+    "AsyncGhostShell",
+    "Config",
+    "GhostShellDaemon",
+    "DaemonClient",
+    "ChunkedSummarizer",
+    "BatchRunner",
+    "Repl",
+    "Session",
+    "SessionStore",
+    "ModelBackend",
+    "GeminiBackend",
+    "FakeBackend",
+]
+
+# Submodules are imported on first attribute access so that light commands
+# (history, --help, --version) never pay for the Gemini SDK import.
+_LAZY_ATTRS = {
+    "GeminiModel": ".ai_model",
+    "AsyncGhostShell": ".async_api",
+    "Config": ".config",
+    "GhostShellDaemon": ".daemon",
+    "DaemonClient": ".daemon",
+    "ChunkedSummarizer": ".summarizer",
+    "BatchRunner": ".batch",
+    "Repl": ".repl",
+    "Session": ".session",
+    "SessionStore": ".session",
+    "ModelBackend": ".backends",
+    "GeminiBackend": ".backends",
+    "FakeBackend": ".backends",
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name in _LAZY_ATTRS:
+        from importlib import import_module
+        
+        value = getattr(import_module(_LAZY_ATTRS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,15 +1,48 @@
 """AI model interface for Gemini."""
 
+import hashlib
+import itertools
+import os
 import sys
-from typing import Optional, List
-from google import genai
-from google.genai import types
+import time
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
 from rich.console import Console
-from rich.markdown import Markdown
 
-from ..utils import FileHandler, CommandExecutor, CommandLogger
+from ..utils import (
+    FileHandler,
+    CommandExecutor,
+    CommandPipeline,
+    CommandLogger,
+    ContextBudgeter,
+    FilePacker,
+    OutputFile,
+    RateLimiter,
+    ResponseCache,
+    StdinReader,
+    StreamingMarkdownRenderer,
+)
 from ..prompts import PROMPT_TEMPLATES
+from ..utils.context_budget import BudgetResult
+from ..utils.metrics import metrics
+from ..utils.tokens import estimate_history_tokens, estimate_tokens
+from .backends import ModelBackend, create_backend
 from .config import Config
+from .context_cache import CachedContext, ContextCacheRegistry
+from .daemon import DaemonClient, DaemonUnavailable
+from .resilience import ResilientBackend
+from .routing import ModelRouter, Route
+from .session import SUMMARY_INSTRUCTION, Session, SessionStore
+from .summarizer import ChunkedSummarizer
 
 
 class GeminiModel:
@@ -17,20 +50,145 @@ class GeminiModel:
     
     def __init__(self, config: Config):
         self.config = config
-        self.client = genai.Client(api_key=config.api_key)
-        self.history: List[types.Content] = []
+        self._backend: Optional[ModelBackend] = None
+        self._router: Optional[ModelRouter] = None
+        # Items are google.genai Content objects or equivalent plain dicts
+        self.history: List[Any] = []
+        self.remote: Optional[DaemonClient] = None
+        self.session: Optional[Session] = None
+        self.sessions = SessionStore(config.sessions_dir)
         self.console = Console()
         self.file_handler = FileHandler()
         self.logger = CommandLogger(config.log_file)
-        self.executor = CommandExecutor(self.logger)
+        self.executor = CommandExecutor(
+            self.logger,
+            timeout=config.command_timeout,
+            idle_timeout=config.idle_timeout,
+            parallel=config.parallel_commands
+        )
+        self.cache = ResponseCache(
+            config.cache_file, config.cache_max_bytes, config.cache_ttl
+        )
+        self.context_caches = ContextCacheRegistry(config.context_cache_file)
+    
+    @property
+    def backend(self) -> ModelBackend:
+        """Create the configured model backend on first use."""
+        if self._backend is None:
+            self._backend = create_backend(self.config.backend, self.config)
+        return self._backend
+    
+    @backend.setter
+    def backend(self, backend: ModelBackend) -> None:
+        self._backend = backend
+    
+    @property
+    def router(self) -> ModelRouter:
+        """Load the routing policy on first use; the built-in rules apply without a file."""
+        if self._router is None:
+            self._router = ModelRouter.from_file(
+                self.config.routing_file, required=bool(self.config.routing_path)
+            )
+        return self._router
+    
+    def route(self, task_type: str, input_tokens: int) -> Route:
+        """
+        Choose the model for a request, unless one was set explicitly with -m.
+        
+        Args:
+            task_type: Task name from PROMPT_TEMPLATES
+            input_tokens: Estimated tokens of the whole request
+            
+        Returns:
+            The chosen route
+        """
+        if self.config.model_pinned:
+            return Route(self.config.model_name, rule="pinned")
+        return self.router.route(task_type, input_tokens, self.config.latency_target)
+    
+    def _cached_context(self, route: Route, text: str, message: str) -> Optional[CachedContext]:
+        """
+        Find or create a server-side cache for a large input seen before.
+        
+        A cache belongs to one model, so an input cached for another model
+        than the route's is answered by that model instead, sparing a second
+        upload and cache; only a model pinned with -m is never switched.
+        
+        Args:
+            route: Route the request would take
+            text: The file content
+            message: The rest of the message, sent alongside the cache
+            
+        Returns:
+            The cached context, or None to send the input inline
+        """
+        if not self.config.context_cache or not self.backend.supports_context_cache:
+            return None
+        tokens = estimate_tokens(text)
+        if tokens < self.config.context_cache_min_tokens:
+            return None
+        
+        ttl = self.config.context_cache_ttl
+        key = ContextCacheRegistry.key(self.backend.name, text)
+        with metrics.span("context_cache"):
+            found = self.context_caches.get(key)
+            if found is not None:
+                name, model = found
+                if route.rule == "pinned" and model != route.model:
+                    metrics.set("context_cache_status", "other-model")
+                    return None
+                metrics.set("context_cache_status", "hit")
+                return CachedContext(name, model, message)
+            if not self.context_caches.seen(key, ttl):
+                return None
+            
+            model = route.model
+            try:
+                name = self.backend.create_context_cache(model, text, ttl)
+            except Exception as e:
+                self.console.print(f"[dim]Could not cache the input on the server: {e}[/dim]")
+                return None
+            for evicted in self.context_caches.add(key, name, model, ttl, tokens):
+                try:
+                    self.backend.delete_context_cache(evicted)
+                except Exception:
+                    pass  # Expires on its own
+        
+        metrics.set("context_cache_status", "created")
+        self.console.print(
+            f"[dim]Cached the input on the server for follow-up questions "
+            f"(~{tokens:,} tokens, {ttl / 60:.0f} min)[/dim]"
+        )
+        return CachedContext(name, model, message)
+    
+    def _resilient(self, route: Optional[Route] = None) -> ResilientBackend:
+        """Wrap the backend with the configured deadlines, retries, hedging and fallback."""
+        first_chunk_timeout = self.config.first_chunk_timeout
+        if route is not None:
+            first_chunk_timeout = route.first_chunk_deadline(first_chunk_timeout)
+        return ResilientBackend(
+            self.backend,
+            request_timeout=self.config.request_timeout,
+            chunk_timeout=self.config.chunk_timeout,
+            first_chunk_timeout=first_chunk_timeout,
+            retries=self.config.request_retries,
+            hedge_after=self.config.hedge_after,
+            fallback_models=self.config.fallback_models,
+            notify=lambda message: self.console.print(f"[dim]{message}[/dim]")
+        )
     
     def generate_response(
         self, 
         content: str, 
         task_type: str = "default",
-        input_file: Optional[str] = None,
+        input_file: Optional[Union[str, Sequence[str]]] = None,
         output_file: Optional[str] = None,
-        auto_execute: bool = False
+        auto_execute: bool = False,
+        use_cache: bool = True,
+        refresh_cache: bool = False,
+        stdin: Optional[StdinReader] = None,
+        code_only: bool = False,
+        execute: bool = True
     ) -> str:
         """
         Generate a response from the AI model.
@@ -38,56 +196,181 @@ class GeminiModel:
         Args:
             content: The user's input/prompt
             task_type: Type of task (command, code, explain, summarize, default)
-            input_file: Optional file to include in the prompt
+            input_file: Optional file, or list of files, directories and
+                globs, to include in the prompt
             output_file: Optional file to save the response
             auto_execute: Whether to auto-execute commands
+            use_cache: Whether to read and write the response cache
+            refresh_cache: Skip cached responses but store the new one
+            stdin: Piped input to read as additional context
+            code_only: Write only the contents of code blocks to output_file
+            execute: Offer to run the commands of a command task
             
         Returns:
             The AI's response text
         """
         try:
+            # Get the appropriate prompt
+            prompt = PROMPT_TEMPLATES.get(task_type, PROMPT_TEMPLATES["default"])
+            
+            history = self.session.history() if self.session is not None else self.history
+            
+            paths = [input_file] if isinstance(input_file, str) else list(input_file or [])
+            label = ", ".join(paths)
+            
+            # A single file too large for one request is summarized in chunks first
+            chunked = (
+                task_type == "summarize"
+                and len(paths) == 1
+                and os.path.isfile(paths[0])
+                and self._needs_chunking(paths[0])
+            )
+            packed = None
+            
             # Prepare the full content
             full_content = content
-            if input_file:
+            file_contents = []
+            if paths and not chunked:
                 try:
-                    file_content = self.file_handler.read_file(input_file)
-                    full_content += f"\n\n--- File Content ({input_file}) ---\n{file_content}"
+                    with metrics.span("read_input"):
+                        packed = self._read_inputs(paths)
+                    with metrics.span("budget"):
+                        budgeted = self._budget_file(packed, label, content, prompt, history)
+                    if budgeted.needs_chunking:
+                        chunked = True
+                    else:
+                        file_contents.append(budgeted.text)
+                        full_content += f"\n\n{budgeted.text}"
                 except Exception as e:
-                    self.console.print(f"[red]Warning: Could not read file {input_file}: {e}[/red]")
+                    self.console.print(f"[red]Warning: Could not read file {label}: {e}[/red]")
+            if chunked:
+                if packed is None:
+                    digest = self.file_handler.file_digest(paths[0])
+                else:
+                    digest = hashlib.sha256(packed.encode("utf-8")).hexdigest()
+                file_contents.append(f"chunked:{self.config.summarize_chunk_chars}:{digest}")
             
-            # Get the appropriate prompt
-            prompt = PROMPT_TEMPLATES.get(task_type, PROMPT_TEMPLATES["default"])
+            stdin_text = ""
+            if stdin is not None:
+                with metrics.span("read_stdin"):
+                    stdin_text = self._read_stdin(stdin, content, task_type, prompt, history)
+                full_content += stdin_text
             
-            # Create chat session
-            chat = self.client.chats.create(
-                model=self.config.model_name,
-                config=types.GenerateContentConfig(system_instruction=prompt),
-                history=self.history
+            input_tokens = (
+                estimate_tokens(prompt)
+                + estimate_tokens(full_content)
+                + estimate_history_tokens(history)
             )
+            if chunked:
+                input_tokens += (
+                    os.path.getsize(paths[0]) // 4 if packed is None else estimate_tokens(packed)
+                )
+            route = self.route(task_type, input_tokens)
+            metrics.set("model", route.model)
+            metrics.set("route", route.rule)
+            metrics.set("thinking_budget", route.thinking_budget)
+            metrics.set("input_tokens", input_tokens)
+            if route.rule not in ("default", "pinned"):
+                self.console.print(f"[dim]Using {route.model} ({route.rule})[/dim]")
             
-            # Generate response with streaming
-            full_response = ""
-            with self.console.status("[bold green]Thinking...[/]", spinner="dots"):
-                for chunk in chat.send_message_stream(full_content):
-                    if chunk.text:
-                        self.console.print(Markdown(chunk.text), end="")
-                        full_response += chunk.text
+            # Responses only depend on the key inputs when there is no prior
+            # conversation; piped input is read once and never cached
+            cache_key = None
+            full_response = None
+            pipeline = None
+            output = None
+            if use_cache and not history and stdin is None:
+                cache_key = ResponseCache.make_key(
+                    route.model, task_type, prompt, content, file_contents
+                )
+                if not refresh_cache:
+                    with metrics.span("cache_lookup"):
+                        full_response = self.cache.get(cache_key)
+                metrics.set("cache_hit", full_response is not None)
             
-            self.console.print()  # New line after response
+            if full_response is not None:
+                from rich.markdown import Markdown
+                
+                self.console.print(Markdown(full_response))
+                self.console.print("[dim](cached response)[/dim]")
+                output = self._open_output(output_file, code_only)
+                if output is not None:
+                    output.write(full_response)
+                if self.session is None:
+                    self._record_turn(full_content, full_response)
+            else:
+                if chunked:
+                    with metrics.span("chunked_summary"):
+                        full_content += self._summarize_in_chunks(
+                            content, label, *self._input_chunks(paths[0], packed)
+                        )
+                # Large files asked about repeatedly are read from a server-side cache
+                context = None
+                if file_contents and not chunked and not history and self.remote is None:
+                    context = self._cached_context(route, file_contents[0], content + stdin_text)
+                    if context is not None and context.model != route.model:
+                        self.console.print(
+                            f"[dim]Using {context.model}, which holds the cached input[/dim]"
+                        )
+                        route = Route(
+                            context.model,
+                            rule="context-cache",
+                            first_chunk_timeout=route.first_chunk_timeout
+                        )
+                        metrics.set("model", route.model)
+                        metrics.set("route", route.rule)
+                        metrics.set("thinking_budget", None)
+                        if cache_key is not None:
+                            cache_key = ResponseCache.make_key(
+                                route.model, task_type, prompt, content, file_contents
+                            )
+                # Commands start as soon as their block closes instead of after the stream
+                if task_type == "command" and execute and self.config.pipeline_commands:
+                    pipeline = CommandPipeline(self.executor, auto_execute, content)
+                # The response is written to -o as it streams in
+                output = self._open_output(output_file, code_only)
+                try:
+                    full_response = self._stream_response(
+                        full_content,
+                        prompt,
+                        history if self.session is not None else None,
+                        route,
+                        context,
+                        pipeline,
+                        output
+                    )
+                except BaseException:
+                    if pipeline is not None:
+                        pipeline.cancel()
+                    if output is not None:
+                        partial = output.abort()
+                        if partial is not None:
+                            self.console.print(
+                                f"[red]Warning: Partial response kept in {partial}[/red]"
+                            )
+                    raise
+                if cache_key:
+                    self.cache.put(cache_key, full_response)
             
-            # Update history
-            self.history = chat.get_history()
+            if self.session is not None:
+                with metrics.span("save_session"):
+                    self._save_session(full_content, full_response)
             
-            # Save to output file if specified
-            if output_file:
+            # Move the output file into place
+            if output is not None:
                 try:
-                    self.file_handler.write_file(output_file, full_response)
+                    output.commit()
+                    self.console.print(f"✓ Successfully saved to {output_file}")
                 except Exception as e:
                     self.console.print(f"[red]Warning: Could not save to {output_file}: {e}[/red]")
             
             # Handle command execution
-            if task_type == "command":
-                self.executor.execute_commands(full_response, auto_execute)
+            if pipeline is not None:
+                with metrics.span("execute"):
+                    pipeline.finish()
+            elif task_type == "command" and execute:
+                with metrics.span("execute"):
+                    self.executor.execute_commands(full_response, auto_execute, content)
             
             return full_response
             
@@ -95,6 +378,561 @@ class GeminiModel:
             self.console.print(f"[red]Error generating response: {e}[/red]")
             return ""
     
+    def _stream_response(
+        self,
+        full_content: str,
+        prompt: str,
+        history: Optional[List[Any]] = None,
+        route: Optional[Route] = None,
+        context: Optional[CachedContext] = None,
+        pipeline: Optional[CommandPipeline] = None,
+        output: Optional[OutputFile] = None
+    ) -> str:
+        """
+        Send a message to the model and render the streamed reply.
+        
+        Args:
+            full_content: Message text including any file content
+            prompt: System instruction for the task
+            history: Conversation to send instead of the in-memory history
+            route: Model and thinking budget to use instead of the configured model
+            context: Server-side cache holding the file content, if any
+            pipeline: Runs commands from the reply while it streams, if given
+            output: File the reply is written to as it streams, if given
+            
+        Returns:
+            The complete response text
+        """
+        history_tokens = estimate_history_tokens(self.history if history is None else history)
+        usage: Dict[str, int] = {}
+        
+        # Generate response with streaming
+        if not metrics.enabled:
+            with StreamingMarkdownRenderer(self.console) as renderer:
+                for text in self.stream_text(
+                    full_content,
+                    prompt,
+                    history=history,
+                    usage=usage,
+                    route=route,
+                    context=context
+                ):
+                    renderer.feed(text)
+                    if output is not None:
+                        output.write(text)
+                    if pipeline is not None:
+                        pipeline.feed(text, renderer.paused)
+        else:
+            # Same loop, timing the network wait separately from rendering
+            chunks = 0
+            size = 0
+            first_chunk = None
+            render_seconds = 0.0
+            start = time.perf_counter()
+            with StreamingMarkdownRenderer(self.console) as renderer:
+                for text in self.stream_text(
+                    full_content,
+                    prompt,
+                    history=history,
+                    usage=usage,
+                    route=route,
+                    context=context
+                ):
+                    received = time.perf_counter()
+                    if first_chunk is None:
+                        first_chunk = received
+                    chunks += 1
+                    size += len(text.encode("utf-8"))
+                    renderer.feed(text)
+                    render_seconds += time.perf_counter() - received
+                    if output is not None:
+                        output.write(text)
+                    if pipeline is not None:
+                        pipeline.feed(text, renderer.paused)
+                end = time.perf_counter()
+            metrics.add_time("stream", end - start)
+            metrics.record_stream(
+                start,
+                first_chunk,
+                end,
+                chunks,
+                size,
+                usage.get("output_tokens") or estimate_tokens(renderer.text),
+                render_seconds
+            )
+        
+        self._report_tokens(
+            estimate_tokens(prompt) + estimate_tokens(full_content) + history_tokens,
+            history_tokens,
+            usage
+        )
+        return renderer.text
+    
+    def _open_output(self, output_file: Optional[str], code_only: bool) -> Optional[OutputFile]:
+        """Start writing -o, warning instead of failing if it can't be created."""
+        if not output_file:
+            return None
+        try:
+            return OutputFile(output_file, code_only)
+        except OSError as e:
+            self.console.print(f"[red]Warning: Could not save to {output_file}: {e}[/red]")
+            return None
+    
+    def stream_text(
+        self,
+        full_content: str,
+        prompt: str,
+        model_name: Optional[str] = None,
+        history: Optional[List[Any]] = None,
+        usage: Optional[Dict[str, int]] = None,
+        route: Optional[Route] = None,
+        context: Optional[CachedContext] = None
+    ) -> Iterator[str]:
+        """
+        Send a message to the model and yield the reply as it streams in.
+        
+        Uses the background daemon when one is attached, falling back to
+        an in-process request if it cannot be reached. Either way the request
+        gets the deadlines, retries, hedging and fallback models in the config.
+        
+        Args:
+            full_content: Message text including any file content
+            prompt: System instruction for the task
+            model_name: Model to use instead of the configured one
+            history: Conversation to send instead of the in-memory history,
+                which is then left unchanged
+            usage: Dictionary that receives prompt_tokens and output_tokens
+                as reported by the API
+            route: Model and thinking budget, taking precedence over model_name
+            context: Server-side cache of the file content; if it turns out
+                to be gone, full_content is sent instead
+                
+        Yields:
+            Text chunks of the response
+        """
+        thinking_budget = None
+        if route is not None:
+            model_name, thinking_budget = route.model, route.thinking_budget
+        model_name = model_name or self.config.model_name
+        route = route or Route(model_name)
+        
+        # Send a snapshot so concurrent daemon requests each append only their own turns
+        own_history = history is None
+        history = list(self.history if own_history else history)
+        parts = []
+        if self.remote is not None:
+            try:
+                # The conversation always travels with the request, so the
+                # daemon never mixes turns from different shells or tasks
+                for text in self.remote.stream(
+                    full_content,
+                    prompt,
+                    model_name,
+                    history,
+                    usage,
+                    thinking_budget,
+                    route.first_chunk_timeout
+                ):
+                    parts.append(text)
+                    yield text
+            except DaemonUnavailable as e:
+                if parts:
+                    raise
+                self.remote = None
+                self.console.print(f"[dim]Daemon unavailable ({e}), running in-process[/dim]")
+        
+        if self.remote is None:
+            yield from self._stream_local(
+                full_content, prompt, route, history, usage, context, parts
+            )
+        
+        # Update history
+        if own_history:
+            self._record_turn(full_content, "".join(parts))
+            self._trim_history()
+    
+    def _stream_local(
+        self,
+        full_content: str,
+        prompt: str,
+        route: Route,
+        history: List[Any],
+        usage: Optional[Dict[str, int]],
+        context: Optional[CachedContext],
+        parts: List[str]
+    ) -> Iterator[str]:
+        """Stream a request in-process, collecting the reply into parts."""
+        backend = self._resilient(route)
+        model_name, thinking_budget = route.model, route.thinking_budget
+        if context is not None:
+            try:
+                for text in backend.stream_chat(
+                    model_name,
+                    prompt,
+                    history,
+                    context.message,
+                    usage,
+                    thinking_budget,
+                    context.name
+                ):
+                    parts.append(text)
+                    yield text
+            except Exception as e:
+                if parts:
+                    raise
+                # Expired or deleted on the server: forget it and send the file again
+                self.context_caches.forget(context.name)
+                self.console.print(
+                    f"[dim]Cached context unavailable ({e}); sending the input again[/dim]"
+                )
+                context = None
+        if context is None:
+            for text in backend.stream_chat(
+                model_name, prompt, history, full_content, usage, thinking_budget
+            ):
+                parts.append(text)
+                yield text
+    
+    def complete(
+        self,
+        content: str,
+        prompt: str,
+        model_name: Optional[str] = None,
+        route: Optional[Route] = None
+    ) -> str:
+        """
+        Send a single stateless request and return the whole reply.
+        
+        Args:
+            content: Message text
+            prompt: System instruction for the request
+            model_name: Model to use instead of the configured one
+            route: Model and thinking budget, taking precedence over model_name
+            
+        Returns:
+            The response text
+        """
+        if route is not None:
+            return self.backend.generate(route.model, prompt, content, route.thinking_budget)
+        return self.backend.generate(model_name or self.config.model_name, prompt, content)
+    
+    def count_tokens(self, text: str, model_name: Optional[str] = None) -> int:
+        """
+        Count tokens with the model's own tokenizer (one API round trip).
+        
+        Args:
+            text: Text to count
+            model_name: Model to use instead of the configured one
+            
+        Returns:
+            Token count reported by the backend
+        """
+        return self.backend.count_tokens(model_name or self.config.model_name, text)
+    
+    def _read_inputs(self, paths: List[str]) -> str:
+        """
+        Read files, directories and globs into one block with per-file headers.
+        
+        Args:
+            paths: Paths and patterns from the command line
+            
+        Returns:
+            The packed file contents
+            
+        Raises:
+            FileNotFoundError: If a path matches nothing
+            IOError: If none of the files could be included
+        """
+        result = FilePacker(self.config.max_file_bytes).pack(paths)
+        if len(result.files) != 1 or result.skipped:
+            self.console.print(f"[dim]{result.summary()}[/dim]")
+            reported = [item for item in result.skipped if item[1] != "ignored"]
+            for path, reason in reported[:20]:
+                self.console.print(f"[dim]  skipped {path}: {reason}[/dim]")
+            if len(reported) > 20:
+                self.console.print(f"[dim]  ... and {len(reported) - 20} more[/dim]")
+        if not result.files:
+            raise IOError("no readable text files")
+        return result.text
+    
+    def _budget_file(
+        self,
+        file_content: str,
+        label: str,
+        content: str,
+        prompt: str,
+        history: List[Any]
+    ) -> BudgetResult:
+        """
+        Fit file content into the input token budget, reporting anything trimmed.
+        
+        Args:
+            file_content: Text of the input files
+            label: Description of the input, for messages
+            content: The user's prompt
+            prompt: System instruction for the task
+            history: Conversation sent with the request
+            
+        Returns:
+            BudgetResult with the content to send
+        """
+        budgeter = ContextBudgeter(
+            self.config.max_input_tokens,
+            self.config.trim_strategies,
+            self.config.drop_pattern,
+            count_tokens=self.count_tokens
+        )
+        reserved = (
+            estimate_tokens(prompt)
+            + estimate_tokens(content)
+            + estimate_history_tokens(history)
+        )
+        result = budgeter.fit(file_content, reserved)
+        if result.trimmed:
+            self.console.print(f"[yellow]Trimmed {label} to fit the input budget:[/yellow]")
+            for note in result.notes:
+                self.console.print(f"[yellow]  - {note}[/yellow]")
+        return result
+    
+    def _needs_chunking(self, input_file: str) -> bool:
+        """Check whether a file is too large to send in a single request."""
+        try:
+            return os.path.getsize(input_file) > self.config.summarize_chunk_chars
+        except OSError:
+            return False
+    
+    def _input_chunks(self, input_file: str, text: Optional[str] = None) -> Tuple[Iterator[str], int]:
+        """
+        Split input for chunked summarization.
+        
+        Args:
+            input_file: Path of the file to split when text is not given
+            text: Already-read input to split instead of the file
+            
+        Returns:
+            Tuple of (lazy chunk iterator, expected number of chunks)
+        """
+        chunk_chars = self.config.summarize_chunk_chars
+        if text is None:
+            chunks = self.file_handler.iter_chunks(input_file, chunk_chars)
+            size = os.path.getsize(input_file)
+        else:
+            chunks = self.file_handler.chunk_lines(text.splitlines(keepends=True), chunk_chars)
+            size = len(text)
+        return chunks, -(-size // chunk_chars)
+    
+    def _summarizer(self) -> ChunkedSummarizer:
+        """Create a summarizer using the configured concurrency and rate limit."""
+        return ChunkedSummarizer(
+            self,
+            concurrency=self.config.summarize_concurrency,
+            rate_limiter=RateLimiter(self.config.requests_per_minute)
+        )
+    
+    def _summarize_in_chunks(
+        self,
+        content: str,
+        label: str,
+        chunks: Iterable[str],
+        total_chunks: Optional[int] = None
+    ) -> str:
+        """
+        Map-reduce large input into partial summaries for the final request.
+        
+        Args:
+            content: The user's prompt, passed along as summarization guidance
+            label: Description of the input, for messages
+            chunks: Chunks of the input, consumed lazily
+            total_chunks: Expected number of chunks, if known
+            
+        Returns:
+            Text block with the partial summaries to append to the message
+        """
+        counted = [0]
+        
+        def counting() -> Iterator[str]:
+            for chunk in chunks:
+                counted[0] += 1
+                yield chunk
+        
+        summaries = self._summarizer().summarize(
+            counting(),
+            instructions=content,
+            total_chunks=total_chunks
+        )
+        
+        self.console.print(
+            f"[dim]Summarized {label} in {counted[0]} chunks "
+            f"({self.config.summarize_concurrency} concurrent requests)[/dim]"
+        )
+        return (
+            f"\n\n--- Partial summaries of {label}, in document order ---\n"
+            + "\n\n---\n\n".join(summaries)
+        )
+    
+    def open_session(self, name: str) -> None:
+        """
+        Continue a named session; its turns replace the in-memory history.
+        
+        Args:
+            name: Session name
+        """
+        self.session = self.sessions.load(name)
+        if self.session.turns or self.session.summary:
+            self.console.print(
+                f"[dim]Session '{name}': {len(self.session.turns) // 2} exchanges, "
+                f"~{self.session.tokens():,} tokens of history[/dim]"
+            )
+    
+    def _save_session(self, full_content: str, response: str) -> None:
+        """Add an exchange to the open session, compact it if needed and save it."""
+        session = self.session
+        session.add_exchange(full_content, response)
+        folded = session.compact(
+            self.config.session_token_budget,
+            lambda text: self.complete(text, SUMMARY_INSTRUCTION)
+        )
+        if folded:
+            self.console.print(
+                f"[dim]Folded {folded} older exchanges into the session summary[/dim]"
+            )
+        try:
+            self.sessions.save(session)
+        except OSError as e:
+            self.console.print(f"[red]Warning: Could not save session {session.name}: {e}[/red]")
+    
+    def _trim_history(self) -> None:
+        """Drop the oldest in-memory exchanges once they exceed the session token budget."""
+        budget = self.config.session_token_budget
+        total = estimate_history_tokens(self.history)
+        while total > budget and len(self.history) > 2:
+            # Remove whole exchanges so the history still starts with a user turn
+            total -= estimate_history_tokens(self.history[:1])
+            del self.history[0]
+            while self.history and self._role(self.history[0]) != "user":
+                total -= estimate_history_tokens(self.history[:1])
+                del self.history[0]
+    
+    @staticmethod
+    def _role(item: Any) -> Optional[str]:
+        """Get the role of a history item, whether a Content object or a dict."""
+        return item.get("role") if isinstance(item, dict) else getattr(item, "role", None)
+    
+    def _report_tokens(self, estimated: int, history_tokens: int, usage: Dict[str, int]) -> None:
+        """Print how many tokens the last request sent, as counted by the API when available."""
+        if usage.get("prompt_tokens"):
+            sent = f"{usage['prompt_tokens']:,} tokens sent"
+            if usage.get("cached_tokens"):
+                sent += f" ({usage['cached_tokens']:,} from cache)"
+            if usage.get("output_tokens"):
+                sent += f", {usage['output_tokens']:,} received"
+        else:
+            sent = f"~{estimated:,} tokens sent"
+        if history_tokens:
+            sent += f" (~{history_tokens:,} from history)"
+        self.console.print(f"[dim]{sent}[/dim]")
+    
+    def _read_stdin(
+        self,
+        reader: StdinReader,
+        content: str,
+        task_type: str,
+        prompt: str,
+        history: List[Any]
+    ) -> str:
+        """
+        Turn piped input into context without holding more of it than needed.
+        
+        With a rolling interval, the stream is summarized window by window as
+        it arrives. With a tail size, only its end is kept. Summaries of long
+        input are built chunk by chunk while reading. Otherwise the input is
+        read up to the byte limit and budgeted like a file.
+        
+        Args:
+            reader: Reader over standard input
+            content: The user's prompt
+            task_type: Type of task
+            prompt: System instruction for the task
+            history: Conversation sent with the request
+            
+        Returns:
+            Text block to append to the message
+        """
+        label = "standard input"
+        chunk_chars = self.config.summarize_chunk_chars
+        
+        if self.config.stdin_rolling_interval:
+            from rich.markdown import Markdown
+            
+            latest = [""]
+            
+            def show(index: int, summary: str) -> None:
+                latest[0] = summary
+                self.console.rule(
+                    f"[dim]Rolling summary {index} ({reader.bytes_read / 1024:,.0f} KiB read)[/dim]"
+                )
+                self.console.print(Markdown(summary))
+            
+            try:
+                self._summarizer().summarize_rolling(
+                    reader.windows(self.config.stdin_rolling_interval, chunk_chars), content, show
+                )
+            except KeyboardInterrupt:
+                self.console.print("[dim]Stopped reading; answering from the latest summary[/dim]")
+            return (
+                f"\n\n--- Rolling summary of {label} ({reader.bytes_read:,} bytes) ---\n{latest[0]}"
+            )
+        
+        if self.config.stdin_tail_bytes:
+            text = reader.read_tail(self.config.stdin_tail_bytes)
+            self.console.print(
+                f"[dim]Kept the last {len(text):,} characters of {reader.bytes_read:,} bytes of {label}[/dim]"
+            )
+        elif task_type == "summarize":
+            chunks = self.file_handler.chunk_lines(reader.lines(), chunk_chars)
+            text = next(chunks, "")
+            second = next(chunks, None)
+            if second is not None:
+                return self._summarize_in_chunks(
+                    content, label, itertools.chain([text, second], chunks)
+                )
+        else:
+            if reader.max_bytes is None:
+                reader.max_bytes = self.config.stdin_max_bytes
+            text = reader.read_head()
+        
+        if reader.truncated:
+            self.console.print(
+                f"[yellow]Stopped reading {label} after {reader.bytes_read:,} bytes "
+                f"(raise the limit with --max-bytes)[/yellow]"
+            )
+        
+        budgeted = self._budget_file(text, label, content, prompt, history)
+        if budgeted.needs_chunking:
+            return self._summarize_in_chunks(content, label, *self._input_chunks("", text))
+        return f"\n\n--- Standard Input ---\n{budgeted.text}"
+    
+    def _record_turn(self, full_content: str, response: str) -> None:
+        """Append a user/model exchange to the in-memory history."""
+        # Plain dicts are accepted as chat history and avoid importing the SDK
+        self.history.append({"role": "user", "parts": [{"text": full_content}]})
+        self.history.append({"role": "model", "parts": [{"text": response}]})
+    
+    def show_cache_stats(self) -> None:
+        """Show response cache statistics."""
+        stats = self.cache.stats()
+        if not stats:
+            return
+        
+        lookups = stats["hits"] + stats["misses"]
+        hit_rate = (stats["hits"] / lookups * 100) if lookups else 0.0
+        self.console.print("[cyan]Response Cache:[/cyan]")
+        self.console.print(f"  Entries:   {stats['entries']} ({stats['bytes'] / 1024:.1f} KiB)")
+        self.console.print(f"  Hits:      {stats['hits']}")
+        self.console.print(f"  Misses:    {stats['misses']}")
+        self.console.print(f"  Hit rate:  {hit_rate:.1f}%")
+        self.console.print(f"  Evictions: {stats['evictions']}")
+    
     def clear_history(self) -> None:
         """Clear the conversation history."""
         self.history = []
@@ -0,0 +1,290 @@
+"""Async library interface for embedding GhostShell in services."""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple, Union
+
+from ..prompts import PROMPT_TEMPLATES
+from ..utils.command_parser import extract_commands
+from ..utils.context_budget import ContextBudgeter
+from ..utils.file_packer import FilePacker
+from ..utils.rate_limit import backoff_delay
+from ..utils.tokens import estimate_history_tokens, estimate_tokens
+from .backends import ModelBackend, create_backend
+from .config import Config
+from .resilience import StreamTimeout, is_retryable
+from .routing import ModelRouter, Route
+
+
+async def _next_chunk(chunks: AsyncIterator[str], timeout: Optional[float]) -> str:
+    """Wait for the next chunk, raising asyncio.TimeoutError after timeout seconds."""
+    if timeout is None:
+        return await chunks.__anext__()
+    if hasattr(asyncio, "timeout"):
+        # Python 3.11+: a timer on the current task, much cheaper per chunk
+        # than wait_for(), which wraps every call in a new task
+        async with asyncio.timeout(timeout):
+            return await chunks.__anext__()
+    return await asyncio.wait_for(chunks.__anext__(), timeout)
+
+
+@dataclass
+class Reply:
+    """A finished response from AsyncGhostShell.generate()."""
+    
+    text: str
+    model: str
+    # prompt_tokens, output_tokens and cached_tokens as reported by the API
+    usage: Dict[str, int] = field(default_factory=dict)
+    # Safe shell commands from the reply, in document order; never executed
+    commands: List[str] = field(default_factory=list)
+    # What was trimmed from the attached files to fit the input budget
+    notes: List[str] = field(default_factory=list)
+
+
+class AsyncGhostShell:
+    """
+    Async-first access to GhostShell's task templates, routing and command extraction.
+    
+    Only generation happens here: nothing is printed, logged or executed,
+    and errors are raised to the caller. Every request shares one backend
+    (for Gemini, one client and its async connection pool) and runs on the
+    caller's event loop without threads, so a single instance can serve
+    thousands of concurrent tasks. At most max_concurrency requests are in
+    flight at once; the rest wait their turn. Cancelling the task that
+    consumes a stream aborts its request.
+    
+    The instance keeps no conversation. Pass earlier turns as history,
+    e.g. [{"role": "user", "parts": [{"text": ...}]}, {"role": "model", ...}].
+    
+    Example:
+        shell = AsyncGhostShell()
+        async for chunk in shell.stream("command", "free up disk space"):
+            print(chunk, end="")
+    """
+    
+    def __init__(
+        self,
+        config: Optional[Config] = None,
+        backend: Optional[ModelBackend] = None,
+        max_concurrency: int = 64
+    ):
+        self.config = config or Config()
+        self.max_concurrency = max(1, max_concurrency)
+        self._backend = backend
+        self._router: Optional[ModelRouter] = None
+        # Created on first use so it belongs to the caller's event loop
+        self._semaphore: Optional[asyncio.Semaphore] = None
+    
+    @property
+    def backend(self) -> ModelBackend:
+        """Create the configured model backend on first use."""
+        if self._backend is None:
+            self._backend = create_backend(self.config.backend, self.config)
+        return self._backend
+    
+    @property
+    def router(self) -> ModelRouter:
+        """Load the routing policy on first use; the built-in rules apply without a file."""
+        if self._router is None:
+            self._router = ModelRouter.from_file(
+                self.config.routing_file, required=bool(self.config.routing_path)
+            )
+        return self._router
+    
+    @staticmethod
+    def extract_commands(text: str) -> List[str]:
+        """
+        Extract the safe shell commands from a reply without running them.
+        
+        Args:
+            text: Markdown reply
+            
+        Returns:
+            Unique commands in document order
+        """
+        return extract_commands(text)
+    
+    async def stream(
+        self,
+        task: str,
+        prompt: str,
+        files: Optional[Union[str, Sequence[str]]] = None,
+        *,
+        history: Optional[List[Any]] = None,
+        model: Optional[str] = None,
+        usage: Optional[Dict[str, int]] = None
+    ) -> AsyncIterator[str]:
+        """
+        Stream the reply to a prompt.
+        
+        Args:
+            task: Task name from PROMPT_TEMPLATES, with or without a leading slash
+            prompt: The user's request
+            files: File, or list of files, directories and globs, to include
+            history: Earlier turns of the conversation
+            model: Model to use instead of the routed one
+            usage: Dictionary that receives the API's token counts
+            
+        Yields:
+            Text chunks of the reply
+            
+        Raises:
+            ValueError: If the task is unknown or the files are too large
+            StreamTimeout: If the model stops responding
+            BackendError: If the request fails and cannot be retried
+        """
+        system_prompt, message, route, _ = await self._prepare(task, prompt, files, history, model)
+        async for text in self._stream(route, system_prompt, history or [], message, usage):
+            yield text
+    
+    async def generate(
+        self,
+        task: str,
+        prompt: str,
+        files: Optional[Union[str, Sequence[str]]] = None,
+        *,
+        history: Optional[List[Any]] = None,
+        model: Optional[str] = None
+    ) -> Reply:
+        """
+        Collect the whole reply to a prompt, with its extracted commands.
+        
+        Takes the same arguments as stream().
+        
+        Returns:
+            The reply
+        """
+        system_prompt, message, route, notes = await self._prepare(
+            task, prompt, files, history, model
+        )
+        usage: Dict[str, int] = {}
+        parts = [
+            text async for text in self._stream(
+                route, system_prompt, history or [], message, usage
+            )
+        ]
+        text = "".join(parts)
+        return Reply(text, route.model, usage, extract_commands(text), notes)
+    
+    async def _prepare(
+        self,
+        task: str,
+        prompt: str,
+        files: Optional[Union[str, Sequence[str]]],
+        history: Optional[List[Any]],
+        model: Optional[str]
+    ) -> Tuple[str, str, Route, List[str]]:
+        """Pick the template, attach the files and route the request."""
+        task = task.lstrip("/")
+        if task not in PROMPT_TEMPLATES:
+            raise ValueError(f"Unknown task: {task} (choose from {', '.join(PROMPT_TEMPLATES)})")
+        system_prompt = PROMPT_TEMPLATES[task]
+        
+        message = prompt
+        notes: List[str] = []
+        paths = [files] if isinstance(files, str) else list(files or [])
+        if paths:
+            # Reading files blocks, so it runs on the loop's shared executor
+            loop = asyncio.get_running_loop()
+            text, notes = await loop.run_in_executor(
+                None, self._read_files, paths, prompt, system_prompt, history or []
+            )
+            message += f"\n\n{text}"
+        
+        input_tokens = (
+            estimate_tokens(system_prompt)
+            + estimate_tokens(message)
+            + estimate_history_tokens(history or [])
+        )
+        if model:
+            route = Route(model, rule="pinned")
+        elif self.config.model_pinned:
+            route = Route(self.config.model_name, rule="pinned")
+        else:
+            route = self.router.route(task, input_tokens, self.config.latency_target)
+        return system_prompt, message, route, notes
+    
+    def _read_files(
+        self,
+        paths: List[str],
+        prompt: str,
+        system_prompt: str,
+        history: List[Any]
+    ) -> Tuple[str, List[str]]:
+        """Pack the files and fit them into the input token budget."""
+        result = FilePacker(self.config.max_file_bytes, workers=1).pack(paths)
+        if not result.files:
+            raise IOError("no readable text files")
+        budgeter = ContextBudgeter(
+            self.config.max_input_tokens,
+            [name for name in self.config.trim_strategies if name != "chunk"],
+            self.config.drop_pattern
+        )
+        reserved = (
+            estimate_tokens(system_prompt)
+            + estimate_tokens(prompt)
+            + estimate_history_tokens(history)
+        )
+        budgeted = budgeter.fit(result.text, reserved)
+        return budgeted.text, budgeted.notes
+    
+    async def _stream(
+        self,
+        route: Route,
+        system_prompt: str,
+        history: List[Any],
+        message: str,
+        usage: Optional[Dict[str, int]]
+    ) -> AsyncIterator[str]:
+        """
+        Stream one request within the concurrency limit and the configured deadlines.
+        
+        Failures before the first chunk are retried with backoff when they
+        are transient; once text has been yielded the request cannot be
+        replayed, so later failures raise.
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        retries = max(0, self.config.request_retries)
+        
+        async with self._semaphore:
+            for attempt in range(retries + 1):
+                started = time.monotonic()
+                yielded = False
+                chunks = self.backend.stream_chat_async(
+                    route.model, system_prompt, history, message, usage, route.thinking_budget
+                )
+                try:
+                    while True:
+                        timeout = self._timeout(started, yielded, route)
+                        try:
+                            text = await _next_chunk(chunks, timeout)
+                        except StopAsyncIteration:
+                            return
+                        except asyncio.TimeoutError:
+                            raise StreamTimeout(
+                                f"No response for {timeout:.1f}s; stream stalled"
+                            ) from None
+                        yielded = True
+                        yield text
+                except Exception as e:
+                    if yielded or attempt == retries or not is_retryable(e):
+                        raise
+                    await asyncio.sleep(backoff_delay(attempt))
+                finally:
+                    await chunks.aclose()
+    
+    def _timeout(self, started: float, streaming: bool, route: Route) -> Optional[float]:
+        """Seconds the next chunk may take, within the chunk and request deadlines."""
+        limits = []
+        # The first chunk of a large request can take far longer than the gaps after it
+        if streaming and self.config.chunk_timeout:
+            limits.append(self.config.chunk_timeout)
+        first_chunk_timeout = route.first_chunk_deadline(self.config.first_chunk_timeout)
+        if not streaming and first_chunk_timeout:
+            limits.append(first_chunk_timeout)
+        if self.config.request_timeout:
+            limits.append(max(0.0, started + self.config.request_timeout - time.monotonic()))
+        return min(limits) if limits else None
@@ -0,0 +1,509 @@
+"""Model backends: the Gemini API and a local stand-in for offline runs."""
+
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
+
+from ..utils.metrics import metrics
+from ..utils.tokens import estimate_history_tokens, estimate_tokens
+
+if TYPE_CHECKING:
+    from google import genai
+    from google.genai import types
+    
+    from .config import Config
+
+BACKENDS = ("gemini", "fake")
+
+
+class BackendError(Exception):
+    """A failed model request, with the HTTP status code when there is one."""
+    
+    def __init__(self, message: str, code: Optional[int] = None):
+        super().__init__(message)
+        self.code = code
+
+
+class ModelBackend(ABC):
+    """
+    Interface between GhostShell and a language model service.
+    
+    History items are google.genai Content objects or equivalent plain
+    dicts ({"role": ..., "parts": [{"text": ...}]}). Backends must be safe
+    to call from several threads at once.
+    """
+    
+    name = "backend"
+    # Whether create_context_cache() is implemented
+    supports_context_cache = False
+    
+    @abstractmethod
+    def stream_chat(
+        self,
+        model: str,
+        system_prompt: str,
+        history: List[Any],
+        message: str,
+        usage: Optional[Dict[str, int]] = None,
+        thinking_budget: Optional[int] = None,
+        cached_context: Optional[str] = None
+    ) -> Iterator[str]:
+        """
+        Send a message after the given history and stream the reply.
+        
+        Args:
+            model: Model name
+            system_prompt: System instruction
+            history: Earlier turns of the conversation
+            message: The new user message
+            usage: Dictionary that receives prompt_tokens and output_tokens
+            thinking_budget: Reasoning tokens the model may spend, 0 to turn
+                thinking off, or None for the model's default
+            cached_context: Name of a context cache whose content precedes
+                the history, from create_context_cache()
+                
+        Yields:
+            Text chunks of the reply
+        """
+    
+    def stream_chat_async(
+        self,
+        model: str,
+        system_prompt: str,
+        history: List[Any],
+        message: str,
+        usage: Optional[Dict[str, int]] = None,
+        thinking_budget: Optional[int] = None,
+        cached_context: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """
+        Like stream_chat(), but on the running event loop without blocking it.
+        
+        Implementations use the service's native async client, so any
+        number of concurrent streams share one connection pool and no
+        threads. Cancelling the consuming task aborts the request.
+        
+        Yields:
+            Text chunks of the reply
+        """
+        raise NotImplementedError(f"The {self.name} backend has no async streaming")
+    
+    @abstractmethod
+    def generate(
+        self,
+        model: str,
+        system_prompt: str,
+        content: str,
+        thinking_budget: Optional[int] = None
+    ) -> str:
+        """
+        Send a single stateless request and return the whole reply.
+        
+        Args:
+            model: Model name
+            system_prompt: System instruction
+            content: Message text
+            thinking_budget: Reasoning token budget, or None for the model default
+            
+        Returns:
+            The reply text
+        """
+    
+    @abstractmethod
+    def count_tokens(self, model: str, text: str) -> int:
+        """
+        Count the tokens a text uses with the model's tokenizer.
+        
+        Args:
+            model: Model name
+            text: Text to count
+            
+        Returns:
+            Token count
+        """
+    
+    def warm_up(self, model: str) -> None:
+        """Open connections ahead of the first request, if the backend has any."""
+    
+    def create_context_cache(self, model: str, content: str, ttl: float) -> str:
+        """
+        Store content on the server so later requests can refer to it by name.
+        
+        Args:
+            model: Model the cache is for; caches cannot be shared across models
+            content: Text to cache, sent as a user turn
+            ttl: Lifetime in seconds
+            
+        Returns:
+            The cache name
+        """
+        raise NotImplementedError(f"The {self.name} backend has no context caching")
+    
+    def delete_context_cache(self, name: str) -> None:
+        """Delete a context cache before it expires."""
+
+
+class GeminiBackend(ModelBackend):
+    """Google Gemini through the google-genai SDK."""
+    
+    name = "gemini"
+    supports_context_cache = True
+    
+    def __init__(self, api_key: Callable[[], str]):
+        self._api_key = api_key
+        self._client: Optional["genai.Client"] = None
+        self._lock = threading.Lock()
+    
+    @property
+    def client(self) -> "genai.Client":
+        """Create the Gemini client the first time a request goes out."""
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    with metrics.span("client_init"):
+                        from google import genai
+                        
+                        self._client = genai.Client(api_key=self._api_key())
+        return self._client
+    
+    def stream_chat(
+        self,
+        model: str,
+        system_prompt: str,
+        history: List[Any],
+        message: str,
+        usage: Optional[Dict[str, int]] = None,
+        thinking_budget: Optional[int] = None,
+        cached_context: Optional[str] = None
+    ) -> Iterator[str]:
+        config, message = self._chat_config(
+            system_prompt, message, thinking_budget, cached_context
+        )
+        chat = self.client.chats.create(model=model, config=config, history=list(history))
+        for chunk in chat.send_message_stream(message):
+            self._record_usage(chunk, usage)
+            if chunk.text:
+                yield chunk.text
+    
+    async def stream_chat_async(
+        self,
+        model: str,
+        system_prompt: str,
+        history: List[Any],
+        message: str,
+        usage: Optional[Dict[str, int]] = None,
+        thinking_budget: Optional[int] = None,
+        cached_context: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        config, message = self._chat_config(
+            system_prompt, message, thinking_budget, cached_context
+        )
+        contents = list(history) + [{"role": "user", "parts": [{"text": message}]}]
+        # client.aio shares the client's credentials and one async connection pool
+        stream = await self.client.aio.models.generate_content_stream(
+            model=model, contents=contents, config=config
+        )
+        async for chunk in stream:
+            self._record_usage(chunk, usage)
+            if chunk.text:
+                yield chunk.text
+    
+    @staticmethod
+    def _chat_config(
+        system_prompt: Optional[str],
+        message: str,
+        thinking_budget: Optional[int],
+        cached_context: Optional[str]
+    ) -> Tuple["types.GenerateContentConfig", str]:
+        """Build the request config, and the message to send with it."""
+        from google.genai import types
+        
+        thinking = None
+        if thinking_budget is not None:
+            thinking = types.ThinkingConfig(thinking_budget=thinking_budget)
+        if cached_context:
+            # The API rejects a system instruction next to a cached context,
+            # so the instructions lead the message instead
+            message = f"{system_prompt}\n\n{message}"
+            system_prompt = None
+        config = types.GenerateContentConfig(
+            system_instruction=system_prompt,
+            thinking_config=thinking,
+            cached_content=cached_context
+        )
+        return config, message
+    
+    @staticmethod
+    def _record_usage(chunk: Any, usage: Optional[Dict[str, int]]) -> None:
+        """Copy the token counts a streamed chunk reports into usage."""
+        metadata = getattr(chunk, "usage_metadata", None)
+        if usage is None or metadata is None:
+            return
+        if metadata.prompt_token_count:
+            usage["prompt_tokens"] = metadata.prompt_token_count
+        if metadata.candidates_token_count:
+            usage["output_tokens"] = metadata.candidates_token_count
+        if metadata.cached_content_token_count:
+            usage["cached_tokens"] = metadata.cached_content_token_count
+    
+    def generate(
+        self,
+        model: str,
+        system_prompt: str,
+        content: str,
+        thinking_budget: Optional[int] = None
+    ) -> str:
+        config, content = self._chat_config(system_prompt, content, thinking_budget, None)
+        response = self.client.models.generate_content(
+            model=model,
+            contents=content,
+            config=config
+        )
+        return response.text or ""
+    
+    def count_tokens(self, model: str, text: str) -> int:
+        response = self.client.models.count_tokens(model=model, contents=text)
+        return response.total_tokens or 0
+    
+    def warm_up(self, model: str) -> None:
+        self.client.models.get(model=model)
+    
+    def create_context_cache(self, model: str, content: str, ttl: float) -> str:
+        from google.genai import types
+        
+        cache = self.client.caches.create(
+            model=model,
+            config=types.CreateCachedContentConfig(
+                contents=[types.Content(role="user", parts=[types.Part(text=content)])],
+                display_name="ghostshell",
+                ttl=f"{int(ttl)}s"
+            )
+        )
+        return cache.name
+    
+    def delete_context_cache(self, name: str) -> None:
+        self.client.caches.delete(name=name)
+
+
+def synthetic_response(sections: int = 6) -> str:
+    """Build a markdown reply with prose, lists and shell and Python fences."""
+    parts = ["Here is one way to do it.\n\n"]
+    for i in range(sections):
+        parts.append(f"## Step {i + 1}\n\nRun the following, then check the output:\n\n")
+        parts.append(f"```bash\necho step-{i + 1}\nls -la /tmp\n```\n\n")
+        parts.append("- keep `inline code` short\n- prefer small steps\n\n")
+        parts.append("```python\n")
+        for j in range(4):
+            parts.append(f"def handler_{i}_{j}(event):\n    return process(event, retries={j})\n")
+        parts.append("```\n\n")
+    return "".join(parts)
+
+
+class FakeBackend(ModelBackend):
+    """
+    Offline stand-in that replays a recorded or synthetic chunk stream.
+    
+    Latency is simulated with a time to first token (ttft) and a delay
+    between chunks. A recording is a JSON list of chunk strings, or an
+    object with a "chunks" list and optional per-chunk "delays" in seconds,
+    which take precedence over the configured inter-chunk delay. The first
+    `failures` streaming requests fail with a 503, to exercise retries.
+    
+    Upload and prompt processing cost `prefill` seconds per 1,000 prompt
+    tokens, and a tenth of that for tokens read from a context cache. Cache
+    names encode the cached size, so caches outlive the process the way
+    server-side ones do.
+    """
+    
+    name = "fake"
+    supports_context_cache = True
+    
+    def __init__(
+        self,
+        ttft: float = 0.3,
+        delay: float = 0.02,
+        chunk_chars: int = 24,
+        recording: Optional[str] = None,
+        response: Optional[str] = None,
+        failures: int = 0,
+        prefill: float = 0.0
+    ):
+        self.ttft = ttft
+        self.failures = failures
+        self.prefill = prefill
+        self._lock = threading.Lock()
+        self.delay = delay
+        self.chunk_chars = max(1, chunk_chars)
+        self.chunks: List[str] = []
+        self.delays: Optional[List[float]] = None
+        if recording:
+            with open(recording, "r", encoding="utf-8") as file:
+                data = json.load(file)
+            if isinstance(data, dict):
+                self.chunks = [str(chunk) for chunk in data["chunks"]]
+                self.delays = data.get("delays")
+            else:
+                self.chunks = [str(chunk) for chunk in data]
+        else:
+            text = response if response is not None else synthetic_response()
+            self.chunks = [
+                text[i:i + self.chunk_chars] for i in range(0, len(text), self.chunk_chars)
+            ]
+    
+    @classmethod
+    def from_env(cls) -> "FakeBackend":
+        """Configure from GHOSTSHELL_FAKE_TTFT, _DELAY, _CHUNK, _RECORDING, _FAILURES and _PREFILL."""
+        return cls(
+            ttft=float(os.getenv("GHOSTSHELL_FAKE_TTFT", 0.3)),
+            delay=float(os.getenv("GHOSTSHELL_FAKE_DELAY", 0.02)),
+            chunk_chars=int(os.getenv("GHOSTSHELL_FAKE_CHUNK", 24)),
+            recording=os.getenv("GHOSTSHELL_FAKE_RECORDING") or None,
+            failures=int(os.getenv("GHOSTSHELL_FAKE_FAILURES", 0)),
+            prefill=float(os.getenv("GHOSTSHELL_FAKE_PREFILL", 0))
+        )
+    
+    def stream_chat(
+        self,
+        model: str,
+        system_prompt: str,
+        history: List[Any],
+        message: str,
+        usage: Optional[Dict[str, int]] = None,
+        thinking_budget: Optional[int] = None,
+        cached_context: Optional[str] = None
+    ) -> Iterator[str]:
+        prompt_tokens, cached_tokens, wait = self._prefill(
+            system_prompt, history, message, cached_context
+        )
+        time.sleep(wait)
+        self._maybe_fail()
+        for index, chunk in enumerate(self.chunks):
+            if index:
+                time.sleep(self.delays[index] if self.delays else self.delay)
+            yield chunk
+        self._report_usage(usage, prompt_tokens, cached_tokens)
+    
+    async def stream_chat_async(
+        self,
+        model: str,
+        system_prompt: str,
+        history: List[Any],
+        message: str,
+        usage: Optional[Dict[str, int]] = None,
+        thinking_budget: Optional[int] = None,
+        cached_context: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        prompt_tokens, cached_tokens, wait = self._prefill(
+            system_prompt, history, message, cached_context
+        )
+        await asyncio.sleep(wait)
+        self._maybe_fail()
+        for index, chunk in enumerate(self.chunks):
+            if index:
+                await asyncio.sleep(self.delays[index] if self.delays else self.delay)
+            yield chunk
+        self._report_usage(usage, prompt_tokens, cached_tokens)
+    
+    def _prefill(
+        self,
+        system_prompt: str,
+        history: List[Any],
+        message: str,
+        cached_context: Optional[str]
+    ) -> Tuple[int, int, float]:
+        """Size the prompt and work out the time to the first chunk."""
+        prompt_tokens = (
+            estimate_tokens(system_prompt)
+            + estimate_history_tokens(history)
+            + estimate_tokens(message)
+        )
+        cached_tokens = self._cached_tokens(cached_context) if cached_context else 0
+        wait = self.ttft + self.prefill * (prompt_tokens + cached_tokens / 10) / 1000
+        return prompt_tokens, cached_tokens, wait
+    
+    def _maybe_fail(self) -> None:
+        """Raise a 503 while simulated failures are left."""
+        with self._lock:
+            failing = self.failures > 0
+            self.failures -= failing
+        if failing:
+            raise BackendError("503 UNAVAILABLE: simulated overload", code=503)
+    
+    def _report_usage(
+        self,
+        usage: Optional[Dict[str, int]],
+        prompt_tokens: int,
+        cached_tokens: int
+    ) -> None:
+        """Fill usage the way the API reports it at the end of a stream."""
+        if usage is not None:
+            usage["prompt_tokens"] = prompt_tokens + cached_tokens
+            usage["output_tokens"] = estimate_tokens("".join(self.chunks))
+            if cached_tokens:
+                usage["cached_tokens"] = cached_tokens
+    
+    def generate(
+        self,
+        model: str,
+        system_prompt: str,
+        content: str,
+        thinking_budget: Optional[int] = None
+    ) -> str:
+        time.sleep(self.ttft + self.delay * max(0, len(self.chunks) - 1))
+        return "".join(self.chunks)
+    
+    def count_tokens(self, model: str, text: str) -> int:
+        return estimate_tokens(text)
+    
+    def create_context_cache(self, model: str, content: str, ttl: float) -> str:
+        tokens = estimate_tokens(content)
+        time.sleep(self.prefill * tokens / 1000)
+        digest = hashlib.sha256(content.encode("utf-8")).hexdigest()[:16]
+        return f"cachedContents/fake-{tokens}-{digest}"
+    
+    @staticmethod
+    def _cached_tokens(name: str) -> int:
+        """Read the cached size back from a name made by create_context_cache()."""
+        try:
+            prefix, tokens, _ = name.rsplit("-", 2)
+            if prefix == "cachedContents/fake":
+                return int(tokens)
+        except ValueError:
+            pass
+        raise BackendError(f"404 NOT_FOUND: unknown cached content {name}", code=404)
+
+
+def create_backend(name: str, config: "Config") -> ModelBackend:
+    """
+    Create a backend by name.
+    
+    Args:
+        name: One of BACKENDS
+        config: Application configuration
+        
+    Returns:
+        The backend
+        
+    Raises:
+        ValueError: If the name is unknown
+    """
+    if name == "gemini":
+        return GeminiBackend(lambda: config.api_key)
+    if name == "fake":
+        return FakeBackend.from_env()
+    raise ValueError(f"Unknown backend: {name} (choose from {', '.join(BACKENDS)})")
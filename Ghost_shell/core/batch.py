@@ -0,0 +1,218 @@
+"""Batch execution of many prompts from a JSONL file."""
+
+import json
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Deque, Dict, Iterator, Optional, Set
+from rich.progress import BarColumn, MofNCompleteColumn, Progress, TextColumn, TimeElapsedColumn
+
+from ..prompts import PROMPT_TEMPLATES
+from ..utils.rate_limit import RateLimiter, call_with_retries
+from ..utils.response_cache import ResponseCache
+from ..utils.tokens import estimate_tokens
+from .resilience import is_retryable
+
+if TYPE_CHECKING:
+    from .ai_model import GeminiModel
+
+
+class BatchRunner:
+    """Runs JSONL prompt records concurrently over one shared client."""
+    
+    def __init__(
+        self,
+        model: "GeminiModel",
+        concurrency: int = 4,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        retries: int = 2,
+        use_cache: bool = True
+    ):
+        self.model = model
+        self.concurrency = max(1, concurrency)
+        self.rate_limiter = RateLimiter(requests_per_minute, tokens_per_minute)
+        self.retries = max(0, retries)
+        self.use_cache = use_cache
+        self._write_lock = threading.Lock()
+    
+    @staticmethod
+    def read_records(input_path: str) -> Iterator[Dict[str, Any]]:
+        """
+        Read prompt records from a JSONL file.
+        
+        Each line is an object with "prompt", an optional "task" (command,
+        code, explain, summarize, with or without a leading slash), an
+        optional "file" and an optional "id". Records without an id are
+        identified by their line number.
+        
+        Args:
+            input_path: Path to the JSONL file
+            
+        Yields:
+            Normalized records
+        """
+        with open(input_path, "r", encoding="utf-8") as file:
+            for line_number, line in enumerate(file, 1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError as e:
+                    raise ValueError(f"{input_path}:{line_number}: invalid JSON: {e}")
+                if not isinstance(record, dict) or not record.get("prompt"):
+                    raise ValueError(f"{input_path}:{line_number}: record needs a 'prompt'")
+                
+                task_type = str(record.get("task") or "default").lstrip("/")
+                if task_type not in PROMPT_TEMPLATES:
+                    task_type = "default"
+                
+                yield {
+                    "id": str(record.get("id", line_number)),
+                    "task": task_type,
+                    "prompt": record["prompt"],
+                    "file": record.get("file"),
+                }
+    
+    @staticmethod
+    def completed_ids(output_path: str) -> Set[str]:
+        """
+        Collect ids of records that already succeeded in an output file.
+        
+        Args:
+            output_path: Path to the results JSONL file
+            
+        Returns:
+            Set of record ids to skip
+        """
+        done: Set[str] = set()
+        if not os.path.exists(output_path):
+            return done
+        
+        with open(output_path, "r", encoding="utf-8") as file:
+            for line in file:
+                try:
+                    result = json.loads(line)
+                except ValueError:
+                    # A torn last line from an interrupted run; the record is re-run
+                    continue
+                if result.get("error") is None and "id" in result:
+                    done.add(str(result["id"]))
+        return done
+    
+    def run(self, input_path: str, output_path: str) -> Dict[str, int]:
+        """
+        Process every pending record and append results as they finish.
+        
+        Args:
+            input_path: JSONL file of prompt records
+            output_path: JSONL file that results are appended to
+            
+        Returns:
+            Counts of succeeded, failed and skipped records
+        """
+        done = self.completed_ids(output_path)
+        total = sum(1 for record in self.read_records(input_path) if record["id"] not in done)
+        counts = {"succeeded": 0, "failed": 0, "skipped": 0}
+        counts_lock = threading.Lock()
+        
+        Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+        with open(output_path, "a", encoding="utf-8") as out, Progress(
+            TextColumn("[bold green]{task.description}"),
+            BarColumn(),
+            MofNCompleteColumn(),
+            TimeElapsedColumn(),
+            console=self.model.console
+        ) as progress:
+            task = progress.add_task("Batch", total=total)
+            
+            def finish(future: Future) -> None:
+                result = future.result()
+                with self._write_lock:
+                    out.write(json.dumps(result, ensure_ascii=False) + "\n")
+                    out.flush()
+                    os.fsync(out.fileno())
+                with counts_lock:
+                    counts["failed" if result["error"] else "succeeded"] += 1
+                progress.advance(task)
+            
+            in_flight: Deque[Future] = deque()
+            with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+                for record in self.read_records(input_path):
+                    if record["id"] in done:
+                        counts["skipped"] += 1
+                        continue
+                    
+                    # Keep the input iterator only slightly ahead of the workers
+                    while len(in_flight) >= self.concurrency * 2:
+                        in_flight.popleft().result()
+                    future = pool.submit(self._process, record)
+                    future.add_done_callback(finish)
+                    in_flight.append(future)
+        
+        self.model.console.print(
+            f"[green]✓ {counts['succeeded']} succeeded[/green], "
+            f"[red]{counts['failed']} failed[/red], "
+            f"[yellow]{counts['skipped']} skipped[/yellow] → {output_path}"
+        )
+        return counts
+    
+    def _process(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        """Run one record and build its result line; errors are captured, not raised."""
+        start = time.perf_counter()
+        result = dict(record, model=self.model.config.model_name, response=None, error=None)
+        
+        try:
+            content = record["prompt"]
+            system_prompt = PROMPT_TEMPLATES[record["task"]]
+            file_contents = []
+            if record["file"]:
+                # Packed and budgeted like -f, so big files are trimmed the same
+                # way and share cache entries with single requests
+                packed = self.model._read_inputs([record["file"]])
+                budgeted = self.model._budget_file(
+                    packed, record["file"], record["prompt"], system_prompt, []
+                )
+                if budgeted.needs_chunking:
+                    raise ValueError(
+                        "input exceeds the token budget; run it as a single /summarize "
+                        "request to summarize it in chunks"
+                    )
+                file_contents.append(budgeted.text)
+                content += f"\n\n{budgeted.text}"
+            
+            # Same choice a single request makes; -m pins every record to one model
+            route = self.model.route(
+                record["task"], estimate_tokens(system_prompt) + estimate_tokens(content)
+            )
+            result["model"] = route.model
+            cache_key = ResponseCache.make_key(
+                route.model,
+                record["task"],
+                system_prompt,
+                record["prompt"],
+                file_contents
+            )
+            response = self.model.cache.get(cache_key) if self.use_cache else None
+            result["cached"] = response is not None
+            
+            if response is None:
+                def request() -> str:
+                    self.rate_limiter.acquire(len(content) // 4)
+                    return self.model.complete(content, system_prompt, route=route)
+                
+                response = call_with_retries(
+                    request, attempts=self.retries + 1, retryable=is_retryable
+                )
+                if self.use_cache:
+                    self.model.cache.put(cache_key, response)
+            
+            result["response"] = response
+        except Exception as e:
+            result["error"] = str(e)
+        
+        result["duration"] = round(time.perf_counter() - start, 3)
+        return result
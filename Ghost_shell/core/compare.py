@@ -0,0 +1,247 @@
+"""Sending one prompt to several models at once and comparing them."""
+
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Union
+from rich.live import Live
+from rich.markdown import Markdown
+from rich.table import Table
+from rich.text import Text
+
+from ..prompts import PROMPT_TEMPLATES
+from ..utils.metrics import metrics
+from ..utils.tokens import estimate_tokens
+from .resilience import ResilientBackend
+
+if TYPE_CHECKING:
+    from ..utils.stdin_reader import StdinReader
+    from .ai_model import GeminiModel
+
+
+@dataclass
+class ModelRun:
+    """One model's answer to the shared prompt."""
+    
+    model: str
+    status: str = "waiting"  # waiting, streaming, done, failed, cancelled
+    started: float = 0.0
+    first_chunk: Optional[float] = None
+    ended: Optional[float] = None
+    parts: List[str] = field(default_factory=list)
+    usage: Dict[str, int] = field(default_factory=dict)
+    error: Optional[str] = None
+    
+    @property
+    def text(self) -> str:
+        """The response received so far."""
+        return "".join(self.parts)
+    
+    @property
+    def ttft(self) -> Optional[float]:
+        """Seconds until the first chunk."""
+        return self.first_chunk - self.started if self.first_chunk is not None else None
+    
+    @property
+    def latency(self) -> Optional[float]:
+        """Seconds until the stream ended."""
+        return self.ended - self.started if self.ended is not None else None
+    
+    @property
+    def output_tokens(self) -> int:
+        """Response tokens, as reported or estimated."""
+        return self.usage.get("output_tokens") or estimate_tokens(self.text)
+    
+    @property
+    def tokens_per_second(self) -> Optional[float]:
+        """Generation speed after the first chunk."""
+        if self.ended is None or self.first_chunk is None or self.ended <= self.first_chunk:
+            return None
+        return self.output_tokens / (self.ended - self.first_chunk)
+
+
+class ModelComparison:
+    """
+    Streams the same request from several models concurrently.
+    
+    Every model gets the same task template, prompt and input, sent
+    without conversation history, retries or fallback so the timings are
+    comparable. A live table follows the streams; afterwards the answers
+    are printed one after another with TTFT, total latency, tokens in and
+    out and tokens per second. With first_wins only the first model to
+    finish is shown and the others are cancelled.
+    """
+    
+    def __init__(self, model: "GeminiModel", models: Sequence[str], first_wins: bool = False):
+        self.model = model
+        self.console = model.console
+        self.models = list(dict.fromkeys(models))
+        self.first_wins = first_wins
+    
+    def run(
+        self,
+        content: str,
+        task_type: str = "default",
+        input_file: Optional[Union[str, Sequence[str]]] = None,
+        stdin: Optional["StdinReader"] = None
+    ) -> List[ModelRun]:
+        """
+        Send the request to every model and report how each did.
+        
+        Args:
+            content: The user's prompt
+            task_type: Type of task
+            input_file: Optional file, or list of files, directories and globs
+            stdin: Piped input to read as additional context
+            
+        Returns:
+            One run per model, in the order given
+        """
+        prompt = PROMPT_TEMPLATES.get(task_type, PROMPT_TEMPLATES["default"])
+        full_content = self._build_message(content, task_type, prompt, input_file, stdin)
+        input_tokens = estimate_tokens(prompt) + estimate_tokens(full_content)
+        backend = ResilientBackend(
+            self.model.backend,
+            request_timeout=self.model.config.request_timeout,
+            chunk_timeout=self.model.config.chunk_timeout,
+            first_chunk_timeout=self.model.config.first_chunk_timeout,
+            retries=0
+        )
+        
+        runs = [ModelRun(name) for name in self.models]
+        finished = threading.Event()
+        cancel = threading.Event()
+        lock = threading.Lock()
+        
+        def stream(run: ModelRun) -> None:
+            run.started = time.perf_counter()
+            run.status = "streaming"
+            status, error = "done", None
+            try:
+                for text in backend.stream_chat(run.model, prompt, [], full_content, run.usage):
+                    if cancel.is_set():
+                        break
+                    if run.first_chunk is None:
+                        run.first_chunk = time.perf_counter()
+                    run.parts.append(text)
+            except Exception as e:
+                status, error = "failed", str(e)
+            
+            with lock:
+                # Another model already won, or the user interrupted
+                if cancel.is_set():
+                    run.status = "cancelled"
+                    return
+                run.status, run.error, run.ended = status, error, time.perf_counter()
+                if self.first_wins and status == "done":
+                    cancel.set()
+                if cancel.is_set() or all(other.ended is not None for other in runs):
+                    finished.set()
+        
+        for run in runs:
+            threading.Thread(target=stream, args=(run,), daemon=True).start()
+        
+        try:
+            with Live(self._progress(runs), console=self.console, transient=True) as live:
+                while not finished.wait(0.1):
+                    live.update(self._progress(runs))
+        except KeyboardInterrupt:
+            cancel.set()
+            raise
+        
+        with lock:
+            for run in runs:
+                if run.status in ("waiting", "streaming"):
+                    run.status = "cancelled"
+        self._show(runs, input_tokens)
+        return runs
+    
+    def _build_message(
+        self,
+        content: str,
+        task_type: str,
+        prompt: str,
+        input_file: Optional[Union[str, Sequence[str]]],
+        stdin: Optional["StdinReader"]
+    ) -> str:
+        """Attach files and piped input to the prompt the way a normal request does."""
+        paths = [input_file] if isinstance(input_file, str) else list(input_file or [])
+        full_content = content
+        if paths:
+            label = ", ".join(paths)
+            budgeted = self.model._budget_file(
+                self.model._read_inputs(paths), label, content, prompt, []
+            )
+            if budgeted.needs_chunking:
+                raise ValueError(f"{label} is too large to compare; use a smaller input")
+            full_content += f"\n\n{budgeted.text}"
+        if stdin is not None:
+            full_content += self.model._read_stdin(stdin, content, task_type, prompt, [])
+        return full_content
+    
+    def _progress(self, runs: List[ModelRun]) -> Table:
+        """Live view of every stream: status, time to first chunk, size and latest line."""
+        table = Table(title="Comparing models", expand=True)
+        table.add_column("Model", no_wrap=True)
+        table.add_column("Status", no_wrap=True)
+        table.add_column("TTFT", justify="right", no_wrap=True)
+        table.add_column("Tokens", justify="right", no_wrap=True)
+        table.add_column("Latest", ratio=1, no_wrap=True, overflow="ellipsis")
+        
+        for run in runs:
+            lines = run.text.strip().splitlines()
+            table.add_row(
+                run.model,
+                run.status,
+                f"{run.ttft:.2f}s" if run.ttft is not None else "-",
+                str(estimate_tokens(run.text)),
+                Text(lines[-1] if lines else ""),
+            )
+        return table
+    
+    def _show(self, runs: List[ModelRun], input_tokens: int) -> None:
+        """Print the answers, then the comparison table."""
+        for run in runs:
+            if self.first_wins and run.status != "done":
+                continue
+            self.console.rule(f"[bold]{run.model}[/bold]")
+            if run.text:
+                self.console.print(Markdown(run.text))
+            if run.error:
+                self.console.print(f"[red]Error: {run.error}[/red]")
+        
+        table = Table(title="Model comparison")
+        table.add_column("Model")
+        table.add_column("Status")
+        table.add_column("TTFT", justify="right")
+        table.add_column("Total", justify="right")
+        table.add_column("Tokens in", justify="right")
+        table.add_column("Tokens out", justify="right")
+        table.add_column("Tok/s", justify="right")
+        
+        records = []
+        for run in runs:
+            style = {"done": "green", "failed": "red"}.get(run.status, "yellow")
+            tokens_in = run.usage.get("prompt_tokens") or input_tokens
+            table.add_row(
+                run.model,
+                f"[{style}]{run.status}[/{style}]",
+                f"{run.ttft:.2f}s" if run.ttft is not None else "-",
+                f"{run.latency:.2f}s" if run.latency is not None else "-",
+                f"{tokens_in:,}",
+                f"{run.output_tokens:,}" if run.text else "-",
+                f"{run.tokens_per_second:.1f}" if run.tokens_per_second is not None else "-",
+            )
+            records.append({
+                "model": run.model,
+                "status": run.status,
+                "ttft_ms": round(run.ttft * 1000, 2) if run.ttft is not None else None,
+                "total_ms": round(run.latency * 1000, 2) if run.latency is not None else None,
+                "input_tokens": tokens_in,
+                "output_tokens": run.output_tokens if run.text else None,
+                "tokens_per_s": (
+                    round(run.tokens_per_second, 1) if run.tokens_per_second is not None else None
+                ),
+            })
+        self.console.print(table)
+        metrics.set("compare", records)
@@ -1,18 +1,79 @@
 """Configuration management for the Terminal LLM tool."""
 
 import os
-from typing import Optional
-from dotenv import load_dotenv
+from pathlib import Path
+from typing import List, Optional
+
+from ..utils.metrics import metrics
+
+_dotenv_loaded = False
+
+
+def _load_dotenv() -> None:
+    """Load .env into the environment once per process."""
+    global _dotenv_loaded
+    if _dotenv_loaded:
+        return
+    from dotenv import load_dotenv
+    
+    with metrics.span("dotenv"):
+        load_dotenv()
+    _dotenv_loaded = True
 
 
 class Config:
     """Configuration manager for the application."""
     
     def __init__(self):
-        load_dotenv()
+        # Every GHOSTSHELL_* setting below may come from .env, not just the key
+        _load_dotenv()
         self._api_key: Optional[str] = None
         self._model_name: str = "gemini-2.5-flash"
-        self._log_file: str = "commands_history.log"
+        # Set once a model is chosen explicitly (-m), which turns off routing
+        self.model_pinned: bool = False
+        self.routing_path: Optional[str] = os.getenv("GHOSTSHELL_ROUTING")
+        self.latency_target: Optional[float] = None
+        self.backend: str = os.getenv("GHOSTSHELL_BACKEND", "gemini")
+        self._data_dir: Path = Path(
+            os.getenv("GHOSTSHELL_HOME", Path.home() / ".ghostshell")
+        ).expanduser()
+        self.cache_max_bytes: int = int(
+            os.getenv("GHOSTSHELL_CACHE_MAX_BYTES", 50 * 1024 * 1024)
+        )
+        self.cache_ttl: int = int(os.getenv("GHOSTSHELL_CACHE_TTL", 7 * 24 * 3600))
+        self.summarize_chunk_chars: int = 200_000
+        self.summarize_concurrency: int = 4
+        self.requests_per_minute: Optional[float] = None
+        self.command_timeout: float = 600
+        self.idle_timeout: float = 120
+        self.parallel_commands: int = 1
+        self.pipeline_commands: bool = False
+        self.session_token_budget: int = int(os.getenv("GHOSTSHELL_SESSION_BUDGET", 32_000))
+        self.max_input_tokens: int = int(os.getenv("GHOSTSHELL_MAX_INPUT_TOKENS", 200_000))
+        self.trim_strategies: List[str] = ["collapse", "head-tail"]
+        self.drop_pattern: Optional[str] = None
+        self.max_file_bytes: int = 1024 * 1024
+        self.stdin_max_bytes: int = 8 * 1024 * 1024
+        self.stdin_tail_bytes: Optional[int] = None
+        self.stdin_rolling_interval: Optional[float] = None
+        # How long a prompt given on the command line waits for piped input to start
+        self.stdin_probe_seconds: float = float(os.getenv("GHOSTSHELL_STDIN_WAIT", 0.5))
+        self.request_timeout: float = float(os.getenv("GHOSTSHELL_REQUEST_TIMEOUT", 300))
+        self.chunk_timeout: float = float(os.getenv("GHOSTSHELL_CHUNK_TIMEOUT", 60))
+        # Time allowed before the first chunk; unset means only request_timeout applies
+        self.first_chunk_timeout: float = float(os.getenv("GHOSTSHELL_FIRST_CHUNK_TIMEOUT", 0))
+        self.request_retries: int = 2
+        self.hedge_after: Optional[float] = None
+        self.suggest_min_score: float = float(os.getenv("GHOSTSHELL_SUGGEST_MIN_SCORE", 0.6))
+        self.replay_min_score: float = float(os.getenv("GHOSTSHELL_REPLAY_MIN_SCORE", 0.95))
+        self.context_cache: bool = True
+        self.context_cache_min_tokens: int = int(
+            os.getenv("GHOSTSHELL_CONTEXT_CACHE_MIN_TOKENS", 16_384)
+        )
+        self.context_cache_ttl: float = float(os.getenv("GHOSTSHELL_CONTEXT_CACHE_TTL", 3600))
+        self.fallback_models: List[str] = [
+            name.strip() for name in os.getenv("GHOSTSHELL_FALLBACK", "").split(",") if name.strip()
+        ]
     
     @property
     def api_key(self) -> str:
@@ -30,9 +91,40 @@ class Config:
     
     @property
     def log_file(self) -> str:
-        """Get the log file path."""
-        return self._log_file
+        """Get the command history database path."""
+        return str(self._data_dir / "history.db")
+    
+    @property
+    def data_dir(self) -> Path:
+        """Get the per-user directory for GhostShell state."""
+        return self._data_dir
+    
+    @property
+    def cache_file(self) -> str:
+        """Get the response cache database path."""
+        return str(self._data_dir / "response_cache.db")
+    
+    @property
+    def context_cache_file(self) -> Path:
+        """Get the registry of server-side context caches."""
+        return self._data_dir / "context_caches.json"
+    
+    @property
+    def sessions_dir(self) -> Path:
+        """Get the directory holding named conversation sessions."""
+        return self._data_dir / "sessions"
+    
+    @property
+    def routing_file(self) -> Path:
+        """Get the model routing policy path."""
+        return Path(self.routing_path) if self.routing_path else self._data_dir / "routing.json"
+    
+    @property
+    def socket_path(self) -> str:
+        """Get the Unix socket path used by the background daemon."""
+        return os.getenv("GHOSTSHELL_SOCKET", str(self._data_dir / "daemon.sock"))
     
     def set_model(self, model_name: str) -> None:
-        """Set the model name."""
-        self._model_name = model_name
\ No newline at end of file
+        """Set the model name, which then overrides model routing."""
+        self._model_name = model_name
+        self.model_pinned = True
\ No newline at end of file
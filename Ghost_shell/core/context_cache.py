@@ -0,0 +1,160 @@
+"""Local registry of server-side cached contexts for repeated large inputs."""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+# Entries are treated as expired this long before the server drops them, so a
+# request never races the expiry
+EXPIRY_MARGIN = 120
+
+
+class ContextCacheRegistry:
+    """
+    Remembers which large inputs have been seen and which are cached remotely.
+    
+    Entries map a content hash (per backend) to the server-side cache name,
+    the model that owns it, its expiry and when it was last used. A cache
+    can only be read by its own model, so there is one per input and
+    requests that use it go to that model. A hash seen only once
+    has no name yet: the cache is created on the second sighting, so
+    one-off inputs never pay for cache storage. The registry is a small
+    JSON file shared by concurrent gsh processes and replaced atomically.
+    """
+    
+    def __init__(self, path: Union[str, Path], max_entries: int = 32):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def key(backend: str, text: str) -> str:
+        """Hash of the input, scoped to the backend that would hold the cache."""
+        digest = hashlib.sha256()
+        for part in (backend, text):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+    
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        """Read live entries, dropping expired ones."""
+        try:
+            with open(self.path, "r", encoding="utf-8") as file:
+                entries = json.load(file)
+        except (OSError, ValueError):
+            return {}
+        now = time.time()
+        return {
+            key: entry for key, entry in entries.items()
+            if isinstance(entry, dict) and entry.get("expires", 0) - EXPIRY_MARGIN > now
+        }
+    
+    def _save(self, entries: Dict[str, Dict[str, Any]]) -> None:
+        """Write the registry atomically."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=self.path.parent, prefix=".context-caches-")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as file:
+                json.dump(entries, file)
+            os.replace(temp_path, self.path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+    
+    def get(self, key: str) -> Optional[Tuple[str, str]]:
+        """
+        Look up a live server-side cache for an input.
+        
+        Args:
+            key: Hash from key()
+            
+        Returns:
+            Tuple of (cache name, owning model), or None if the input is not cached
+        """
+        with self._lock:
+            entries = self._load()
+            entry = entries.get(key)
+            if not entry or not entry.get("name") or not entry.get("model"):
+                return None
+            entry["last_used"] = time.time()
+            self._save(entries)
+            return entry["name"], entry["model"]
+    
+    def seen(self, key: str, ttl: float) -> bool:
+        """
+        Record a sighting of an input.
+        
+        Args:
+            key: Hash from key()
+            ttl: How long the sighting counts, in seconds
+            
+        Returns:
+            Whether the input had been seen before
+        """
+        with self._lock:
+            entries = self._load()
+            if key in entries:
+                return True
+            now = time.time()
+            entries[key] = {"name": None, "expires": now + ttl, "last_used": now}
+            self._save(entries)
+            return False
+    
+    def add(self, key: str, name: str, model: str, ttl: float, tokens: int = 0) -> List[str]:
+        """
+        Register a server-side cache, evicting the least recently used ones.
+        
+        Args:
+            key: Hash from key()
+            name: Cache name returned by the backend
+            model: Model the cache was created for
+            ttl: Lifetime of the cache in seconds
+            tokens: Estimated size of the cached input
+            
+        Returns:
+            Names of evicted caches, which the caller should delete remotely
+        """
+        with self._lock:
+            entries = self._load()
+            now = time.time()
+            entries[key] = {
+                "name": name,
+                "model": model,
+                "expires": now + ttl,
+                "last_used": now,
+                "tokens": tokens,
+            }
+            evicted = []
+            while len(entries) > self.max_entries:
+                oldest = min(entries, key=lambda k: entries[k]["last_used"])
+                evicted_name = entries.pop(oldest).get("name")
+                if evicted_name:
+                    evicted.append(evicted_name)
+            self._save(entries)
+            return evicted
+    
+    def forget(self, name: str) -> None:
+        """Drop a cache the server no longer knows about."""
+        with self._lock:
+            entries = self._load()
+            kept = {key: entry for key, entry in entries.items() if entry.get("name") != name}
+            if len(kept) != len(entries):
+                self._save(kept)
+
+
+@dataclass
+class CachedContext:
+    """A request whose large input is read from a server-side cache."""
+    
+    # Cache name from ModelBackend.create_context_cache()
+    name: str
+    # The model that owns the cache, and so must answer the request
+    model: str
+    # The message to send alongside it, without the cached input
+    message: str
@@ -0,0 +1,261 @@
+"""Background daemon that keeps a warm model client and serves requests over a Unix socket."""
+
+import json
+import os
+import signal
+import socket
+import socketserver
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional
+
+from .routing import Route
+
+if TYPE_CHECKING:
+    from .ai_model import GeminiModel
+
+
+class DaemonUnavailable(ConnectionError):
+    """Raised when the daemon socket cannot be reached."""
+
+
+def _send(wfile: Any, message: Dict[str, Any]) -> None:
+    """Write one newline-delimited JSON message and flush it."""
+    wfile.write(json.dumps(message).encode("utf-8") + b"\n")
+    wfile.flush()
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """Serves a single request per connection."""
+    
+    server: "_DaemonServer"
+    
+    def handle(self) -> None:
+        line = self.rfile.readline()
+        if not line:
+            return
+        
+        try:
+            request = json.loads(line)
+        except ValueError:
+            _send(self.wfile, {"type": "error", "message": "Malformed request"})
+            return
+        
+        action = request.get("type")
+        if action == "ping":
+            _send(self.wfile, {"type": "pong", "pid": os.getpid()})
+            return
+        
+        if action == "shutdown":
+            _send(self.wfile, {"type": "done"})
+            threading.Thread(target=self.server.shutdown, daemon=True).start()
+            return
+        
+        if action != "generate":
+            _send(self.wfile, {"type": "error", "message": f"Unknown request: {action}"})
+            return
+        
+        route = None
+        if request.get("model"):
+            route = Route(
+                request["model"],
+                request.get("thinking_budget"),
+                first_chunk_timeout=request.get("first_chunk_timeout")
+            )
+        
+        try:
+            usage: Dict[str, int] = {}
+            chunks = self.server.model.stream_text(
+                request["content"],
+                request["system_prompt"],
+                request.get("model"),
+                # Requests are stateless: the daemon's model never keeps a conversation
+                history=request.get("history") or [],
+                usage=usage,
+                route=route
+            )
+            for text in chunks:
+                _send(self.wfile, {"type": "chunk", "text": text})
+            _send(self.wfile, {"type": "done", "usage": usage})
+        except (BrokenPipeError, ConnectionResetError):
+            # Client went away mid-stream; nothing left to report
+            pass
+        except Exception as e:
+            try:
+                _send(self.wfile, {"type": "error", "message": str(e)})
+            except OSError:
+                pass
+
+
+if hasattr(socketserver, "UnixStreamServer"):
+    
+    class _DaemonServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        """Threaded Unix socket server holding the shared model."""
+        
+        daemon_threads = True
+        
+        def __init__(self, socket_path: str, model: "GeminiModel"):
+            self.model = model
+            super().__init__(socket_path, _RequestHandler)
+
+
+class GhostShellDaemon:
+    """Runs a long-lived GeminiModel behind a local Unix socket."""
+    
+    def __init__(self, model: "GeminiModel", socket_path: str):
+        self.model = model
+        self.socket_path = Path(socket_path)
+    
+    def serve_forever(self) -> None:
+        """
+        Bind the socket and serve requests until shutdown or SIGTERM.
+        
+        Raises:
+            RuntimeError: If Unix sockets are unsupported or a daemon is already running
+        """
+        if not hasattr(socketserver, "UnixStreamServer"):
+            raise RuntimeError("The daemon requires Unix domain socket support")
+        
+        if DaemonClient.connect(str(self.socket_path)) is not None:
+            raise RuntimeError(f"A daemon is already running on {self.socket_path}")
+        
+        self.socket_path.parent.mkdir(parents=True, exist_ok=True)
+        if self.socket_path.exists():
+            # Stale socket left behind by a daemon that did not shut down cleanly
+            self.socket_path.unlink()
+        
+        self._warm_up()
+        
+        old_umask = os.umask(0o077)
+        try:
+            server = _DaemonServer(str(self.socket_path), self.model)
+        finally:
+            os.umask(old_umask)
+        
+        def _terminate(signum: int, frame: Any) -> None:
+            threading.Thread(target=server.shutdown, daemon=True).start()
+        
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGTERM, _terminate)
+        
+        self.model.console.print(
+            f"[green]✓ GhostShell daemon listening on {self.socket_path} (pid {os.getpid()})[/green]"
+        )
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            if self.socket_path.exists():
+                self.socket_path.unlink()
+            self.model.console.print("[yellow]GhostShell daemon stopped.[/yellow]")
+    
+    def _warm_up(self) -> None:
+        """Create the client and open a connection so the first request skips TLS setup."""
+        try:
+            self.model.backend.warm_up(self.model.config.model_name)
+        except Exception as e:
+            self.model.console.print(f"[yellow]Warning: Could not warm up client: {e}[/yellow]")
+
+
+class DaemonClient:
+    """Thin client that forwards requests to a running GhostShell daemon."""
+    
+    def __init__(self, socket_path: str, timeout: float = 300.0):
+        self.socket_path = socket_path
+        self.timeout = timeout
+    
+    @classmethod
+    def connect(cls, socket_path: str) -> Optional["DaemonClient"]:
+        """
+        Return a client if a daemon answers on the socket, otherwise None.
+        
+        Args:
+            socket_path: Path of the daemon's Unix socket
+        """
+        if not hasattr(socket, "AF_UNIX") or not os.path.exists(socket_path):
+            return None
+        
+        replies = cls(socket_path, timeout=1.0)._request({"type": "ping"})
+        try:
+            reply = next(replies, None)
+        except (OSError, ValueError, RuntimeError):
+            return None
+        finally:
+            replies.close()
+        
+        if not reply or reply.get("type") != "pong":
+            return None
+        return cls(socket_path)
+    
+    def _request(self, message: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """Send a request and yield reply messages until the connection closes."""
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            try:
+                sock.connect(self.socket_path)
+                sock.sendall(json.dumps(message).encode("utf-8") + b"\n")
+            except OSError as e:
+                raise DaemonUnavailable(str(e))
+            
+            with sock.makefile("rb") as reader:
+                for line in reader:
+                    reply = json.loads(line)
+                    if reply.get("type") == "error":
+                        raise RuntimeError(reply.get("message", "Daemon error"))
+                    yield reply
+        finally:
+            sock.close()
+    
+    def stream(
+        self,
+        content: str,
+        system_prompt: str,
+        model_name: str,
+        history: Optional[List[Any]] = None,
+        usage: Optional[Dict[str, int]] = None,
+        thinking_budget: Optional[int] = None,
+        first_chunk_timeout: Optional[float] = None
+    ) -> Iterator[str]:
+        """
+        Stream a response generated by the daemon.
+        
+        Args:
+            content: Message text including any file content
+            system_prompt: System instruction for the task
+            model_name: Model the daemon should use
+            history: Earlier turns as plain dicts; the daemon keeps none of
+                its own, so requests without history are independent
+            usage: Dictionary that receives the token counts the daemon reports
+            thinking_budget: Reasoning token budget, or None for the model default
+            first_chunk_timeout: The route's own first-chunk budget, if any
+            
+        Yields:
+            Text chunks of the response
+        """
+        request = {
+            "type": "generate",
+            "content": content,
+            "system_prompt": system_prompt,
+            "model": model_name,
+        }
+        if history is not None:
+            request["history"] = history
+        if thinking_budget is not None:
+            request["thinking_budget"] = thinking_budget
+        if first_chunk_timeout is not None:
+            request["first_chunk_timeout"] = first_chunk_timeout
+        for reply in self._request(request):
+            if reply["type"] == "chunk":
+                yield reply["text"]
+            elif reply["type"] == "done":
+                if usage is not None:
+                    usage.update(reply.get("usage") or {})
+                return
+    
+    def shutdown(self) -> None:
+        """Ask the daemon to stop."""
+        for _ in self._request({"type": "shutdown"}):
+            pass
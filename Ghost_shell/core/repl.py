@@ -0,0 +1,227 @@
+"""Interactive prompt that keeps one model, client and chat per task across turns."""
+
+import shlex
+import threading
+from typing import Any, Callable, Dict, List, Optional, TYPE_CHECKING
+
+from ..prompts import PROMPT_TEMPLATES
+from ..utils.command_parser import extract_commands
+
+if TYPE_CHECKING:
+    from .ai_model import GeminiModel
+
+HELP = """\
+[bold]/command, /code, /explain, /summarize, /default[/bold]  switch task; text after it is sent
+[bold]/file PATH...[/bold]   attach files, directories or globs to the next message
+[bold]/run [N...][/bold]     run the commands from the last reply (or only the numbered ones)
+[bold]/reset[/bold]          start the current task's chat over
+[bold]/help[/bold]           show this help
+[bold]/exit[/bold]           leave (or Ctrl-D)"""
+
+
+class Repl:
+    """
+    Read-eval-print loop over one long-lived GeminiModel.
+    
+    The process, SDK import and client (with its open connection) are set
+    up once, so a turn costs only the model's own time. Each task keeps
+    its own conversation: switching from /code to /command and back picks
+    the /code chat up where it was left. Lines are edited with readline,
+    whose history is kept in the GhostShell data directory.
+    """
+    
+    def __init__(
+        self,
+        model: "GeminiModel",
+        task_type: str = "default",
+        auto_execute: bool = False,
+        use_cache: bool = True
+    ):
+        self.model = model
+        self.console = model.console
+        self.task_type = task_type
+        self.auto_execute = auto_execute
+        self.use_cache = use_cache
+        # Conversation per task, swapped in as the model's history
+        self.chats: Dict[str, List[Any]] = {}
+        self.attached: List[str] = []
+        self.commands: List[str] = []
+        self._last_prompt: Optional[str] = None
+        self._history_file = model.config.data_dir / "repl_history"
+        self._readline: Any = None
+        self._handlers: Dict[str, Callable[[str], bool]] = {
+            "/file": self._attach,
+            "/run": self._run,
+            "/reset": self._reset,
+            "/help": self._help,
+            "/exit": self._exit,
+            "/quit": self._exit,
+        }
+    
+    def run(self) -> None:
+        """Read and answer prompts until /exit or end of input."""
+        self._setup_readline()
+        # Connect while the user types the first prompt
+        threading.Thread(target=self._warm_up, daemon=True).start()
+        self.console.print(
+            f"[bold]GhostShell[/bold] interactive mode ([cyan]{self.task_type}[/cyan]). "
+            "Type /help for commands."
+        )
+        try:
+            while True:
+                try:
+                    line = input(f"gsh:{self.task_type}> ").strip()
+                except KeyboardInterrupt:
+                    print()
+                    continue
+                except EOFError:
+                    print()
+                    break
+                if line and not self.handle(line):
+                    break
+        finally:
+            self._save_readline()
+    
+    def handle(self, line: str) -> bool:
+        """
+        Answer one input line.
+        
+        Args:
+            line: A prompt or a slash command
+            
+        Returns:
+            False once the loop should stop
+        """
+        if line.startswith("/"):
+            name, _, rest = line.partition(" ")
+            if name[1:] in PROMPT_TEMPLATES:
+                self.task_type = name[1:]
+                if not rest.strip():
+                    self.console.print(f"[dim]Switched to {self.task_type}[/dim]")
+                    return True
+                line = rest.strip()
+            elif name in self._handlers:
+                return self._handlers[name](rest.strip())
+            else:
+                self.console.print(f"[yellow]Unknown command {name}; type /help[/yellow]")
+                return True
+        
+        self._send(line)
+        return True
+    
+    def _send(self, prompt: str) -> None:
+        """Send a prompt on the current task's chat."""
+        self.model.history = self.chats.setdefault(self.task_type, [])
+        files, self.attached = self.attached, []
+        is_command = self.task_type == "command"
+        try:
+            response = self.model.generate_response(
+                content=prompt,
+                task_type=self.task_type,
+                input_file=files or None,
+                auto_execute=self.auto_execute,
+                use_cache=self.use_cache,
+                execute=self.auto_execute
+            )
+        except KeyboardInterrupt:
+            self.console.print("\n[yellow]Cancelled[/yellow]")
+            return
+        
+        if is_command and response:
+            self.commands = extract_commands(response)
+            self._last_prompt = prompt
+            if self.commands and not self.auto_execute:
+                self.console.print(
+                    f"[dim]{len(self.commands)} command(s) found; /run to execute them[/dim]"
+                )
+    
+    def _attach(self, argument: str) -> bool:
+        """Queue files for the next message."""
+        try:
+            paths = shlex.split(argument)
+        except ValueError as e:
+            self.console.print(f"[red]Error: {e}[/red]")
+            return True
+        if not paths:
+            if self.attached:
+                self.console.print(f"Attached: {', '.join(self.attached)}")
+            else:
+                self.console.print("[dim]Usage: /file PATH... (sent with the next message)[/dim]")
+            return True
+        self.attached.extend(paths)
+        self.console.print(f"[dim]Attached {', '.join(paths)} to the next message[/dim]")
+        return True
+    
+    def _run(self, argument: str) -> bool:
+        """Run the commands extracted from the last /command reply."""
+        if not self.commands:
+            self.console.print("[yellow]No commands to run; ask with /command first.[/yellow]")
+            return True
+        commands = self.commands
+        if argument:
+            try:
+                commands = [self.commands[int(number) - 1] for number in argument.split()]
+            except (ValueError, IndexError):
+                self.console.print(f"[red]Error: choose numbers from 1 to {len(self.commands)}[/red]")
+                return True
+        try:
+            self.model.executor.run_commands(commands, True, self._last_prompt)
+        except KeyboardInterrupt:
+            self.console.print("\n[yellow]Cancelled[/yellow]")
+        return True
+    
+    def _reset(self, argument: str) -> bool:
+        """Forget the current task's conversation."""
+        self.chats.pop(self.task_type, None)
+        self.console.print(f"[dim]Started a new {self.task_type} chat[/dim]")
+        return True
+    
+    def _help(self, argument: str) -> bool:
+        """List the slash commands."""
+        self.console.print(HELP)
+        return True
+    
+    def _exit(self, argument: str) -> bool:
+        """Stop the loop."""
+        return False
+    
+    def _warm_up(self) -> None:
+        """Create the client and open a connection ahead of the first turn."""
+        try:
+            self.model.backend.warm_up(self.model.config.model_name)
+        except Exception:
+            # The first request reports any real problem
+            pass
+    
+    def _setup_readline(self) -> None:
+        """Enable line editing, persistent history and slash-command completion."""
+        try:
+            import readline
+        except ImportError:
+            return
+        
+        self._readline = readline
+        words = sorted(["/" + task for task in PROMPT_TEMPLATES] + list(self._handlers))
+        
+        def complete(text: str, state: int) -> Optional[str]:
+            matches = [word for word in words if word.startswith(text)]
+            return matches[state] if state < len(matches) else None
+        
+        readline.set_completer(complete)
+        readline.set_completer_delims(" \t\n")
+        readline.parse_and_bind("tab: complete")
+        readline.set_history_length(1000)
+        try:
+            readline.read_history_file(str(self._history_file))
+        except OSError:
+            pass
+    
+    def _save_readline(self) -> None:
+        """Keep the line history for the next session."""
+        if self._readline is None:
+            return
+        try:
+            self._history_file.parent.mkdir(parents=True, exist_ok=True)
+            self._readline.write_history_file(str(self._history_file))
+        except OSError:
+            pass
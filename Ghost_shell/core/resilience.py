@@ -0,0 +1,277 @@
+"""Deadlines, retries, hedging and model fallback around streaming requests."""
+
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from ..utils.metrics import metrics
+from ..utils.rate_limit import backoff_delay
+from .backends import ModelBackend
+
+# HTTP statuses worth retrying: timeouts, rate limits and server overload
+RETRYABLE_CODES = frozenset({408, 429, 500, 502, 503, 504})
+
+# Markers of retryable failures in errors that carry no status code
+_RETRYABLE_NAMES = ("Timeout", "Connect", "Network", "RemoteProtocol")
+_RETRYABLE_TEXT = ("RESOURCE_EXHAUSTED", "UNAVAILABLE", "DEADLINE_EXCEEDED")
+
+
+class StreamTimeout(Exception):
+    """A request produced no output within its deadline."""
+
+
+def is_retryable(error: BaseException) -> bool:
+    """
+    Decide whether a failed request is worth sending again.
+    
+    Args:
+        error: The exception raised by the backend
+        
+    Returns:
+        True for deadlines, rate limits, overload and connection failures
+    """
+    if isinstance(error, (StreamTimeout, TimeoutError, ConnectionError)):
+        return True
+    code = getattr(error, "code", None)
+    if isinstance(code, int):
+        return code in RETRYABLE_CODES
+    if any(marker in cls.__name__ for cls in type(error).__mro__ for marker in _RETRYABLE_NAMES):
+        return True
+    return any(marker in str(error) for marker in _RETRYABLE_TEXT)
+
+
+class _Attempt:
+    """One in-flight streaming request, read on its own thread."""
+    
+    def __init__(self, number: int, model: str):
+        self.number = number
+        self.model = model
+        self.started = time.monotonic()
+        self.usage: Dict[str, int] = {}
+        self.cancelled = False
+        # Whether a second request runs alongside, and whether this is that one
+        self.hedged = False
+        self.is_hedge = False
+
+
+class ResilientBackend(ModelBackend):
+    """
+    Wraps a backend so streaming requests survive stalls and transient errors.
+    
+    Each attempt must deliver its first chunk within first_chunk_timeout
+    seconds (by default only request_timeout applies, since large requests
+    can take minutes to start), go no longer than chunk_timeout between
+    later chunks and finish within request_timeout. Before any text
+    has been shown, a timed-out or retryable failure is retried after an
+    exponential backoff with jitter; once an attempt's retries are used up
+    the next fallback model is tried. With hedge_after set, a second
+    identical request is sent when the first has not produced anything in
+    that many seconds, and whichever streams first is kept. Once text has
+    been yielded the request cannot be replayed, so later failures raise.
+    
+    Outcomes are reported through notify and recorded in the run metrics.
+    """
+    
+    def __init__(
+        self,
+        backend: ModelBackend,
+        request_timeout: Optional[float] = 300,
+        chunk_timeout: Optional[float] = 60,
+        first_chunk_timeout: Optional[float] = None,
+        retries: int = 2,
+        hedge_after: Optional[float] = None,
+        fallback_models: Sequence[str] = (),
+        notify: Optional[Callable[[str], None]] = None
+    ):
+        self.backend = backend
+        self.name = backend.name
+        self.supports_context_cache = backend.supports_context_cache
+        self.request_timeout = request_timeout or None
+        self.chunk_timeout = chunk_timeout or None
+        self.first_chunk_timeout = first_chunk_timeout or None
+        self.retries = max(0, retries)
+        self.hedge_after = hedge_after or None
+        self.fallback_models = list(fallback_models)
+        self.notify = notify or (lambda message: None)
+    
+    def _schedule(self, model: str, fallback: bool = True) -> Iterator[Tuple[str, float]]:
+        """Yield (model, delay before sending) for every attempt allowed."""
+        models = [model]
+        if fallback:
+            models += [name for name in self.fallback_models if name != model]
+        for name in models:
+            for attempt in range(self.retries + 1):
+                yield name, backoff_delay(attempt - 1) if attempt else 0.0
+    
+    def _deadline(self, attempt: _Attempt, last_chunk: Optional[float]) -> float:
+        """Time by which the attempt must produce its next chunk."""
+        deadline = float("inf")
+        if self.request_timeout:
+            deadline = attempt.started + self.request_timeout
+        if last_chunk is None:
+            if self.first_chunk_timeout:
+                deadline = min(deadline, attempt.started + self.first_chunk_timeout)
+        elif self.chunk_timeout:
+            deadline = min(deadline, last_chunk + self.chunk_timeout)
+        return deadline
+    
+    def stream_chat(
+        self,
+        model: str,
+        system_prompt: str,
+        history: List[Any],
+        message: str,
+        usage: Optional[Dict[str, int]] = None,
+        thinking_budget: Optional[int] = None,
+        cached_context: Optional[str] = None
+    ) -> Iterator[str]:
+        events: "queue.Queue[Tuple[_Attempt, str, Any]]" = queue.Queue()
+        # A context cache belongs to one model, so its requests cannot fall back
+        schedule = self._schedule(model, fallback=not cached_context)
+        running: List[_Attempt] = []
+        launched = [0]
+        
+        def pump(attempt: _Attempt) -> None:
+            try:
+                # Thinking budgets are model-specific, so fallback models use their default
+                budget = thinking_budget if attempt.model == model else None
+                for text in self.backend.stream_chat(
+                    attempt.model,
+                    system_prompt,
+                    history,
+                    message,
+                    attempt.usage,
+                    budget,
+                    cached_context
+                ):
+                    if attempt.cancelled:
+                        return
+                    events.put((attempt, "chunk", text))
+                events.put((attempt, "done", None))
+            except Exception as e:
+                events.put((attempt, "error", e))
+        
+        def launch(name: str) -> _Attempt:
+            launched[0] += 1
+            attempt = _Attempt(launched[0], name)
+            running.append(attempt)
+            # Daemon threads, because an abandoned request may never return
+            threading.Thread(target=pump, args=(attempt,), daemon=True).start()
+            return attempt
+        
+        def recover(attempt: _Attempt, error: BaseException) -> None:
+            """Start the next attempt after a failure, or raise when none is left."""
+            running.remove(attempt)
+            attempt.cancelled = True
+            if running:
+                self.notify(f"Request {attempt.number} failed ({error}); waiting for the other request")
+                return
+            if not is_retryable(error):
+                raise error
+            following = next(schedule, None)
+            if following is None:
+                raise error
+            name, delay = following
+            if name != attempt.model:
+                self.notify(f"{attempt.model} failed ({error}); falling back to {name}")
+            else:
+                self.notify(f"Request failed ({error}); retrying in {delay:.1f}s")
+            time.sleep(delay)
+            launch(name)
+        
+        launch(next(schedule)[0])
+        winner: Optional[_Attempt] = None
+        last_chunk: Optional[float] = None
+        try:
+            while True:
+                if winner is not None:
+                    deadline = self._deadline(winner, last_chunk)
+                else:
+                    deadline = min(self._deadline(attempt, None) for attempt in running)
+                    if self.hedge_after and len(running) == 1 and not running[0].hedged:
+                        deadline = min(deadline, running[0].started + self.hedge_after)
+                timeout = None if deadline == float("inf") else max(0.0, deadline - time.monotonic())
+                
+                try:
+                    attempt, kind, payload = events.get(timeout=timeout)
+                except queue.Empty:
+                    now = time.monotonic()
+                    if winner is not None:
+                        if now < self._deadline(winner, last_chunk):
+                            continue
+                        waited = now - (last_chunk or winner.started)
+                        raise StreamTimeout(f"No response for {waited:.1f}s; stream stalled")
+                    expired = [attempt for attempt in running if self._deadline(attempt, None) <= now]
+                    for attempt in expired:
+                        waited = now - attempt.started
+                        recover(attempt, StreamTimeout(f"no response after {waited:.1f}s"))
+                    if (
+                        not expired
+                        and self.hedge_after
+                        and len(running) == 1
+                        and not running[0].hedged
+                        and now >= running[0].started + self.hedge_after
+                    ):
+                        first = running[0]
+                        first.hedged = True
+                        hedge = launch(first.model)
+                        hedge.hedged = hedge.is_hedge = True
+                        metrics.set("hedged", True)
+                        self.notify(
+                            f"No response after {now - first.started:.1f}s; sent a hedged request"
+                        )
+                    continue
+                
+                if attempt.cancelled or (winner is not None and attempt is not winner):
+                    continue
+                if kind == "chunk":
+                    if winner is None:
+                        winner = attempt
+                        for other in running:
+                            if other is not attempt:
+                                other.cancelled = True
+                        if attempt.hedged:
+                            won = "hedged" if attempt.is_hedge else "original"
+                            metrics.set("hedge_winner", won)
+                            self.notify(f"The {won} request answered first")
+                    last_chunk = time.monotonic()
+                    yield payload
+                elif kind == "done":
+                    if winner is None:
+                        winner = attempt
+                    if usage is not None:
+                        usage.update(attempt.usage)
+                    return
+                elif winner is attempt:
+                    # Text was already shown, so the request cannot be replayed
+                    raise payload
+                else:
+                    recover(attempt, payload)
+        finally:
+            for attempt in running:
+                attempt.cancelled = True
+            metrics.set("attempts", launched[0])
+            if winner is not None:
+                metrics.set("model_used", winner.model)
+    
+    def generate(
+        self,
+        model: str,
+        system_prompt: str,
+        content: str,
+        thinking_budget: Optional[int] = None
+    ) -> str:
+        return self.backend.generate(model, system_prompt, content, thinking_budget)
+    
+    def count_tokens(self, model: str, text: str) -> int:
+        return self.backend.count_tokens(model, text)
+    
+    def warm_up(self, model: str) -> None:
+        self.backend.warm_up(model)
+    
+    def create_context_cache(self, model: str, content: str, ttl: float) -> str:
+        return self.backend.create_context_cache(model, content, ttl)
+    
+    def delete_context_cache(self, name: str) -> None:
+        self.backend.delete_context_cache(name)
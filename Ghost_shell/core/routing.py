@@ -0,0 +1,164 @@
+"""Choosing a model per request from the task, input size and latency target."""
+
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+DEFAULT_MODEL = "gemini-2.5-flash"
+
+# Used when no routing file exists. Each rule may set "task" (a name or a
+# list), "min_tokens", "max_tokens" and "max_latency" (matches when the
+# latency target in seconds is at most this); the first match wins. Besides
+# "model" and "thinking_budget", a rule may set "first_chunk_timeout": the
+# seconds its requests may wait for the first chunk even when a shorter
+# --first-chunk-timeout is configured.
+DEFAULT_RULES: List[Dict[str, Any]] = [
+    {
+        "name": "short-command",
+        "task": "command",
+        "max_tokens": 2_000,
+        "model": "gemini-2.5-flash-lite",
+        "thinking_budget": 0,
+    },
+    {
+        "name": "large-job",
+        "task": ["code", "summarize"],
+        "min_tokens": 50_000,
+        "model": "gemini-2.5-pro",
+        # Reading a large input before answering takes pro minutes, not seconds
+        "first_chunk_timeout": 240,
+    },
+    {
+        "name": "low-latency",
+        "max_latency": 5,
+        "model": DEFAULT_MODEL,
+        "thinking_budget": 0,
+    },
+]
+
+
+@dataclass
+class Route:
+    """The model and settings chosen for one request."""
+    
+    model: str
+    thinking_budget: Optional[int] = None
+    # Name of the rule that matched: "default", "pinned" (-m) or the rule's name
+    rule: str = "default"
+    # Least time the first chunk is allowed, whatever the configured deadline
+    first_chunk_timeout: Optional[float] = None
+    
+    def first_chunk_deadline(self, configured: Optional[float]) -> Optional[float]:
+        """
+        Seconds to wait for the first chunk of a request on this route.
+        
+        Args:
+            configured: The configured first-chunk timeout; 0 or None for none
+            
+        Returns:
+            The longer of the two, or None when there is no limit
+        """
+        if not configured:
+            return None
+        return max(configured, self.first_chunk_timeout or 0)
+
+
+class ModelRouter:
+    """
+    Picks a model from an ordered list of rules.
+    
+    A routing file is JSON of the form
+    {"default": "gemini-2.5-flash", "rules": [{"task": "command",
+    "max_tokens": 2000, "model": "gemini-2.5-flash-lite",
+    "thinking_budget": 0}, ...]}, using the rule fields of DEFAULT_RULES.
+    """
+    
+    def __init__(
+        self,
+        rules: Optional[List[Dict[str, Any]]] = None,
+        default_model: str = DEFAULT_MODEL
+    ):
+        self.rules = DEFAULT_RULES if rules is None else rules
+        self.default_model = default_model
+        for index, rule in enumerate(self.rules):
+            if not isinstance(rule, dict) or not rule.get("model"):
+                raise ValueError(f"Routing rule {index + 1} needs a model")
+    
+    @classmethod
+    def from_file(cls, path: Union[str, Path], required: bool = False) -> "ModelRouter":
+        """
+        Load rules from a JSON routing file.
+        
+        Args:
+            path: Routing file
+            required: Raise if the file is missing instead of using the defaults
+            
+        Returns:
+            The router
+            
+        Raises:
+            FileNotFoundError: If the file is missing and required
+            ValueError: If the file is malformed
+        """
+        try:
+            with open(path, "r", encoding="utf-8") as file:
+                data = json.load(file)
+        except FileNotFoundError:
+            if required:
+                raise FileNotFoundError(f"Routing file not found: {path}") from None
+            return cls()
+        
+        if not isinstance(data, dict):
+            raise ValueError(f"{path}: expected an object with 'rules' and 'default'")
+        return cls(data.get("rules"), data.get("default") or DEFAULT_MODEL)
+    
+    def route(
+        self,
+        task_type: str,
+        input_tokens: int,
+        latency_target: Optional[float] = None
+    ) -> Route:
+        """
+        Choose the model for a request.
+        
+        Args:
+            task_type: Task name from PROMPT_TEMPLATES
+            input_tokens: Estimated tokens of the whole request
+            latency_target: Desired response time in seconds, if any
+            
+        Returns:
+            The matching rule's route, or the default model
+        """
+        for index, rule in enumerate(self.rules):
+            if self._matches(rule, task_type, input_tokens, latency_target):
+                return Route(
+                    rule["model"],
+                    rule.get("thinking_budget"),
+                    rule.get("name") or f"rule {index + 1}",
+                    rule.get("first_chunk_timeout")
+                )
+        return Route(self.default_model)
+    
+    @staticmethod
+    def _matches(
+        rule: Dict[str, Any],
+        task_type: str,
+        input_tokens: int,
+        latency_target: Optional[float]
+    ) -> bool:
+        """Check every condition the rule sets."""
+        tasks = rule.get("task")
+        if tasks is not None:
+            if isinstance(tasks, str):
+                tasks = [tasks]
+            if task_type not in tasks:
+                return False
+        if "min_tokens" in rule and input_tokens < rule["min_tokens"]:
+            return False
+        if "max_tokens" in rule and input_tokens > rule["max_tokens"]:
+            return False
+        if "max_latency" in rule:
+            if latency_target is None or latency_target > rule["max_latency"]:
+                return False
+        return True
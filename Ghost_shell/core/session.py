@@ -0,0 +1,203 @@
+"""Persistent named conversations with a bounded token budget."""
+
+import gzip
+import json
+import os
+import re
+import tempfile
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from ..utils.tokens import estimate_tokens
+
+SESSION_NAME_PATTERN = re.compile(r"^[\w.-]{1,64}$")
+
+SUMMARY_INSTRUCTION = (
+    "Below is an earlier summary of a conversation followed by the turns that came "
+    "after it. Write one updated summary that keeps facts, decisions, file names, "
+    "commands and open questions needed to continue the conversation. Be concise "
+    "and do not add an introduction."
+)
+
+# Serialized role names; short keys keep session files small
+_ROLE_CODES = {"user": "u", "model": "m"}
+_CODE_ROLES = {code: role for role, code in _ROLE_CODES.items()}
+
+
+@dataclass
+class Session:
+    """A named conversation: a running summary plus the most recent turns."""
+    
+    name: str
+    summary: str = ""
+    # (role, text) pairs, alternating user and model
+    turns: List[List[str]] = field(default_factory=list)
+    
+    def tokens(self) -> int:
+        """Estimate the tokens this session adds to every request."""
+        return estimate_tokens(self.summary) + sum(estimate_tokens(text) for _, text in self.turns)
+    
+    def history(self) -> List[Dict[str, Any]]:
+        """
+        Build chat history in the form accepted by the Gemini SDK.
+        
+        Returns:
+            History entries, starting with the summary when there is one
+        """
+        history = []
+        if self.summary:
+            history.append({
+                "role": "user",
+                "parts": [{"text": f"Summary of our conversation so far:\n{self.summary}"}]
+            })
+            history.append({"role": "model", "parts": [{"text": "Understood."}]})
+        for role, text in self.turns:
+            history.append({"role": role, "parts": [{"text": text}]})
+        return history
+    
+    def add_exchange(self, user_text: str, model_text: str) -> None:
+        """Append one user message and the model's reply."""
+        self.turns.append(["user", user_text])
+        self.turns.append(["model", model_text])
+    
+    def compact(
+        self,
+        budget: int,
+        summarize: Optional[Callable[[str], str]] = None
+    ) -> int:
+        """
+        Fold the oldest exchanges into the summary once the session exceeds its budget.
+        
+        Compaction shrinks the session to about half the budget, so it runs
+        once every several requests rather than on each one. The newest
+        exchange is always kept verbatim.
+        
+        Args:
+            budget: Maximum estimated tokens for the summary and turns
+            summarize: Callable that condenses text into a summary; when it
+                is missing or fails, the old turns are simply dropped
+                
+        Returns:
+            Number of exchanges removed from the turn list
+        """
+        if budget <= 0 or self.tokens() <= budget:
+            return 0
+        
+        # Keep whole exchanges, newest first, until half the budget is used
+        keep_from = len(self.turns) - 2
+        used = sum(estimate_tokens(text) for _, text in self.turns[keep_from:])
+        while keep_from >= 2:
+            size = sum(estimate_tokens(text) for _, text in self.turns[keep_from - 2:keep_from])
+            if used + size > budget // 2:
+                break
+            used += size
+            keep_from -= 2
+        
+        dropped, self.turns = self.turns[:keep_from], self.turns[keep_from:]
+        if not dropped:
+            return 0
+        
+        if summarize is not None:
+            transcript = "\n\n".join(f"{role.upper()}: {text}" for role, text in dropped)
+            try:
+                summary = summarize(
+                    f"Earlier summary:\n{self.summary or '(none)'}\n\nLater turns:\n{transcript}"
+                )
+                if summary.strip():
+                    self.summary = summary.strip()
+            except Exception:
+                # The turns are dropped regardless so the session stays within budget
+                pass
+        return len(dropped) // 2
+
+
+class SessionStore:
+    """Stores sessions as gzip-compressed JSON files in one directory."""
+    
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+    
+    def path(self, name: str) -> Path:
+        """
+        Get the file path for a session.
+        
+        Raises:
+            ValueError: If the name contains characters other than letters,
+                digits, '.', '-' and '_'
+        """
+        if not SESSION_NAME_PATTERN.match(name) or name.startswith("."):
+            raise ValueError(f"Invalid session name: {name!r}")
+        return self.directory / f"{name}.json.gz"
+    
+    def load(self, name: str) -> Session:
+        """
+        Load a session, or start an empty one if it does not exist yet.
+        
+        Args:
+            name: Session name
+            
+        Returns:
+            The session
+        """
+        path = self.path(name)
+        if not path.exists():
+            return Session(name)
+        
+        with gzip.open(path, "rt", encoding="utf-8") as file:
+            data = json.load(file)
+        return Session(
+            name,
+            summary=data.get("summary", ""),
+            turns=[[_CODE_ROLES.get(code, code), text] for code, text in data.get("turns", [])]
+        )
+    
+    def save(self, session: Session) -> None:
+        """
+        Write a session atomically, so an interrupted save never corrupts it.
+        
+        Args:
+            session: Session to store
+        """
+        path = self.path(session.name)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = {
+            "v": 1,
+            "updated": int(time.time()),
+            "summary": session.summary,
+            "turns": [[_ROLE_CODES.get(role, role), text] for role, text in session.turns],
+        }
+        fd, tmp_path = tempfile.mkstemp(dir=str(path.parent), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb", mtime=0) as file:
+                file.write(json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    
+    def delete(self, name: str) -> bool:
+        """
+        Delete a stored session.
+        
+        Args:
+            name: Session name
+            
+        Returns:
+            True if a session was deleted
+        """
+        path = self.path(name)
+        if not path.exists():
+            return False
+        path.unlink()
+        return True
+    
+    def names(self) -> List[str]:
+        """List stored session names, most recently used first."""
+        if not self.directory.exists():
+            return []
+        paths = sorted(
+            self.directory.glob("*.json.gz"), key=lambda p: p.stat().st_mtime, reverse=True
+        )
+        return [p.name[:-len(".json.gz")] for p in paths]
@@ -0,0 +1,179 @@
+"""Map-reduce summarization for inputs larger than the model context."""
+
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Callable, Deque, Dict, Iterable, List, Optional, Tuple
+from rich.progress import BarColumn, MofNCompleteColumn, Progress, TextColumn, TimeElapsedColumn
+
+from ..prompts import PROMPT_TEMPLATES
+from ..utils.rate_limit import RateLimiter, call_with_retries
+from .resilience import is_retryable
+
+if TYPE_CHECKING:
+    from .ai_model import GeminiModel
+
+
+MAP_INSTRUCTION = (
+    "This is part {index} of a larger document. Summarize this part on its own, "
+    "keeping key facts, numbers, names and errors. Do not add an introduction."
+)
+
+REDUCE_INSTRUCTION = (
+    "These are summaries of consecutive parts of one document. Merge them into a "
+    "single summary, removing repetition but keeping every distinct key point."
+)
+
+ROLLING_INSTRUCTION = (
+    "Below is the running summary of a live stream, followed by the newest output. "
+    "Update the summary to cover everything so far, keeping errors, anomalies and "
+    "trends. Do not add an introduction."
+)
+
+
+class ChunkedSummarizer:
+    """Summarizes a stream of chunks concurrently, then reduces the results in a tree."""
+    
+    def __init__(
+        self,
+        model: "GeminiModel",
+        concurrency: int = 4,
+        fan_in: int = 8,
+        rate_limiter: Optional[RateLimiter] = None
+    ):
+        self.model = model
+        self.concurrency = max(1, concurrency)
+        self.fan_in = max(2, fan_in)
+        self.rate_limiter = rate_limiter or RateLimiter()
+    
+    def summarize(
+        self,
+        chunks: Iterable[str],
+        instructions: str = "",
+        total_chunks: Optional[int] = None
+    ) -> List[str]:
+        """
+        Reduce a chunk stream to at most fan_in partial summaries.
+        
+        The caller sends the returned summaries in one final request, so the
+        last step can stream like any other response.
+        
+        Args:
+            chunks: Chunks of the input, consumed lazily
+            instructions: The user's own summarization request
+            total_chunks: Expected number of chunks, for the progress bar
+            
+        Returns:
+            Ordered list of partial summaries
+        """
+        system_prompt = PROMPT_TEMPLATES["summarize"]
+        if instructions:
+            system_prompt += f"\n\nThe user asked: {instructions}"
+        
+        with Progress(
+            TextColumn("[bold green]{task.description}"),
+            BarColumn(),
+            MofNCompleteColumn(),
+            TimeElapsedColumn(),
+            console=self.model.console,
+            transient=True
+        ) as progress:
+            task = progress.add_task("Summarizing chunks", total=total_chunks)
+            summaries = self._map(
+                (
+                    f"{MAP_INSTRUCTION.format(index=i + 1)}\n\n{chunk}"
+                    for i, chunk in enumerate(chunks)
+                ),
+                system_prompt,
+                lambda: progress.advance(task)
+            )
+            
+            level = 1
+            while len(summaries) > self.fan_in:
+                groups = [
+                    summaries[i:i + self.fan_in]
+                    for i in range(0, len(summaries), self.fan_in)
+                ]
+                task = progress.add_task(f"Merging (level {level})", total=len(groups))
+                summaries = self._map(
+                    (f"{REDUCE_INSTRUCTION}\n\n" + "\n\n---\n\n".join(g) for g in groups),
+                    system_prompt,
+                    lambda: progress.advance(task)
+                )
+                level += 1
+        
+        return summaries
+    
+    def summarize_rolling(
+        self,
+        windows: Iterable[str],
+        instructions: str = "",
+        on_update: Optional[Callable[[int, str], None]] = None
+    ) -> str:
+        """
+        Fold each window of a live stream into one running summary.
+        
+        Only the summary and the current window are held in memory, so the
+        stream can run indefinitely. Windows are summarized one after another
+        because each update depends on the previous summary.
+        
+        Args:
+            windows: Consecutive pieces of the stream, consumed lazily
+            instructions: The user's own summarization request
+            on_update: Called with the window number and the new summary
+            
+        Returns:
+            The final summary
+        """
+        system_prompt = PROMPT_TEMPLATES["summarize"]
+        if instructions:
+            system_prompt += f"\n\nThe user asked: {instructions}"
+        
+        summary = ""
+        for index, window in enumerate(windows, 1):
+            summary = self._complete(
+                f"{ROLLING_INSTRUCTION}\n\nRunning summary:\n{summary or '(none yet)'}"
+                f"\n\nNewest output:\n{window}",
+                system_prompt
+            )
+            if on_update is not None:
+                on_update(index, summary)
+        return summary
+    
+    def _map(
+        self,
+        messages: Iterable[str],
+        system_prompt: str,
+        on_done: Callable[[], None]
+    ) -> List[str]:
+        """
+        Run one request per message on a bounded pool, preserving order.
+        
+        At most twice the concurrency level is in flight, so a lazy message
+        iterator is never read far ahead of the workers.
+        """
+        results: Dict[int, str] = {}
+        in_flight: Deque[Tuple[int, Future]] = deque()
+        
+        def collect(oldest: Tuple[int, Future]) -> None:
+            index, future = oldest
+            results[index] = future.result()
+            on_done()
+        
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            for index, message in enumerate(messages):
+                if len(in_flight) >= self.concurrency * 2:
+                    collect(in_flight.popleft())
+                in_flight.append((index, pool.submit(self._complete, message, system_prompt)))
+            
+            while in_flight:
+                collect(in_flight.popleft())
+        
+        return [results[i] for i in range(len(results))]
+    
+    def _complete(self, message: str, system_prompt: str) -> str:
+        """Send one rate-limited, retried request."""
+        def request() -> str:
+            self.rate_limiter.acquire(len(message) // 4)
+            return self.model.complete(message, system_prompt)
+        
+        return call_with_retries(request, retryable=is_retryable)
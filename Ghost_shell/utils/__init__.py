@@ -1,7 +1,46 @@
 """Utility modules for the GhostShell tool."""
 
-from .command_executor import CommandExecutor
-from .file_handler import FileHandler
-from .logger import CommandLogger
+from typing import Any
 
-__all__ = ["CommandExecutor", "FileHandler", "CommandLogger"]
\ No newline at end of file
+__all__ = [
+    "CommandExecutor",
+    "CommandPipeline",
+    "CommandResult",
+    "FileHandler",
+    "FilePacker",
+    "CommandLogger",
+    "Metrics",
+    "OutputFile",
+    "ContextBudgeter",
+    "RateLimiter",
+    "ResponseCache",
+    "StdinReader",
+    "StreamingMarkdownRenderer",
+]
+
+# Submodules are imported on first attribute access to keep startup fast.
+_LAZY_ATTRS = {
+    "CommandExecutor": ".command_executor",
+    "CommandPipeline": ".command_pipeline",
+    "CommandResult": ".process_runner",
+    "FileHandler": ".file_handler",
+    "FilePacker": ".file_packer",
+    "CommandLogger": ".logger",
+    "Metrics": ".metrics",
+    "OutputFile": ".output_file",
+    "ContextBudgeter": ".context_budget",
+    "RateLimiter": ".rate_limit",
+    "ResponseCache": ".response_cache",
+    "StdinReader": ".stdin_reader",
+    "StreamingMarkdownRenderer": ".markdown_stream",
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name in _LAZY_ATTRS:
+        from importlib import import_module
+        
+        value = getattr(import_module(_LAZY_ATTRS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
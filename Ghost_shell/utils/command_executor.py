@@ -1,18 +1,184 @@
 """Command execution utilities."""
 
-import re
-import subprocess
-from typing import List, Tuple
+import os
+import shlex
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import FrozenSet, List, Optional, Tuple
+from urllib.parse import urlparse
 from rich.console import Console
+from rich.table import Table
+from .command_parser import extract_commands, is_safe_command
 from .logger import CommandLogger
+from .metrics import metrics
+from .process_runner import CommandResult, run_command
+
+# Programs that only read their operands and can overlap each other
+READ_ONLY_PROGRAMS = frozenset({
+    "basename", "cat", "cksum", "cmp", "column", "cut", "date", "df", "diff",
+    "dig", "dirname", "du", "echo", "egrep", "env", "false", "fgrep", "file",
+    "find", "free", "grep", "head", "host", "hostname", "id", "jq", "ls", "lsblk",
+    "lscpu", "md5sum", "nl", "nproc", "nslookup", "od", "ping", "printenv",
+    "printf", "ps", "pwd", "readlink", "realpath", "rg", "sha1sum", "sha256sum",
+    "sleep", "sort", "stat", "strings", "tail", "test", "tr", "tree", "true",
+    "type", "uname", "uniq", "uptime", "wc", "whereis", "which", "whoami", "xxd",
+})
+# Programs that create or modify every path operand
+WRITE_PROGRAMS = frozenset({"chmod", "chown", "mkdir", "rm", "rmdir", "touch", "truncate"})
+# Programs that read their operands and write the last one
+COPY_PROGRAMS = frozenset({"cp", "install", "ln", "mv", "rsync"})
+# Read-only programs that look at the current directory when given no operands
+DIRECTORY_PROGRAMS = frozenset({"du", "find", "ls", "rg", "tree"})
+# Options that turn a read-only program into a writer
+WRITE_OPTIONS = frozenset({"-delete", "-exec", "-execdir", "-ok", "-okdir", "-fprint", "-o"})
+# Redirections whose target is written; ">&" and "<&" name descriptors
+WRITE_REDIRECTS = frozenset({">", ">>", ">|", "&>", "&>>"})
+
+# (paths read, paths written); None means the command must run on its own
+Access = Optional[Tuple[FrozenSet[str], FrozenSet[str]]]
+
+
+def _split_words(command: str) -> Optional[List[str]]:
+    """Split a command into words and operators, or None if it can't be analyzed."""
+    # Expansions and substitutions hide which paths a command touches
+    if any(c in command for c in "$`*?[{~"):
+        return None
+    lexer = shlex.shlex(command, posix=True, punctuation_chars=True)
+    lexer.whitespace_split = True
+    try:
+        words = list(lexer)
+    except ValueError:
+        return None
+    while words and "=" in words[0] and not words[0].startswith("="):
+        words.pop(0)  # VAR=value prefixes
+    return words or None
+
+
+def _download_targets(program: str, args: List[str]) -> set:
+    """Paths written by wget or curl: the named output, or the URL's file name."""
+    if program == "wget":
+        outputs = ("-O", "--output-document", "-o", "--output-file", "-P", "--directory-prefix")
+    else:
+        outputs = ("-o", "--output")
+    writes = set()
+    remote_name = program == "wget"
+    for i, arg in enumerate(args):
+        option, has_value, value = arg.partition("=")
+        if program == "curl" and option.startswith("-") and not option.startswith("--"):
+            # Short flags combine, as in -sSLO or -sSLo file
+            remote_name = remote_name or "O" in option
+            option = "-o" if option.endswith("o") else option
+        if option in ("-O", "--output-document"):
+            remote_name = False
+        if option in outputs:
+            value = value if has_value else (args[i + 1] if i + 1 < len(args) else "")
+            if value != "-":
+                writes.add(value)
+        elif option == "--remote-name":
+            remote_name = True
+    
+    if remote_name:
+        for arg in args:
+            if "://" in arg:
+                writes.add(os.path.basename(urlparse(arg).path) or "index.html")
+    return writes
+
+
+def command_access(command: str) -> Access:
+    """
+    Work out which paths a command reads and writes.
+    
+    Only commands whose effects are known are analyzed: read-only tools,
+    plain file writers and copies, and downloads, optionally joined by pipes
+    and with redirections. Anything else, including package managers,
+    version control, shell state changes and chained steps, returns None.
+    
+    Args:
+        command: Shell command
+        
+    Returns:
+        Paths read and written, or None if the command must run alone
+    """
+    words = _split_words(command)
+    if words is None:
+        return None
+    
+    reads, writes = set(), set()
+    segments: List[List[str]] = [[]]
+    i = 0
+    while i < len(words):
+        word = words[i]
+        if word == "|":
+            segments.append([])
+        elif word in WRITE_REDIRECTS or word == "<":
+            if i + 1 == len(words):
+                return None
+            (writes if word != "<" else reads).add(words[i + 1])
+            i += 1
+        elif word in (">&", "<&"):
+            i += 1
+        elif word[0] in ";&|()<>":
+            # Sequencing, background jobs, subshells and process substitution
+            return None
+        else:
+            segments[-1].append(word)
+        i += 1
+    
+    for segment in segments:
+        if not segment:
+            return None
+        program = os.path.basename(segment[0])
+        args = segment[1:]
+        operands = [arg for arg in args if not arg.startswith("-") and not arg.isdigit()]
+        if program in ("wget", "curl"):
+            writes.update(_download_targets(program, args))
+        elif program in READ_ONLY_PROGRAMS:
+            if WRITE_OPTIONS.intersection(args):
+                return None
+            reads.update(operands or ((".",) if program in DIRECTORY_PROGRAMS else ()))
+        elif program in WRITE_PROGRAMS:
+            writes.update(operands)
+        elif program in COPY_PROGRAMS and len(operands) >= 2:
+            reads.update(operands[:-1])
+            writes.add(operands[-1])
+        else:
+            return None
+    return frozenset(reads), frozenset(writes)
+
+
+def _conflicts(paths: FrozenSet[str], others: set) -> bool:
+    """Whether any path equals, contains or lies inside one of the others."""
+    # Every command starts in the current directory; a cd does not outlive
+    # its own shell
+    resolved = {os.path.abspath(path) for path in others}
+    for path in paths:
+        path = os.path.abspath(path)
+        for other in resolved:
+            if path == other or os.path.commonpath((path, other)) in (path, other):
+                return True
+    return False
 
 
 class CommandExecutor:
     """Handles extraction and execution of commands from AI responses."""
     
-    def __init__(self, logger: CommandLogger):
+    def __init__(
+        self,
+        logger: CommandLogger,
+        timeout: Optional[float] = 600,
+        idle_timeout: Optional[float] = 120,
+        tail_lines: int = 200,
+        parallel: int = 1
+    ):
         self.console = Console()
         self.logger = logger
+        self.timeout = timeout or None
+        self.idle_timeout = idle_timeout or None
+        self.tail_lines = tail_lines
+        self.parallel = max(1, parallel)
+        # Request that produced the commands being run, logged with each result
+        self.prompt: Optional[str] = None
     
     def extract_commands(self, text: str) -> List[str]:
         """
@@ -24,28 +190,7 @@ class CommandExecutor:
         Returns:
             List of extracted commands
         """
-        # Pattern for inline code blocks
-        inline_commands = re.findall(r'`([^`\n]+)`', text)
-        
-        # Pattern for multi-line code blocks
-        block_commands = re.findall(r'```(?:bash|sh|shell)?\n?(.*?)\n?```', text, re.DOTALL)
-        
-        commands = []
-        
-        # Process inline commands
-        for cmd in inline_commands:
-            cmd = cmd.strip()
-            if cmd and self._is_safe_command(cmd):
-                commands.append(cmd)
-        
-        # Process block commands
-        for block in block_commands:
-            for line in block.split('\n'):
-                cmd = line.strip()
-                if cmd and not cmd.startswith('#') and self._is_safe_command(cmd):
-                    commands.append(cmd)
-        
-        return commands
+        return extract_commands(text)
     
     def _is_safe_command(self, command: str) -> bool:
         """
@@ -57,29 +202,21 @@ class CommandExecutor:
         Returns:
             True if command appears safe, False otherwise
         """
-        dangerous_patterns = [
-            r'rm\s+-rf\s+/',  # rm -rf /
-            r'>\s*/dev/sd[a-z]',  # writing to disk devices
-            r'dd\s+if=.*of=/dev/',  # dd to devices
-            r'mkfs\.',  # filesystem creation
-            r'fdisk',  # partition manipulation
-            r'format\s+c:',  # Windows format
-            r'del\s+/s\s+/q\s+c:\\',  # Windows delete
-        ]
-        
-        for pattern in dangerous_patterns:
-            if re.search(pattern, command, re.IGNORECASE):
-                return False
-        
-        return True
-    
-    def execute_commands(self, markdown_text: str, auto_execute: bool = False) -> None:
+        return is_safe_command(command)
+    
+    def execute_commands(
+        self,
+        markdown_text: str,
+        auto_execute: bool = False,
+        prompt: Optional[str] = None
+    ) -> None:
         """
         Execute commands extracted from markdown text.
         
         Args:
             markdown_text: Text containing commands
             auto_execute: If True, execute without prompting
+            prompt: Request the commands answer, recorded in the history
         """
         commands = self.extract_commands(markdown_text)
         
@@ -87,12 +224,31 @@ class CommandExecutor:
             self.console.print("[yellow]No executable commands found.[/yellow]")
             return
         
+        self.run_commands(commands, auto_execute, prompt)
+    
+    def run_commands(
+        self,
+        commands: List[str],
+        auto_execute: bool = False,
+        prompt: Optional[str] = None
+    ) -> None:
+        """
+        List commands and run them after confirmation.
+        
+        Args:
+            commands: Commands in the order they should run
+            auto_execute: If True, execute without prompting
+            prompt: Request the commands answer, recorded in the history
+        """
+        self.prompt = prompt
+        if prompt:
+            self.logger.suggestions.begin_answer(prompt)
         self.console.print(f"[cyan]Found {len(commands)} command(s):[/cyan]")
         for i, cmd in enumerate(commands, 1):
             self.console.print(f"[bold blue]{i}.[/bold blue] [green]{cmd}[/green]")
         
         if not auto_execute:
-            response = input("\nExecute these commands? [y/N/s(elect)]: ").lower().strip()
+            response = self._ask("\nExecute these commands? [y/N/s(elect)]: ")
             
             if response == 's':
                 self._selective_execution(commands)
@@ -103,11 +259,20 @@ class CommandExecutor:
         
         self._execute_command_list(commands)
     
+    @staticmethod
+    def _ask(question: str) -> str:
+        """Read a lowercase answer; no input (e.g. stdin was a consumed pipe) means no."""
+        try:
+            return input(question).lower().strip()
+        except EOFError:
+            print()
+            return "n"
+    
     def _selective_execution(self, commands: List[str]) -> None:
         """Allow user to select which commands to execute."""
         for i, cmd in enumerate(commands, 1):
             self.console.print(f"\n[bold blue]{i}.[/bold blue] [green]{cmd}[/green]")
-            response = input("Execute this command? [y/n/q(uit)]: ").lower().strip()
+            response = self._ask("Execute this command? [y/n/q(uit)]: ")
             
             if response == 'q':
                 break
@@ -116,40 +281,196 @@ class CommandExecutor:
     
     def _execute_command_list(self, commands: List[str]) -> None:
         """Execute a list of commands."""
+        if self.parallel > 1 and len(commands) > 1:
+            self._execute_parallel(commands)
+            return
+        
         for cmd in commands:
             self._execute_single_command(cmd)
     
-    def _execute_single_command(self, command: str) -> None:
+    @staticmethod
+    def plan_stages(commands: List[str]) -> List[List[str]]:
+        """
+        Group commands into stages that may run concurrently.
+        
+        Commands run one after another unless they are proven independent:
+        a command joins the current stage only if command_access() can tell
+        what it touches and it writes nothing the stage reads or writes and
+        reads nothing the stage writes. Everything else, such as package
+        managers, version control, cd, export and && chains, runs alone.
+        
+        Args:
+            commands: Commands in their original order
+            
+        Returns:
+            Ordered list of stages
+        """
+        stages: List[List[str]] = []
+        current: List[str] = []
+        reads: set = set()
+        writes: set = set()
+        for cmd in commands:
+            access = command_access(cmd)
+            if access is not None and current and not (
+                _conflicts(access[1], reads | writes) or _conflicts(access[0], writes)
+            ):
+                current.append(cmd)
+                reads |= access[0]
+                writes |= access[1]
+                continue
+            
+            if current:
+                stages.append(current)
+            if access is None:
+                stages.append([cmd])
+                current, reads, writes = [], set(), set()
+            else:
+                current, reads, writes = [cmd], set(access[0]), set(access[1])
+        if current:
+            stages.append(current)
+        return stages
+    
+    def _execute_parallel(self, commands: List[str]) -> None:
+        """
+        Run independent commands on a worker pool, stage by stage.
+        
+        Each command's output is buffered separately and printed in the
+        original order once the command finishes.
+        
+        Args:
+            commands: Commands to execute
+        """
+        stop = threading.Event()
+        results: List[CommandResult] = []
+        start = time.monotonic()
+        
+        def run(cmd: str) -> CommandResult:
+            return run_command(
+                cmd,
+                timeout=self.timeout,
+                idle_timeout=self.idle_timeout,
+                tail_lines=self.tail_lines,
+                stop_event=stop
+            )
+        
+        with ThreadPoolExecutor(max_workers=self.parallel) as pool:
+            futures: List[Future] = []
+            try:
+                for stage in self.plan_stages(commands):
+                    futures = [pool.submit(run, cmd) for cmd in stage]
+                    for future in futures:
+                        result = future.result()
+                        self._show_buffered(result)
+                        results.append(result)
+            except KeyboardInterrupt:
+                # Stop running commands, drop queued ones and log what was cut short
+                stop.set()
+                for future in futures:
+                    if not future.cancel() and future.result() not in results:
+                        self._report(future.result())
+                raise
+        
+        self._show_summary(results, time.monotonic() - start)
+    
+    def _show_buffered(self, result: CommandResult) -> None:
+        """Print a finished command with its captured output."""
+        self.console.print(f"\n[bold red]>[/bold red] [green]{result.command}[/green]")
+        omitted = result.output_lines - len(result.output_tail)
+        if omitted > 0:
+            self.console.print(f"[dim]... {omitted} earlier lines omitted[/dim]")
+        for line in result.output_tail:
+            self.console.print(line, markup=False, highlight=False)
+        self._report(result)
+    
+    def _show_summary(self, results: List[CommandResult], wall_time: float) -> None:
+        """Print a table comparing wall time with summed command time."""
+        table = Table(title="Parallel execution")
+        table.add_column("#", justify="right")
+        table.add_column("Command")
+        table.add_column("Status")
+        table.add_column("Time", justify="right")
+        
+        for i, result in enumerate(results, 1):
+            style = "green" if result.succeeded else "red"
+            table.add_row(
+                str(i),
+                result.command,
+                f"[{style}]{result.status}[/{style}]",
+                f"{result.duration:.2f}s"
+            )
+        
+        total = sum(result.duration for result in results)
+        speedup = total / wall_time if wall_time > 0 else 1.0
+        self.console.print(table)
+        self.console.print(
+            f"Wall time [bold]{wall_time:.2f}s[/bold] vs summed command time "
+            f"[bold]{total:.2f}s[/bold] ({speedup:.1f}x)"
+        )
+    
+    def _execute_single_command(
+        self,
+        command: str,
+        timeout: Optional[float] = None,
+        idle_timeout: Optional[float] = None
+    ) -> CommandResult:
         """
-        Execute a single command.
+        Execute a single command, showing its output live.
         
         Args:
             command: Command to execute
+            timeout: Total time limit overriding the executor default
+            idle_timeout: No-output limit overriding the executor default
+            
+        Returns:
+            The command's result
         """
         self.console.print(f"\n[bold red]>[/bold red] [green]{command}[/green]")
         
+        def show(stream: str, line: str) -> None:
+            self.console.print(
+                line,
+                style="red" if stream == "stderr" else None,
+                markup=False,
+                highlight=False
+            )
+        
         try:
-            result = subprocess.run(
+            result = run_command(
                 command,
-                shell=True,
-                capture_output=True,
-                text=True,
-                timeout=30
+                timeout=timeout if timeout is not None else self.timeout,
+                idle_timeout=idle_timeout if idle_timeout is not None else self.idle_timeout,
+                tail_lines=self.tail_lines,
+                on_line=show,
+                interactive=True
             )
-            
-            if result.returncode == 0:
-                if result.stdout:
-                    self.console.print(result.stdout)
-                self.logger.log_command(f"✓ {command}")
-            else:
-                self.console.print(f"[red]Error (exit code {result.returncode}):[/red]")
-                if result.stderr:
-                    self.console.print(f"[red]{result.stderr}[/red]")
-                self.logger.log_command(f"✗ {command} (failed)")
-                
-        except subprocess.TimeoutExpired:
-            self.console.print("[red]Command timed out (30s limit)[/red]")
-            self.logger.log_command(f"✗ {command} (timeout)")
-        except Exception as e:
-            self.console.print(f"[red]Execution error: {e}[/red]")
-            self.logger.log_command(f"✗ {command} (error: {e})")
\ No newline at end of file
+        except KeyboardInterrupt:
+            self.console.print("[red]Command interrupted[/red]")
+            self.logger.log_command(command, status="interrupted", prompt=self.prompt)
+            raise
+        
+        self._report(result)
+        return result
+    
+    def _report(self, result: CommandResult) -> None:
+        """Print the outcome of a finished command and log it."""
+        if result.status == "failed":
+            self.console.print(f"[red]Error (exit code {result.returncode})[/red]")
+        elif result.status == "timeout":
+            self.console.print(f"[red]Command timed out after {result.duration:.0f}s[/red]")
+        elif result.status == "idle-timeout":
+            self.console.print(
+                f"[red]Command stopped after {result.duration:.0f}s: no output for too long[/red]"
+            )
+        elif result.status == "interrupted":
+            self.console.print("[red]Command interrupted[/red]")
+        elif result.status == "error":
+            self.console.print(f"[red]Execution error: {result.error}[/red]")
+        
+        self.logger.log_command(
+            result.command,
+            status=result.status,
+            exit_code=result.returncode,
+            duration=result.duration,
+            prompt=self.prompt
+        )
+        metrics.record_command(result.command, result.status, result.duration)
\ No newline at end of file
@@ -0,0 +1,152 @@
+"""Single-pass extraction of shell commands from markdown."""
+
+import re
+from typing import Iterable, List, Optional, Set
+
+# Fence languages whose contents are treated as shell commands ("" = untagged)
+SHELL_LANGUAGES = frozenset({
+    "", "bash", "sh", "shell", "zsh", "fish", "ksh", "console", "shell-session",
+    "terminal", "cmd", "bat", "batch", "powershell", "ps", "ps1", "pwsh",
+})
+
+FENCE_PATTERN = re.compile(r"^\s*(`{3,}|~{3,})\s*([\w+#.-]*)")
+FENCE_OPENERS = ("```", "~~~")
+INLINE_PATTERN = re.compile(r"(?<!`)`([^`\n]+)`(?!`)")
+PROMPT_PATTERN = re.compile(r"^(?:\$|PS [^>]*>)\s+")
+
+# Patterns are lowercase and matched against the lowercased command, which is
+# much faster than re.IGNORECASE on a combined alternation
+DANGEROUS_PATTERN = re.compile(
+    "|".join([
+        r"rm\s+-rf\s+/",  # rm -rf /
+        r">\s*/dev/sd[a-z]",  # writing to disk devices
+        r"dd\s+if=.*of=/dev/",  # dd to devices
+        r"mkfs\.",  # filesystem creation
+        r"fdisk",  # partition manipulation
+        r"format\s+c:",  # Windows format
+        r"del\s+/s\s+/q\s+c:\\",  # Windows delete
+    ])
+)
+
+
+def is_safe_command(command: str) -> bool:
+    """
+    Basic safety check for commands.
+    
+    Args:
+        command: Command to check
+        
+    Returns:
+        True if command appears safe, False otherwise
+    """
+    return DANGEROUS_PATTERN.search(command.lower()) is None
+
+
+class CommandParser:
+    """
+    Incremental markdown tokenizer that yields shell commands.
+    
+    Lines are fed one at a time. Inline code outside fences is emitted as
+    soon as its line is seen; commands in a shell fence are emitted
+    together when the fence closes. Backslash-continued lines are joined,
+    comments and shell prompts are stripped, unsafe commands are dropped
+    and every command is emitted at most once.
+    """
+    
+    def __init__(self):
+        self._seen: Set[str] = set()
+        self._fence: Optional[str] = None
+        self._shell_block = False
+        self._block: List[str] = []
+        self._continued = ""
+    
+    @property
+    def in_fence(self) -> bool:
+        """Whether the parser is inside a fenced code block."""
+        return self._fence is not None
+    
+    def feed(self, line: str) -> List[str]:
+        """
+        Process one line of markdown.
+        
+        Args:
+            line: A line without its trailing newline
+            
+        Returns:
+            Commands completed by this line, in document order
+        """
+        if self._fence is None:
+            match = FENCE_PATTERN.match(line) if line.lstrip()[:3] in FENCE_OPENERS else None
+            if match:
+                self._fence = match.group(1)
+                self._shell_block = match.group(2).lower() in SHELL_LANGUAGES
+                return []
+            if "`" not in line:
+                return []
+            return self._accept(match.group(1) for match in INLINE_PATTERN.finditer(line))
+        
+        stripped = line.strip()
+        if stripped.startswith(self._fence) and not stripped.lstrip(self._fence[0]):
+            return self.close()
+        
+        if self._shell_block:
+            self._add_block_line(stripped)
+        return []
+    
+    def close(self) -> List[str]:
+        """
+        Finish the current fenced block, e.g. at a closing fence or end of input.
+        
+        Returns:
+            Commands from the block
+        """
+        if self._continued:
+            self._block.append(self._continued)
+        commands = self._accept(self._block)
+        self._fence = None
+        self._shell_block = False
+        self._block = []
+        self._continued = ""
+        return commands
+    
+    def _add_block_line(self, stripped: str) -> None:
+        """Buffer one line of a shell block, joining continuations."""
+        if not self._continued:
+            if not stripped or stripped.startswith("#"):
+                return
+            stripped = PROMPT_PATTERN.sub("", stripped)
+        
+        if stripped.endswith("\\"):
+            self._continued += stripped[:-1].rstrip() + " "
+            return
+        
+        self._block.append(self._continued + stripped)
+        self._continued = ""
+    
+    def _accept(self, candidates: Iterable[str]) -> List[str]:
+        """Keep new, non-empty, safe commands."""
+        accepted = []
+        for candidate in candidates:
+            cmd = candidate.strip()
+            if cmd and cmd not in self._seen and is_safe_command(cmd):
+                self._seen.add(cmd)
+                accepted.append(cmd)
+        return accepted
+
+
+def extract_commands(text: str) -> List[str]:
+    """
+    Extract commands from markdown in a single pass.
+    
+    Args:
+        text: Text containing markdown code blocks
+        
+    Returns:
+        List of unique extracted commands in document order
+    """
+    parser = CommandParser()
+    commands: List[str] = []
+    for line in text.split("\n"):
+        commands.extend(parser.feed(line))
+    commands.extend(parser.close())
+    return commands
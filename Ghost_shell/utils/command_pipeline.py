@@ -0,0 +1,137 @@
+"""Running commands from a response while it is still streaming."""
+
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import nullcontext
+from typing import Callable, ContextManager, List, Optional
+from .command_executor import CommandExecutor
+from .command_parser import CommandParser
+from .metrics import metrics
+from .process_runner import CommandResult, run_command
+
+
+class CommandPipeline:
+    """
+    Queues each command as soon as its fenced block is complete.
+    
+    Commands run one at a time, in document order, on a worker thread, so
+    step 1 executes while the model is still writing step 5. Their output is
+    buffered and shown in order once the response has finished, keeping it
+    apart from the rendered answer. Without auto-execute, each command is
+    confirmed when its block closes; the stream keeps arriving meanwhile.
+    """
+    
+    def __init__(
+        self,
+        executor: CommandExecutor,
+        auto_execute: bool = False,
+        prompt: Optional[str] = None
+    ):
+        self.executor = executor
+        self.console = executor.console
+        self.auto_execute = auto_execute
+        self.prompt = prompt
+        if prompt:
+            executor.logger.suggestions.begin_answer(prompt)
+        self._parser = CommandParser()
+        self._partial = ""
+        self._declined = False
+        self._found = 0
+        self._stop = threading.Event()
+        self._futures: List[Future] = []
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ghostshell-pipeline")
+    
+    def feed(
+        self,
+        text: str,
+        pause: Optional[Callable[[], ContextManager]] = None
+    ) -> None:
+        """
+        Scan the next chunk of the response for finished command blocks.
+        
+        Args:
+            text: Next chunk of the response
+            pause: Context manager factory that stops live rendering while
+                a command is confirmed
+        """
+        lines = (self._partial + text).split("\n")
+        self._partial = lines.pop()
+        commands = []
+        for line in lines:
+            commands.extend(self._parser.feed(line))
+        if commands:
+            self._submit(commands, pause)
+    
+    def finish(self) -> None:
+        """Queue anything left in the response, then show every result in order."""
+        commands = self._parser.feed(self._partial) if self._partial else []
+        commands.extend(self._parser.close())
+        self._partial = ""
+        # Commands already running (or done) now overlapped with generation
+        overlapped = sum(1 for future in self._futures if future.running() or future.done())
+        if commands:
+            self._submit(commands)
+        
+        if not self._found:
+            self.console.print("[yellow]No executable commands found.[/yellow]")
+        
+        try:
+            for future in self._futures:
+                self.executor._show_buffered(future.result())
+        except KeyboardInterrupt:
+            self.cancel()
+            raise
+        finally:
+            self._pool.shutdown(wait=False)
+        
+        metrics.set("pipelined_commands", len(self._futures))
+        metrics.set("commands_during_stream", overlapped)
+    
+    def cancel(self) -> None:
+        """Stop the running command, drop queued ones and log what was cut short."""
+        self._stop.set()
+        for future in self._futures:
+            future.cancel()
+        for future in self._futures:
+            if not future.cancelled():
+                self.executor._report(future.result())
+        self._futures = []
+        self._pool.shutdown(wait=False)
+    
+    def _submit(
+        self,
+        commands: List[str],
+        pause: Optional[Callable[[], ContextManager]] = None
+    ) -> None:
+        """Queue commands, asking for confirmation first unless auto-executing."""
+        self.executor.prompt = self.prompt
+        for cmd in commands:
+            self._found += 1
+            if self._declined:
+                continue
+            if not self.auto_execute:
+                with pause() if pause is not None else nullcontext():
+                    self.console.print(
+                        f"\n[bold blue]{self._found}.[/bold blue] [green]{cmd}[/green]"
+                    )
+                    response = self.executor._ask("Run this command? [y/N/a(ll)/q(uit)]: ")
+                if response == "q":
+                    self._declined = True
+                    self.console.print("[yellow]Skipping the remaining commands.[/yellow]")
+                    continue
+                if response == "a":
+                    self.auto_execute = True
+                elif response != "y":
+                    continue
+            self.console.print(f"[dim]Queued: {cmd}[/dim]", highlight=False)
+            self._futures.append(self._pool.submit(self._run, cmd))
+    
+    def _run(self, cmd: str) -> CommandResult:
+        """Run one command on the worker thread, capturing its output."""
+        return run_command(
+            cmd,
+            timeout=self.executor.timeout,
+            idle_timeout=self.executor.idle_timeout,
+            tail_lines=self.executor.tail_lines,
+            stop_event=self._stop
+        )
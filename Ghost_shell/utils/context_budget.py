@@ -0,0 +1,218 @@
+"""Pre-flight token budgeting for file content sent with a request."""
+
+import re
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional, Sequence
+
+from .tokens import estimate_tokens
+
+TRIM_STRATEGIES = ("head-tail", "drop", "collapse", "chunk")
+
+# Digits and hex ids vary between otherwise identical log lines
+_VOLATILE_PATTERN = re.compile(r"0x[0-9a-fA-F]+|\d+")
+
+
+@dataclass
+class BudgetResult:
+    """File content after budgeting, with a description of every change."""
+    
+    text: str
+    tokens: int
+    notes: List[str] = field(default_factory=list)
+    needs_chunking: bool = False
+    
+    @property
+    def trimmed(self) -> bool:
+        """Whether anything was removed or handed off."""
+        return bool(self.notes)
+
+
+class ContextBudgeter:
+    """
+    Fits file content into the tokens left over by the prompt and history.
+    
+    Strategies run in the given order until the content fits:
+    
+    - drop: remove lines matching drop_pattern
+    - collapse: fold runs of repeated lines that differ only in numbers
+    - chunk: hand the file to chunked summarization instead of sending it
+    - head-tail: keep the start and end, omitting the middle
+    
+    If the content still does not fit, head-tail is applied as a last resort
+    so the request never exceeds the budget.
+    """
+    
+    def __init__(
+        self,
+        max_tokens: int,
+        strategies: Sequence[str] = ("collapse", "head-tail"),
+        drop_pattern: Optional[str] = None,
+        count_tokens: Optional[Callable[[str], int]] = None
+    ):
+        unknown = [name for name in strategies if name not in TRIM_STRATEGIES]
+        if unknown:
+            raise ValueError(
+                f"Unknown trim strategy: {', '.join(unknown)} "
+                f"(choose from {', '.join(TRIM_STRATEGIES)})"
+            )
+        self.max_tokens = max_tokens
+        self.strategies = list(strategies)
+        self.drop_pattern = re.compile(drop_pattern) if drop_pattern else None
+        if self.drop_pattern is not None and "drop" not in self.strategies:
+            self.strategies.insert(0, "drop")
+        self.count_tokens = count_tokens
+    
+    def measure(self, text: str, limit: int) -> int:
+        """
+        Count tokens, asking the precise counter only when the estimate is close to the limit.
+        
+        Args:
+            text: Text to measure
+            limit: Budget the count is compared against
+            
+        Returns:
+            Token count
+        """
+        estimate = estimate_tokens(text)
+        if self.count_tokens is None or not 0.8 * limit <= estimate <= 1.25 * limit:
+            return estimate
+        try:
+            return self.count_tokens(text)
+        except Exception:
+            return estimate
+    
+    def fit(self, text: str, reserved_tokens: int = 0) -> BudgetResult:
+        """
+        Trim file content to the budget left after the prompt and history.
+        
+        Args:
+            text: File content
+            reserved_tokens: Tokens already used by the system prompt,
+                history and message
+                
+        Returns:
+            BudgetResult with the content to send and notes on what was trimmed
+        """
+        budget = max(0, self.max_tokens - reserved_tokens)
+        tokens = self.measure(text, budget)
+        result = BudgetResult(text, tokens)
+        if tokens <= budget:
+            return result
+        
+        result.notes.append(
+            f"File is ~{tokens:,} tokens but only {budget:,} of the "
+            f"{self.max_tokens:,} token budget are left after the prompt"
+        )
+        for strategy in self.strategies:
+            if strategy == "chunk":
+                result.needs_chunking = True
+                result.notes.append("Handed the file to chunked summarization")
+                return result
+            if strategy == "drop" and self.drop_pattern is not None:
+                result.text = self._drop(result.text, result.notes)
+            elif strategy == "collapse":
+                result.text = self._collapse(result.text, result.notes)
+            elif strategy == "head-tail":
+                result.text = self._head_tail(result.text, budget, result.notes)
+            
+            result.tokens = self.measure(result.text, budget)
+            if result.tokens <= budget:
+                return result
+        
+        result.text = self._head_tail(result.text, budget, result.notes)
+        result.tokens = estimate_tokens(result.text)
+        return result
+    
+    def _drop(self, text: str, notes: List[str]) -> str:
+        """Remove lines matching the drop pattern."""
+        kept = []
+        dropped = 0
+        dropped_chars = 0
+        for line in text.splitlines(keepends=True):
+            if self.drop_pattern.search(line):
+                dropped += 1
+                dropped_chars += len(line)
+            else:
+                kept.append(line)
+        
+        if dropped:
+            notes.append(
+                f"Dropped {dropped:,} lines matching /{self.drop_pattern.pattern}/ "
+                f"(~{dropped_chars // 4:,} tokens)"
+            )
+        return "".join(kept)
+    
+    @staticmethod
+    def _collapse(text: str, notes: List[str]) -> str:
+        """Fold runs of lines that are identical apart from numbers into one line and a marker."""
+        kept: List[str] = []
+        runs = 0
+        folded = 0
+        previous_key = None
+        repeats = 0
+        
+        def flush() -> None:
+            nonlocal runs, folded
+            if repeats:
+                kept.append(f"[... previous line repeated {repeats:,} more times ...]\n")
+                runs += 1
+                folded += repeats
+        
+        for line in text.splitlines(keepends=True):
+            key = _VOLATILE_PATTERN.sub("#", line.strip())
+            if key and key == previous_key:
+                repeats += 1
+                continue
+            flush()
+            repeats = 0
+            previous_key = key
+            kept.append(line)
+        flush()
+        
+        if folded:
+            notes.append(f"Collapsed {folded:,} repeated lines in {runs:,} runs")
+        return "".join(kept)
+    
+    @staticmethod
+    def _head_tail(text: str, budget: int, notes: List[str]) -> str:
+        """Keep whole lines from the start and end of the text, omitting the middle."""
+        tokens = estimate_tokens(text)
+        if tokens <= budget:
+            return text
+        
+        # Spend the budget at the text's own characters-per-token ratio, with
+        # a margin because the kept lines may be denser than the average
+        keep_chars = max(0, int(len(text) * (0.95 * budget - 32) / tokens))
+        lines = text.splitlines(keepends=True)
+        
+        head_end = 0
+        used = 0
+        while head_end < len(lines) and used + len(lines[head_end]) <= keep_chars // 2:
+            used += len(lines[head_end])
+            head_end += 1
+        
+        tail_start = len(lines)
+        while tail_start > head_end and used + len(lines[tail_start - 1]) <= keep_chars:
+            tail_start -= 1
+            used += len(lines[tail_start])
+        
+        if head_end == 0 and tail_start == len(lines):
+            # Too few line breaks (e.g. minified files), so cut mid-line instead
+            half = keep_chars // 2
+            notes.append(
+                f"Kept the first and last {half:,} characters; "
+                f"omitted {len(text) - 2 * half:,} characters in between"
+            )
+            return text[:half] + "\n[... omitted to fit the token budget ...]\n" + text[len(text) - half:]
+        
+        omitted = lines[head_end:tail_start]
+        if not omitted:
+            return text
+        
+        omitted_tokens = estimate_tokens("".join(omitted))
+        notes.append(
+            f"Kept the first {head_end:,} and last {len(lines) - tail_start:,} lines; "
+            f"omitted lines {head_end + 1:,}-{tail_start:,} (~{omitted_tokens:,} tokens)"
+        )
+        marker = f"\n[... {len(omitted):,} lines omitted to fit the token budget ...]\n\n"
+        return "".join(lines[:head_end]) + marker + "".join(lines[tail_start:])
@@ -1,8 +1,11 @@
 """File handling utilities."""
 
+import hashlib
 import os
 from pathlib import Path
-from typing import Optional
+from typing import Iterable, Iterator, List, Optional
+
+from .file_packer import decode_text
 
 
 class FileHandler:
@@ -28,9 +31,9 @@ class FileHandler:
             if not path.exists():
                 raise FileNotFoundError(f"File not found: {file_path}")
             
-            with path.open("r", encoding="utf-8") as file:
-                return file.read()
-                
+            # Text that is not valid UTF-8 is read as Latin-1 rather than failing
+            return decode_text(path.read_bytes())[0]
+            
         except Exception as e:
             raise IOError(f"Error reading file {file_path}: {e}")
     
@@ -52,7 +55,7 @@ class FileHandler:
             
             with path.open("w", encoding="utf-8") as file:
                 file.write(content)
-                
+            
             print(f"✓ Successfully saved to {file_path}")
             
         except Exception as e:
@@ -69,4 +72,79 @@ class FileHandler:
         Returns:
             True if file exists, False otherwise
         """
-        return Path(file_path).exists()
\ No newline at end of file
+        return Path(file_path).exists()
+    
+    @staticmethod
+    def file_digest(file_path: str) -> str:
+        """
+        Compute a SHA-256 digest of a file without loading it into memory.
+        
+        Args:
+            file_path: Path to the file
+            
+        Returns:
+            Hex digest of the file content
+        """
+        digest = hashlib.sha256()
+        with open(file_path, "rb") as file:
+            for block in iter(lambda: file.read(1024 * 1024), b""):
+                digest.update(block)
+        return digest.hexdigest()
+    
+    @staticmethod
+    def iter_chunks(file_path: str, max_chars: int) -> Iterator[str]:
+        """
+        Stream a text file in chunks of at most max_chars characters.
+        
+        Chunks end on a blank line (paragraph boundary) when one is available
+        in the second half of the chunk, and otherwise on a line boundary.
+        Only lines longer than max_chars are split mid-line.
+        
+        Args:
+            file_path: Path to the file to read
+            max_chars: Maximum size of a chunk in characters
+            
+        Yields:
+            Consecutive chunks of the file
+        """
+        with open(file_path, "r", encoding="utf-8", errors="replace") as file:
+            yield from FileHandler.chunk_lines(file, max_chars)
+    
+    @staticmethod
+    def chunk_lines(lines_in: Iterable[str], max_chars: int) -> Iterator[str]:
+        """
+        Group lines (with their line endings) into chunks of at most max_chars.
+        
+        Args:
+            lines_in: Lines of text, e.g. an open file
+            max_chars: Maximum size of a chunk in characters
+            
+        Yields:
+            Consecutive chunks of the text
+        """
+        lines: List[str] = []
+        size = 0
+        paragraph_end = 0  # number of buffered lines up to the last blank line
+        
+        for line in lines_in:
+            while len(line) > max_chars:
+                if lines:
+                    yield "".join(lines)
+                    lines, size, paragraph_end = [], 0, 0
+                yield line[:max_chars]
+                line = line[max_chars:]
+            
+            while lines and size + len(line) > max_chars:
+                cut = paragraph_end if paragraph_end * 2 >= len(lines) else len(lines)
+                yield "".join(lines[:cut])
+                lines = lines[cut:]
+                size = sum(len(buffered) for buffered in lines)
+                paragraph_end = 0
+            
+            lines.append(line)
+            size += len(line)
+            if not line.strip():
+                paragraph_end = len(lines)
+        
+        if lines:
+            yield "".join(lines)
\ No newline at end of file
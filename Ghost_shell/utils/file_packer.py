@@ -0,0 +1,257 @@
+"""Reading many input files, directories and globs into one context block."""
+
+import fnmatch
+import glob
+import hashlib
+import mmap
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Bytes inspected when deciding whether a file is binary
+SNIFF_BYTES = 8192
+
+# Files at least this large are memory-mapped instead of read into a bytes copy
+MMAP_THRESHOLD = 1024 * 1024
+
+# Directories never worth sending to a model
+SKIPPED_DIRS = frozenset({".git", ".hg", ".svn", "__pycache__", "node_modules"})
+
+
+@dataclass
+class PackedFile:
+    """One input file that made it into the context block."""
+    
+    path: str
+    text: str
+    size: int
+    sha256: str
+    encoding: str = "utf-8"
+
+
+@dataclass
+class PackResult:
+    """Packed context block plus everything that was left out."""
+    
+    text: str = ""
+    files: List[PackedFile] = field(default_factory=list)
+    # (path, reason) for each file left out: binary, too large, ignored,
+    # duplicate of another file, or unreadable
+    skipped: List[Tuple[str, str]] = field(default_factory=list)
+    
+    def summary(self) -> str:
+        """Describe what was read and skipped in one line."""
+        total = sum(packed.size for packed in self.files)
+        line = f"Read {len(self.files)} files ({total / 1024:,.1f} KiB)"
+        if self.skipped:
+            reasons: Dict[str, int] = {}
+            for _, reason in self.skipped:
+                key = "duplicate" if reason.startswith("duplicate") else reason.split(":")[0]
+                reasons[key] = reasons.get(key, 0) + 1
+            line += "; skipped " + ", ".join(f"{count} {reason}" for reason, count in reasons.items())
+        return line
+
+
+def decode_text(data: bytes) -> Tuple[str, str]:
+    """
+    Decode file bytes as UTF-8, falling back to Latin-1, which accepts any input.
+    
+    Args:
+        data: Raw bytes or any buffer, such as an mmap
+        
+    Returns:
+        Tuple of (text, encoding used)
+    """
+    try:
+        return str(data, "utf-8"), "utf-8"
+    except UnicodeDecodeError:
+        return str(data, "latin-1"), "latin-1"
+
+
+class _IgnoreRules:
+    """A small .gitignore matcher: globs, negation, anchoring and directory-only rules."""
+    
+    def __init__(self):
+        # (base directory, pattern, negated, directory only, anchored)
+        self._rules: List[Tuple[str, str, bool, bool, bool]] = []
+    
+    def load(self, directory: str) -> None:
+        """Add the rules of directory/.gitignore, if it exists."""
+        try:
+            with open(os.path.join(directory, ".gitignore"), "r", encoding="utf-8", errors="replace") as file:
+                lines = file.read().splitlines()
+        except OSError:
+            return
+        
+        for line in lines:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            negated = line.startswith("!")
+            line = line.lstrip("!")
+            dir_only = line.endswith("/")
+            line = line.rstrip("/")
+            anchored = "/" in line
+            self._rules.append((directory, line.lstrip("/").replace("**/", "*"), negated, dir_only, anchored))
+    
+    def ignored(self, path: str, is_dir: bool) -> bool:
+        """Check a path against the rules; the last matching rule wins."""
+        ignored = False
+        name = os.path.basename(path)
+        for base, pattern, negated, dir_only, anchored in self._rules:
+            if dir_only and not is_dir:
+                continue
+            relative = os.path.relpath(path, base).replace(os.sep, "/")
+            if relative.startswith(".."):
+                continue
+            if fnmatch.fnmatch(relative if anchored else name, pattern):
+                ignored = not negated
+        return ignored
+
+
+class FilePacker:
+    """
+    Expands paths, directories and globs and reads them concurrently.
+    
+    Directories are walked honoring .gitignore files, and files found by
+    walking or globbing are skipped when they exceed max_file_bytes.
+    Explicitly named files are always included unless they are binary.
+    Output order is deterministic: arguments in the given order, and the
+    files each one expands to sorted by path.
+    """
+    
+    def __init__(self, max_file_bytes: int = 1024 * 1024, workers: int = 8):
+        self.max_file_bytes = max_file_bytes
+        self.workers = max(1, workers)
+    
+    def expand(self, paths: Sequence[str]) -> Tuple[List[Tuple[str, bool]], List[Tuple[str, str]]]:
+        """
+        Resolve arguments into files.
+        
+        Args:
+            paths: Files, directories and glob patterns
+            
+        Returns:
+            Tuple of ((path, explicitly named) pairs, (path, reason) skipped pairs)
+            
+        Raises:
+            FileNotFoundError: If an argument matches nothing
+        """
+        files: List[Tuple[str, bool]] = []
+        skipped: List[Tuple[str, str]] = []
+        seen = set()
+        
+        def add(path: str, explicit: bool) -> None:
+            key = os.path.realpath(path)
+            if key not in seen:
+                seen.add(key)
+                files.append((os.path.normpath(path), explicit))
+        
+        for argument in paths:
+            if os.path.isfile(argument):
+                add(argument, True)
+            elif os.path.isdir(argument):
+                for path in self._walk(argument, skipped):
+                    add(path, False)
+            elif glob.has_magic(argument):
+                matches = sorted(p for p in glob.glob(argument, recursive=True) if os.path.isfile(p))
+                if not matches:
+                    raise FileNotFoundError(f"No files match {argument}")
+                for path in matches:
+                    add(path, False)
+            else:
+                raise FileNotFoundError(f"File not found: {argument}")
+        return files, skipped
+    
+    @staticmethod
+    def _walk(root: str, skipped: List[Tuple[str, str]]) -> List[str]:
+        """List the files under a directory that .gitignore does not exclude."""
+        rules = _IgnoreRules()
+        found = []
+        for directory, dirnames, filenames in os.walk(root):
+            rules.load(directory)
+            kept_dirs = []
+            for name in sorted(dirnames):
+                path = os.path.join(directory, name)
+                if name in SKIPPED_DIRS or rules.ignored(path, True):
+                    continue
+                kept_dirs.append(name)
+            dirnames[:] = kept_dirs
+            
+            for name in sorted(filenames):
+                path = os.path.join(directory, name)
+                if rules.ignored(path, False):
+                    skipped.append((path, "ignored"))
+                else:
+                    found.append(path)
+        return sorted(found)
+    
+    def read(self, path: str, explicit: bool = True) -> Tuple[Optional[PackedFile], Optional[str]]:
+        """
+        Read one file, unless it is binary or (when not explicit) too large.
+        
+        Args:
+            path: File to read
+            explicit: Whether the user named the file directly
+            
+        Returns:
+            Tuple of (file, None) on success or (None, reason skipped)
+        """
+        try:
+            size = os.path.getsize(path)
+            if not explicit and size > self.max_file_bytes:
+                return None, "too large"
+            
+            with open(path, "rb") as file:
+                if size >= MMAP_THRESHOLD:
+                    # Hash and decode straight from the mapping, without a bytes copy
+                    with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                        if b"\0" in data[:SNIFF_BYTES]:
+                            return None, "binary"
+                        digest = hashlib.sha256(data).hexdigest()
+                        text, encoding = decode_text(data)
+                else:
+                    data = file.read()
+                    if b"\0" in data[:SNIFF_BYTES]:
+                        return None, "binary"
+                    digest = hashlib.sha256(data).hexdigest()
+                    text, encoding = decode_text(data)
+        except OSError as e:
+            return None, f"unreadable: {e}"
+        return PackedFile(path, text, size, digest, encoding), None
+    
+    def pack(self, paths: Sequence[str]) -> PackResult:
+        """
+        Read files, directories and globs into one block with per-file headers.
+        
+        Args:
+            paths: Files, directories and glob patterns
+            
+        Returns:
+            PackResult with the combined text and what was skipped
+        """
+        files, skipped = self.expand(paths)
+        result = PackResult(skipped=skipped)
+        
+        if self.workers == 1:
+            outcomes = [self.read(*item) for item in files]
+        else:
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                outcomes = list(pool.map(lambda item: self.read(*item), files))
+        
+        first_by_digest: Dict[str, str] = {}
+        blocks = []
+        for (path, _), (packed, reason) in zip(files, outcomes):
+            if packed is None:
+                result.skipped.append((path, reason))
+                continue
+            if packed.sha256 in first_by_digest:
+                result.skipped.append((path, f"duplicate of {first_by_digest[packed.sha256]}"))
+                continue
+            first_by_digest[packed.sha256] = path
+            result.files.append(packed)
+            blocks.append(f"--- File Content ({path}) ---\n{packed.text}")
+        
+        result.text = "\n\n".join(blocks)
+        return result
@@ -1,45 +1,144 @@
 """Logging utilities for command history."""
 
-import logging
+import os
+import sqlite3
+import threading
+import time
 from pathlib import Path
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
+
+from .suggestions import SuggestionIndex
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS history (
+    id INTEGER PRIMARY KEY,
+    timestamp REAL NOT NULL,
+    cwd TEXT,
+    status TEXT NOT NULL,
+    exit_code INTEGER,
+    duration REAL,
+    command TEXT NOT NULL
+);
+"""
+
+# External-content full-text index kept in sync by triggers
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS history_fts USING fts5(
+    command, content='history', content_rowid='id'{tokenizer}
+);
+CREATE TRIGGER IF NOT EXISTS history_ai AFTER INSERT ON history BEGIN
+    INSERT INTO history_fts(rowid, command) VALUES (new.id, new.command);
+END;
+CREATE TRIGGER IF NOT EXISTS history_ad AFTER DELETE ON history BEGIN
+    INSERT INTO history_fts(history_fts, rowid, command) VALUES ('delete', old.id, old.command);
+END;
+"""
+
+STATUS_MARKS = {"ok": "✓"}
 
 
 class CommandLogger:
     """Handles logging and retrieval of command history."""
     
-    def __init__(self, log_file: str = "commands_history.log"):
+    def __init__(
+        self,
+        log_file: str = "history.db",
+        max_bytes: int = 50 * 1024 * 1024,
+        compact_every: int = 500
+    ):
         self.log_file = Path(log_file)
-        self._setup_logger()
+        self.max_bytes = max_bytes
+        self.compact_every = compact_every
+        self._conn: Optional[sqlite3.Connection] = None
+        self._fts = False
+        self._lock = threading.RLock()
+        # Prompts and the commands that succeeded for them, in the same database
+        self.suggestions = SuggestionIndex(self.log_file)
     
-    def _setup_logger(self) -> None:
-        """Set up the logging configuration."""
-        self.logger = logging.getLogger("command_logger")
-        self.logger.setLevel(logging.INFO)
-        
-        # Create log directory if it doesn't exist
-        self.log_file.parent.mkdir(parents=True, exist_ok=True)
-        
-        # Remove existing handlers to avoid duplicates
-        self.logger.handlers.clear()
-        
-        handler = logging.FileHandler(self.log_file)
-        formatter = logging.Formatter('%(asctime)s | %(message)s')
-        handler.setFormatter(formatter)
-        self.logger.addHandler(handler)
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """Open the history database on first use."""
+        if self._conn is None:
+            self.log_file.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.log_file), timeout=10, check_same_thread=False)
+            # WAL lets concurrent gsh processes append while others read
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self._fts = self._setup_fts(conn)
+            self._conn = conn
+        return self._conn
+    
+    @staticmethod
+    def _setup_fts(conn: sqlite3.Connection) -> bool:
+        """Create the full-text index, preferring trigram (substring) tokenization."""
+        for tokenizer in (", tokenize='trigram'", ""):
+            try:
+                conn.executescript(FTS_SCHEMA.format(tokenizer=tokenizer))
+                return True
+            except sqlite3.OperationalError:
+                continue
+        return False
     
-    def log_command(self, command: str) -> None:
+    def log_command(
+        self,
+        command: str,
+        status: str = "ok",
+        exit_code: Optional[int] = None,
+        duration: Optional[float] = None,
+        cwd: Optional[str] = None,
+        prompt: Optional[str] = None
+    ) -> None:
         """
-        Log a command to the history file.
+        Log a command to the history database.
         
         Args:
             command: The command to log
+            status: Outcome (ok, failed, timeout, idle-timeout, interrupted, error)
+            exit_code: Process exit code, if the command ran
+            duration: Run time in seconds
+            cwd: Working directory, defaults to the current one
+            prompt: Request that produced the command; successful commands
+                are added to the suggestion index under it
         """
         try:
-            self.logger.info(command.strip())
+            with self._lock, self.conn:
+                cursor = self.conn.execute(
+                    "INSERT INTO history (timestamp, cwd, status, exit_code, duration, command) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (time.time(), cwd or os.getcwd(), status, exit_code, duration, command.strip())
+                )
+            if status == "ok" and prompt:
+                self.suggestions.add(prompt, command)
+            if cursor.lastrowid % self.compact_every == 0:
+                self.compact()
         except Exception as e:
             print(f"Warning: Failed to log command: {e}")
     
+    def get_entries(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Retrieve the most recent history entries, oldest first.
+        
+        Reads only the last `limit` rows via the primary key index, so the
+        cost does not depend on how large the history is.
+        
+        Args:
+            limit: Maximum number of entries to retrieve
+            
+        Returns:
+            List of entry dictionaries
+        """
+        if not self.log_file.exists():
+            return []
+        
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT id, timestamp, cwd, status, exit_code, duration, command "
+                "FROM history ORDER BY id DESC LIMIT ?",
+                (limit if limit else -1,)
+            ).fetchall()
+        return [self._row_to_entry(row) for row in reversed(rows)]
+    
     def get_history(self, limit: Optional[int] = None) -> List[str]:
         """
         Retrieve command history.
@@ -51,26 +150,120 @@ class CommandLogger:
             List of command history entries
         """
         try:
-            if not self.log_file.exists():
-                return []
-            
-            with self.log_file.open('r', encoding='utf-8') as file:
-                lines = file.readlines()
-            
-            if limit:
-                lines = lines[-limit:]
-            
-            return [line.strip() for line in lines if line.strip()]
-            
+            return [self.format_entry(entry) for entry in self.get_entries(limit)]
         except Exception as e:
             print(f"Warning: Failed to retrieve command history: {e}")
             return []
     
+    def search(self, pattern: str, limit: int = 50) -> List[str]:
+        """
+        Search command history, newest matches last.
+        
+        Uses the full-text index when SQLite provides FTS5 (substring
+        matching with the trigram tokenizer), otherwise a LIKE scan.
+        
+        Args:
+            pattern: Text to look for in commands
+            limit: Maximum number of matches
+            
+        Returns:
+            List of matching history entries
+        """
+        if not self.log_file.exists():
+            return []
+        
+        try:
+            with self._lock:
+                conn = self.conn
+                rows = None
+                # Trigram indexes can't match patterns shorter than three characters
+                if self._fts and len(pattern) >= 3:
+                    try:
+                        rows = conn.execute(
+                            "SELECT h.id, h.timestamp, h.cwd, h.status, h.exit_code, h.duration, h.command "
+                            "FROM history_fts JOIN history h ON h.id = history_fts.rowid "
+                            "WHERE history_fts MATCH ? ORDER BY h.id DESC LIMIT ?",
+                            ('"' + pattern.replace('"', '""') + '"', limit)
+                        ).fetchall()
+                    except sqlite3.OperationalError:
+                        rows = None
+                if rows is None:
+                    escaped = pattern.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+                    rows = conn.execute(
+                        "SELECT id, timestamp, cwd, status, exit_code, duration, command "
+                        "FROM history WHERE command LIKE ? ESCAPE '\\' ORDER BY id DESC LIMIT ?",
+                        (f"%{escaped}%", limit)
+                    ).fetchall()
+            return [self.format_entry(self._row_to_entry(row)) for row in reversed(rows)]
+        except Exception as e:
+            print(f"Warning: Failed to search command history: {e}")
+            return []
+    
+    def compact(self) -> None:
+        """
+        Shrink the database once it exceeds max_bytes.
+        
+        The oldest tenth of the history and the least recently used tenth
+        of the suggestion index are dropped together, so neither grows
+        while compaction eats into the other.
+        """
+        try:
+            with self._lock:
+                page_size = self.conn.execute("PRAGMA page_size").fetchone()[0]
+                pages = self.conn.execute("PRAGMA page_count").fetchone()[0]
+                if page_size * pages <= self.max_bytes:
+                    return
+                
+                with self.conn:
+                    self.conn.execute(
+                        "DELETE FROM history WHERE id <= ("
+                        "SELECT id FROM history ORDER BY id "
+                        "LIMIT 1 OFFSET (SELECT COUNT(*) / 10 FROM history))"
+                    )
+                self.suggestions.compact()
+                self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+                self.conn.execute("VACUUM")
+        except sqlite3.Error as e:
+            print(f"Warning: Failed to compact command history: {e}")
+    
+    @staticmethod
+    def _row_to_entry(row: tuple) -> Dict[str, Any]:
+        """Convert a history row into a dictionary."""
+        keys = ("id", "timestamp", "cwd", "status", "exit_code", "duration", "command")
+        return dict(zip(keys, row))
+    
+    @staticmethod
+    def format_entry(entry: Dict[str, Any]) -> str:
+        """
+        Format a history entry for display.
+        
+        Args:
+            entry: Entry dictionary from get_entries
+            
+        Returns:
+            One-line description of the entry
+        """
+        stamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(entry["timestamp"]))
+        mark = STATUS_MARKS.get(entry["status"], "✗")
+        details = []
+        if entry["status"] != "ok":
+            details.append(entry["status"])
+        if entry["exit_code"] not in (None, 0):
+            details.append(f"exit {entry['exit_code']}")
+        if entry["duration"] is not None:
+            details.append(f"{entry['duration']:.1f}s")
+        suffix = f" ({', '.join(details)})" if details else ""
+        return f"{stamp} | {mark} {entry['command']}{suffix} [{entry['cwd']}]"
+    
     def clear_history(self) -> None:
-        """Clear the command history file."""
+        """Clear the command history."""
         try:
             if self.log_file.exists():
-                self.log_file.unlink()
+                with self._lock:
+                    with self.conn:
+                        self.conn.execute("DELETE FROM history")
+                    self.suggestions.clear()
+                    self.conn.execute("VACUUM")
             print("✓ Command history cleared")
         except Exception as e:
-            print(f"Error clearing history: {e}")
\ No newline at end of file
+            print(f"Error clearing history: {e}")
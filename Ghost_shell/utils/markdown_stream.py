@@ -0,0 +1,157 @@
+"""Incremental markdown rendering for streamed responses."""
+
+from contextlib import contextmanager
+from typing import Iterator, List, Optional, Tuple
+from rich.console import Console, ConsoleOptions, RenderableType, RenderResult
+from rich.live import Live
+from rich.markdown import Markdown
+from rich.spinner import Spinner
+
+
+class _OpenBlock:
+    """
+    Live view of the unfinished block, parsed only when it is drawn.
+    
+    Chunks just extend the renderer's pending text; the markdown is parsed
+    when Live refreshes, at most refresh_per_second times, and reused
+    while the text hasn't changed.
+    """
+    
+    def __init__(self, renderer: "StreamingMarkdownRenderer"):
+        self.renderer = renderer
+        self._parsed: Tuple[str, Markdown] = ("", Markdown(""))
+    
+    def __rich_console__(self, console: Console, options: ConsoleOptions) -> RenderResult:
+        text = "".join(self.renderer._pending)
+        if text != self._parsed[0]:
+            self._parsed = (text, Markdown(text))
+        yield self._parsed[1]
+
+
+class StreamingMarkdownRenderer:
+    """
+    Renders a markdown stream block by block.
+    
+    Finished blocks (paragraphs separated by blank lines, or closed code
+    fences) are printed once. The trailing open block is shown in a live
+    region that Live redraws on its own timer, so it is re-parsed at most
+    refresh_per_second times however fast chunks arrive.
+    """
+    
+    def __init__(self, console: Console, refresh_per_second: float = 12.0):
+        self.console = console
+        self.refresh_per_second = refresh_per_second
+        self._parts: List[str] = []
+        self._pending: List[str] = []
+        self._scanned = 0
+        self._fence: Optional[str] = None
+        self._view = _OpenBlock(self)
+        self._showing_text = False
+        self._live: Optional[Live] = None
+    
+    def __enter__(self) -> "StreamingMarkdownRenderer":
+        self._start_live(Spinner("dots", text="[bold green]Thinking...[/]"))
+        return self
+    
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+    
+    @property
+    def text(self) -> str:
+        """The full text received so far."""
+        return "".join(self._parts)
+    
+    def feed(self, text: str) -> None:
+        """
+        Add a chunk of streamed text.
+        
+        Args:
+            text: Next chunk of the response
+        """
+        if not text:
+            return
+        
+        self._parts.append(text)
+        self._pending.append(text)
+        if self._live is not None and not self._showing_text:
+            # Replace the spinner; from here on Live's timer does the redrawing
+            self._showing_text = True
+            self._live.update(self._view)
+        if "\n" in text:
+            self._commit_finished_blocks()
+    
+    @contextmanager
+    def paused(self) -> Iterator[None]:
+        """Stop the live region, e.g. to ask a question, and redraw it afterwards."""
+        if self._live is None:
+            yield
+            return
+        
+        self._live.update("", refresh=True)
+        self._live.stop()
+        self._live = None
+        try:
+            yield
+        finally:
+            self._start_live(self._view)
+    
+    def close(self) -> None:
+        """Print whatever is left of the stream and stop the live region."""
+        remainder = "".join(self._pending)
+        self._pending = []
+        self._scanned = 0
+        
+        if self._live is not None:
+            self._live.update("", refresh=True)
+            self._live.stop()
+            self._live = None
+        
+        if remainder.strip():
+            self.console.print(Markdown(remainder))
+    
+    def _start_live(self, renderable: RenderableType) -> None:
+        """Show a transient live region below the committed text."""
+        self._live = Live(
+            renderable,
+            console=self.console,
+            auto_refresh=True,
+            refresh_per_second=self.refresh_per_second,
+            transient=True
+        )
+        self._live.start()
+    
+    def _commit_finished_blocks(self) -> None:
+        """Print every complete block at the start of the pending buffer."""
+        buffer = "".join(self._pending)
+        boundary = 0
+        pos = self._scanned
+        
+        while True:
+            end = buffer.find("\n", pos)
+            if end == -1:
+                break
+            line = buffer[pos:end].strip()
+            pos = end + 1
+            
+            if self._fence is not None:
+                if line.startswith(self._fence) and not line[len(self._fence):].strip():
+                    self._fence = None
+                    boundary = pos
+            elif line.startswith("```") or line.startswith("~~~"):
+                marker = line[0]
+                self._fence = line[:len(line) - len(line.lstrip(marker))]
+            elif not line:
+                boundary = pos
+        
+        self._scanned = pos
+        if boundary == 0:
+            self._pending = [buffer]
+            return
+        
+        # Drop the block from the live view before printing it: printing
+        # redraws the live region, which must not show the block again
+        block = buffer[:boundary]
+        self._pending = [buffer[boundary:]]
+        self._scanned = pos - boundary
+        if block.strip():
+            self.console.print(Markdown(block))
@@ -0,0 +1,182 @@
+"""Lightweight per-phase timing and throughput metrics."""
+
+import contextlib
+import json
+import os
+import threading
+import time
+from typing import Any, ContextManager, Dict, List, Optional
+
+_NULL_SPAN = contextlib.nullcontext()
+
+
+class _Span:
+    """Times one phase and adds it to the owning Metrics."""
+    
+    __slots__ = ("_metrics", "_name", "_start")
+    
+    def __init__(self, metrics: "Metrics", name: str):
+        self._metrics = metrics
+        self._name = name
+        self._start = 0.0
+    
+    def __enter__(self) -> "_Span":
+        self._start = time.perf_counter()
+        return self
+    
+    def __exit__(self, *exc_info: Any) -> None:
+        self._metrics.add_time(self._name, time.perf_counter() - self._start)
+
+
+class Metrics:
+    """
+    Collects phase timings, counters and per-command results for one run.
+    
+    Disabled by default: span() then returns a shared no-op context manager
+    and the other methods return immediately, so instrumentation can stay
+    in hot paths.
+    """
+    
+    def __init__(self):
+        self.enabled = False
+        self.started = time.perf_counter()
+        self.spans: Dict[str, List[float]] = {}  # name -> [seconds, calls]
+        self.values: Dict[str, Any] = {}
+        self.commands: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+    
+    def enable(self, started: Optional[float] = None) -> None:
+        """
+        Start collecting.
+        
+        Args:
+            started: perf_counter() value that counts as the start of the run
+        """
+        self.enabled = True
+        if started is not None:
+            self.started = started
+    
+    def span(self, name: str) -> ContextManager:
+        """Time a phase; repeated spans with the same name add up."""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name)
+    
+    def add_time(self, name: str, seconds: float) -> None:
+        """Add time spent in a phase measured elsewhere."""
+        if not self.enabled:
+            return
+        with self._lock:
+            entry = self.spans.setdefault(name, [0.0, 0])
+            entry[0] += seconds
+            entry[1] += 1
+    
+    def set(self, name: str, value: Any) -> None:
+        """Record a value, replacing any earlier one."""
+        if self.enabled:
+            self.values[name] = value
+    
+    def record_command(self, command: str, status: str, duration: float) -> None:
+        """Record the outcome of one executed command."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self.commands.append(
+                {"command": command, "status": status, "seconds": round(duration, 4)}
+            )
+    
+    def record_stream(
+        self,
+        request_start: float,
+        first_chunk: Optional[float],
+        end: float,
+        chunks: int,
+        bytes_streamed: int,
+        output_tokens: int,
+        render_seconds: float
+    ) -> None:
+        """
+        Record the shape of one streamed response.
+        
+        Args:
+            request_start: perf_counter() when the request was sent
+            first_chunk: perf_counter() when the first chunk arrived
+            end: perf_counter() when the stream ended
+            chunks: Number of chunks received
+            bytes_streamed: UTF-8 size of the response
+            output_tokens: Response tokens, reported or estimated
+            render_seconds: Time spent rendering chunks
+        """
+        if not self.enabled:
+            return
+        self.set("ttft_ms", round((first_chunk - request_start) * 1000, 2) if first_chunk else None)
+        self.set("chunks", chunks)
+        self.set("bytes", bytes_streamed)
+        self.set("output_tokens", output_tokens)
+        generating = end - (first_chunk or request_start)
+        self.set("tokens_per_s", round(output_tokens / generating, 1) if generating > 0 else None)
+        self.add_time("render", render_seconds)
+    
+    def to_record(self) -> Dict[str, Any]:
+        """Build one JSON-serializable record of the run."""
+        return {
+            "timestamp": time.time(),
+            "pid": os.getpid(),
+            "total_ms": round((time.perf_counter() - self.started) * 1000, 2),
+            "spans": {
+                name: {"ms": round(seconds * 1000, 2), "calls": calls}
+                for name, (seconds, calls) in self.spans.items()
+            },
+            "values": self.values,
+            "commands": self.commands,
+        }
+    
+    def write_jsonl(self, path: str) -> None:
+        """
+        Append the run as one JSON line.
+        
+        Args:
+            path: Metrics file; lines from concurrent runs are appended whole
+        """
+        line = json.dumps(self.to_record(), default=str) + "\n"
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        # A single O_APPEND write keeps lines from concurrent gsh processes intact
+        fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, line.encode("utf-8"))
+        finally:
+            os.close(fd)
+    
+    def print_summary(self, console: Any) -> None:
+        """
+        Print phase timings and stream statistics as a table.
+        
+        Args:
+            console: rich Console to print to
+        """
+        from rich.table import Table
+        
+        record = self.to_record()
+        table = Table(title=f"Profile ({record['total_ms']:.1f} ms total)", show_edge=False)
+        table.add_column("Phase")
+        table.add_column("ms", justify="right")
+        table.add_column("calls", justify="right")
+        for name, span in record["spans"].items():
+            table.add_row(name, f"{span['ms']:.1f}", str(span["calls"]))
+        for name, value in record["values"].items():
+            # Structured values (e.g. --compare results) are for the JSONL export
+            if isinstance(value, (list, dict)):
+                continue
+            table.add_row(f"[cyan]{name}[/cyan]", "-" if value is None else str(value), "")
+        for command in record["commands"]:
+            table.add_row(
+                f"[green]$ {command['command'][:60]}[/green]",
+                f"{command['seconds'] * 1000:.1f}",
+                command["status"]
+            )
+        console.print(table)
+
+
+# Shared by every module in the process
+metrics = Metrics()
@@ -0,0 +1,164 @@
+"""Streaming a response to an output file that is replaced atomically."""
+
+import os
+import secrets
+from pathlib import Path
+from typing import Optional, Union
+
+from .command_parser import FENCE_OPENERS, FENCE_PATTERN
+
+
+class OutputFile:
+    """
+    Writes a streamed response next to its target and renames it into place.
+    
+    Chunks go to a temporary file in the target's directory as they arrive,
+    so memory stays flat and the target is never left half-written. commit()
+    fsyncs and atomically replaces the target; abort() keeps what arrived
+    as <target>.partial. With code_only, only the contents of fenced code
+    blocks are written, e.g. to produce a runnable setup.sh.
+    """
+    
+    def __init__(self, path: Union[str, Path], code_only: bool = False):
+        self.path = Path(path)
+        self.code_only = code_only
+        # Fenced blocks written so far (code_only)
+        self.blocks = 0
+        self._fence: Optional[str] = None
+        self._partial = ""
+        self._written = False
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd = self._create_temp()
+        self._file = os.fdopen(fd, "w", encoding="utf-8", newline="")
+    
+    def write(self, text: str) -> None:
+        """
+        Append the next chunk of the response.
+        
+        Args:
+            text: Next chunk of the response
+        """
+        if not self.code_only:
+            if text:
+                self._file.write(text)
+                self._written = True
+            return
+        
+        lines = (self._partial + text).split("\n")
+        self._partial = lines.pop()
+        for line in lines:
+            self._write_code_line(line)
+    
+    def commit(self) -> None:
+        """
+        Flush to disk and replace the target with the finished file.
+        
+        Raises:
+            ValueError: If code_only found no code blocks; the target is left alone
+            OSError: If the file cannot be written or renamed
+        """
+        self._flush_partial()
+        try:
+            if self.code_only and not self.blocks:
+                raise ValueError("no code blocks in the response")
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+            self._set_mode()
+            os.replace(self._temp_path, self.path)
+        except BaseException:
+            self._discard()
+            raise
+        self._sync_directory()
+    
+    def abort(self) -> Optional[Path]:
+        """
+        Keep whatever arrived as <target>.partial after a failure or interrupt.
+        
+        Returns:
+            The partial file, or None if nothing had been written
+        """
+        self._flush_partial()
+        self._file.close()
+        if not self._written:
+            self._discard()
+            return None
+        partial = self.path.with_name(self.path.name + ".partial")
+        self._set_mode()
+        os.replace(self._temp_path, partial)
+        return partial
+    
+    def _write_code_line(self, line: str) -> None:
+        """Write one line if it is inside a fenced block, tracking the fences."""
+        if self._fence is None:
+            if line.lstrip()[:3] in FENCE_OPENERS:
+                match = FENCE_PATTERN.match(line)
+                if match:
+                    self._fence = match.group(1)
+                    # Separate consecutive blocks with a blank line
+                    if self.blocks:
+                        self._file.write("\n")
+                    self.blocks += 1
+            return
+        
+        stripped = line.strip()
+        if stripped.startswith(self._fence) and not stripped.lstrip(self._fence[0]):
+            self._fence = None
+            return
+        self._file.write(line + "\n")
+        self._written = True
+    
+    def _flush_partial(self) -> None:
+        """Handle a last line without a trailing newline."""
+        if self._partial:
+            if self._fence is not None and not self._file.closed:
+                self._write_code_line(self._partial)
+            self._partial = ""
+    
+    def _create_temp(self) -> int:
+        """Create the temporary file next to the target and return its descriptor."""
+        flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0)
+        for _ in range(100):
+            self._temp_path = self.path.with_name(f".{self.path.name}.{secrets.token_hex(4)}.tmp")
+            try:
+                # Created 0o666 so the kernel applies the umask, as for any
+                # new file; reading the umask would mean changing it
+                return os.open(self._temp_path, flags, 0o666)
+            except FileExistsError:
+                continue
+        raise FileExistsError(f"No free temporary name next to {self.path}")
+    
+    def _set_mode(self) -> None:
+        """Keep an existing target's permissions, else the new file's umask defaults."""
+        try:
+            os.chmod(self._temp_path, self.path.stat().st_mode & 0o7777)
+            return
+        except FileNotFoundError:
+            pass
+        # Extracted scripts with a shebang are made runnable by whoever may read them
+        if self.code_only and self._starts_with_shebang():
+            mode = os.stat(self._temp_path).st_mode & 0o7777
+            os.chmod(self._temp_path, mode | (mode & 0o444) >> 2)
+    
+    def _starts_with_shebang(self) -> bool:
+        """Check whether the written file begins with #!."""
+        with open(self._temp_path, "rb") as file:
+            return file.read(2) == b"#!"
+    
+    def _discard(self) -> None:
+        """Close and remove the temporary file."""
+        self._file.close()
+        try:
+            self._temp_path.unlink()
+        except FileNotFoundError:
+            pass
+    
+    def _sync_directory(self) -> None:
+        """Persist the rename itself where the platform allows it."""
+        if os.name != "posix":
+            return
+        fd = os.open(self.path.parent, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
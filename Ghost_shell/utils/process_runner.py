@@ -0,0 +1,219 @@
+"""Streaming subprocess execution with timeouts and process-group cleanup."""
+
+import os
+import queue
+import signal
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import IO, Callable, List, Optional
+
+# Called with ("stdout" | "stderr", line) for every line of output
+LineCallback = Callable[[str, str], None]
+
+
+@dataclass
+class CommandResult:
+    """Outcome of running one shell command."""
+    
+    command: str
+    status: str = "ok"  # ok, failed, timeout, idle-timeout, interrupted, error
+    returncode: Optional[int] = None
+    duration: float = 0.0
+    output_tail: List[str] = field(default_factory=list)
+    output_lines: int = 0
+    error: Optional[str] = None
+    
+    @property
+    def succeeded(self) -> bool:
+        """Whether the command exited with status 0."""
+        return self.status == "ok"
+
+
+def _pump(stream: IO[bytes], name: str, lines: "queue.Queue") -> None:
+    """Forward lines from a pipe to the queue, then a None sentinel."""
+    try:
+        for raw in iter(stream.readline, b""):
+            lines.put((name, raw.decode("utf-8", errors="replace").rstrip("\r\n")))
+    finally:
+        stream.close()
+        lines.put(None)
+
+
+def _kill_group(process: subprocess.Popen, grace: float = 2.0) -> None:
+    """Terminate the command's whole process group, escalating to a hard kill."""
+    if process.poll() is not None:
+        return
+    
+    try:
+        if os.name == "posix":
+            os.killpg(process.pid, signal.SIGTERM)
+        else:
+            process.send_signal(signal.CTRL_BREAK_EVENT)
+        process.wait(timeout=grace)
+    except (OSError, subprocess.TimeoutExpired):
+        try:
+            if os.name == "posix":
+                os.killpg(process.pid, signal.SIGKILL)
+            else:
+                process.kill()
+        except OSError:
+            pass
+        process.wait()
+
+
+def _terminal_fd() -> Optional[int]:
+    """Return stdin's descriptor if it is the terminal and we are in its foreground."""
+    try:
+        fd = sys.stdin.fileno()
+        if os.isatty(fd) and os.tcgetpgrp(fd) == os.getpgrp():
+            return fd
+    except (AttributeError, OSError, ValueError):
+        pass
+    return None
+
+
+def _set_foreground(fd: int, pgid: int) -> None:
+    """Hand the terminal to a process group, even from a background group."""
+    # SIGTTOU would stop a background caller; while blocked, the call goes through
+    blocked = signal.pthread_sigmask(signal.SIG_BLOCK, {signal.SIGTTOU})
+    try:
+        os.tcsetpgrp(fd, pgid)
+    finally:
+        signal.pthread_sigmask(signal.SIG_SETMASK, blocked)
+
+
+def _group_options(terminal: Optional[int]) -> dict:
+    """Popen arguments that start the command in a new process group."""
+    if os.name != "posix":
+        return {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP}
+    if terminal is not None:
+        def take_terminal() -> None:
+            os.setpgid(0, 0)
+            _set_foreground(terminal, os.getpgrp())
+        
+        return {"preexec_fn": take_terminal}
+    # Unlike start_new_session, this keeps the controlling terminal, so a
+    # command that opens /dev/tty (sudo asking for a password) still can
+    if sys.version_info >= (3, 11):
+        return {"process_group": 0}
+    return {"preexec_fn": lambda: os.setpgid(0, 0)}
+
+
+def run_command(
+    command: str,
+    timeout: Optional[float] = None,
+    idle_timeout: Optional[float] = None,
+    tail_lines: int = 200,
+    on_line: Optional[LineCallback] = None,
+    stop_event: Optional[threading.Event] = None,
+    interactive: bool = False
+) -> CommandResult:
+    """
+    Run a shell command, streaming its output as it is produced.
+    
+    The command runs in its own process group so a timeout or Ctrl-C stops
+    everything it started. Only the last tail_lines lines are retained.
+    
+    Non-interactive commands get no stdin, so several can run at once
+    without fighting over the terminal. Interactive ones inherit stdin and,
+    when it is the terminal, become its foreground job for their lifetime,
+    so sudo and apt can prompt and Ctrl-C reaches them directly.
+    
+    Args:
+        command: Shell command to run
+        timeout: Total time limit in seconds, or None for no limit
+        idle_timeout: Limit on time without any output, or None for no limit
+        tail_lines: Number of trailing output lines to keep
+        on_line: Callback invoked for each output line as it arrives
+        stop_event: Event that, when set, stops the command as if interrupted
+        interactive: Inherit stdin and the terminal instead of reading nothing
+        
+    Returns:
+        CommandResult describing the outcome
+        
+    Raises:
+        KeyboardInterrupt: Re-raised after the process group is killed
+    """
+    result = CommandResult(command)
+    tail: deque = deque(maxlen=tail_lines)
+    start = time.monotonic()
+    
+    terminal = _terminal_fd() if interactive and os.name == "posix" else None
+    try:
+        process = subprocess.Popen(
+            command,
+            shell=True,
+            stdin=None if interactive else subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            **_group_options(terminal)
+        )
+    except (OSError, subprocess.SubprocessError) as e:
+        result.status = "error"
+        result.error = str(e)
+        return result
+    
+    lines: "queue.Queue" = queue.Queue()
+    readers = [
+        threading.Thread(target=_pump, args=(process.stdout, "stdout", lines), daemon=True),
+        threading.Thread(target=_pump, args=(process.stderr, "stderr", lines), daemon=True),
+    ]
+    for reader in readers:
+        reader.start()
+    
+    open_streams = len(readers)
+    last_output = start
+    try:
+        while open_streams:
+            try:
+                item = lines.get(timeout=0.1)
+            except queue.Empty:
+                item = False
+            
+            now = time.monotonic()
+            if item is None:
+                open_streams -= 1
+            elif item:
+                last_output = now
+                result.output_lines += 1
+                tail.append(item[1])
+                if on_line is not None:
+                    on_line(*item)
+            
+            if timeout and now - start > timeout:
+                result.status = "timeout"
+                break
+            if idle_timeout and now - last_output > idle_timeout:
+                result.status = "idle-timeout"
+                break
+            if stop_event is not None and stop_event.is_set():
+                result.status = "interrupted"
+                break
+        
+        if result.status == "ok":
+            result.returncode = process.wait()
+            if result.returncode == -signal.SIGINT and terminal is not None:
+                # Ctrl-C went to the command's foreground group, not to us
+                result.status = "interrupted"
+                raise KeyboardInterrupt
+            if result.returncode != 0:
+                result.status = "failed"
+        else:
+            _kill_group(process)
+            result.returncode = process.returncode
+            
+    except KeyboardInterrupt:
+        _kill_group(process)
+        result.status = "interrupted"
+        raise
+    finally:
+        if terminal is not None:
+            _set_foreground(terminal, os.getpgrp())
+        result.duration = time.monotonic() - start
+        result.output_tail = list(tail)
+    
+    return result
@@ -0,0 +1,124 @@
+"""Client-side rate limiting and retry helpers for API calls."""
+
+import random
+import threading
+import time
+from typing import Callable, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class RateLimiter:
+    """Thread-safe token-bucket limiter for requests and tokens per minute."""
+    
+    def __init__(
+        self,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None
+    ):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._lock = threading.Lock()
+        self._request_allowance = float(requests_per_minute or 0)
+        self._token_allowance = float(tokens_per_minute or 0)
+        self._last = time.monotonic()
+    
+    def acquire(self, tokens: int = 0) -> None:
+        """
+        Block until one request using the given number of tokens may be sent.
+        
+        Args:
+            tokens: Estimated tokens the request will consume
+        """
+        if not self.requests_per_minute and not self.tokens_per_minute:
+            return
+        
+        while True:
+            with self._lock:
+                self._refill()
+                wait = 0.0
+                if self.requests_per_minute and self._request_allowance < 1:
+                    wait = (1 - self._request_allowance) * 60 / self.requests_per_minute
+                if self.tokens_per_minute:
+                    # A single request larger than the budget may still go once the bucket is full
+                    needed = min(tokens, self.tokens_per_minute)
+                    if self._token_allowance < needed:
+                        wait = max(
+                            wait,
+                            (needed - self._token_allowance) * 60 / self.tokens_per_minute
+                        )
+                
+                if wait <= 0:
+                    if self.requests_per_minute:
+                        self._request_allowance -= 1
+                    if self.tokens_per_minute:
+                        self._token_allowance -= tokens
+                    return
+            
+            time.sleep(wait)
+    
+    def _refill(self) -> None:
+        """Top up both buckets for the time elapsed since the last call."""
+        now = time.monotonic()
+        elapsed = now - self._last
+        self._last = now
+        if self.requests_per_minute:
+            self._request_allowance = min(
+                self.requests_per_minute,
+                self._request_allowance + elapsed * self.requests_per_minute / 60
+            )
+        if self.tokens_per_minute:
+            self._token_allowance = min(
+                self.tokens_per_minute,
+                self._token_allowance + elapsed * self.tokens_per_minute / 60
+            )
+
+
+def backoff_delay(attempt: int, base_delay: float = 1.0, max_delay: float = 30.0) -> float:
+    """
+    Delay before a retry: exponential in the attempt number, with jitter.
+    
+    Args:
+        attempt: Number of attempts that already failed, minus one
+        base_delay: Delay before the first retry in seconds
+        max_delay: Upper bound before jitter
+        
+    Returns:
+        Seconds to wait
+    """
+    return min(max_delay, base_delay * (2 ** attempt)) * random.uniform(0.5, 1.5)
+
+
+def call_with_retries(
+    func: Callable[[], T],
+    attempts: int = 3,
+    base_delay: float = 1.0,
+    max_delay: float = 30.0,
+    retryable: Optional[Callable[[Exception], bool]] = None
+) -> T:
+    """
+    Call a function, retrying with exponential backoff and jitter on failure.
+    
+    Args:
+        func: Zero-argument callable to invoke
+        attempts: Total number of attempts
+        base_delay: Delay before the first retry in seconds
+        max_delay: Upper bound for a single delay
+        retryable: Decides whether an error is worth another attempt;
+            others are raised at once. None retries every error
+            
+    Returns:
+        The function's return value
+        
+    Raises:
+        Exception: The last error once all attempts are used up, or the
+            first one that is not retryable
+    """
+    for attempt in range(attempts):
+        try:
+            return func()
+        except Exception as e:
+            if attempt == attempts - 1 or (retryable is not None and not retryable(e)):
+                raise
+            time.sleep(backoff_delay(attempt, base_delay, max_delay))
+    raise RuntimeError("attempts must be at least 1")
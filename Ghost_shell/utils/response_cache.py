@@ -0,0 +1,205 @@
+"""Persistent response cache for AI model calls."""
+
+import hashlib
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+
+class ResponseCache:
+    """Content-addressed on-disk cache of model responses with TTL and LRU eviction."""
+    
+    def __init__(
+        self,
+        db_path: str,
+        max_bytes: int = 50 * 1024 * 1024,
+        ttl: int = 7 * 24 * 3600
+    ):
+        self.db_path = Path(db_path)
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._conn: Optional[sqlite3.Connection] = None
+        # One connection shared by worker threads, serialized by this lock
+        self._lock = threading.RLock()
+    
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """Open the cache database on first use."""
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(
+                str(self.db_path), timeout=10, check_same_thread=False
+            )
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    response TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created REAL NOT NULL,
+                    accessed REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS responses_accessed ON responses(accessed);
+                CREATE TABLE IF NOT EXISTS stats (
+                    name TEXT PRIMARY KEY,
+                    value INTEGER NOT NULL
+                );
+                """
+            )
+        return self._conn
+    
+    @staticmethod
+    def make_key(
+        model_name: str,
+        task_type: str,
+        system_prompt: str,
+        prompt: str,
+        file_contents: Iterable[str] = ()
+    ) -> str:
+        """
+        Build a cache key from everything that determines the response.
+        
+        Args:
+            model_name: Name of the model
+            task_type: Task type used to pick the prompt template
+            system_prompt: System instruction sent with the request
+            prompt: The user's prompt text
+            file_contents: Contents of any attached files
+            
+        Returns:
+            Hex digest identifying the request
+        """
+        digest = hashlib.sha256()
+        for part in (model_name, task_type, system_prompt, prompt, *file_contents):
+            data = part.encode("utf-8")
+            # Length-prefix each part so boundaries can't be shifted between fields
+            digest.update(len(data).to_bytes(8, "big"))
+            digest.update(data)
+        return digest.hexdigest()
+    
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a cached response.
+        
+        Args:
+            key: Cache key from make_key
+            
+        Returns:
+            The cached response, or None on a miss or expired entry
+        """
+        with self._lock:
+            try:
+                now = time.time()
+                row = self.conn.execute(
+                    "SELECT response, created FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                
+                if row is None or now - row[1] > self.ttl:
+                    if row is not None:
+                        with self.conn:
+                            self.conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self._bump("misses")
+                    return None
+                
+                with self.conn:
+                    self.conn.execute(
+                        "UPDATE responses SET accessed = ? WHERE key = ?", (now, key)
+                    )
+                self._bump("hits")
+                return row[0]
+                
+            except sqlite3.Error as e:
+                print(f"Warning: Response cache unavailable: {e}")
+                return None
+    
+    def put(self, key: str, response: str) -> None:
+        """
+        Store a response and evict old entries if over the size limit.
+        
+        Args:
+            key: Cache key from make_key
+            response: Response text to store
+        """
+        if not response:
+            return
+        
+        with self._lock:
+            try:
+                now = time.time()
+                with self.conn:
+                    self.conn.execute(
+                        "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                        (key, response, len(response.encode("utf-8")), now, now)
+                    )
+                self._evict(now)
+            except sqlite3.Error as e:
+                print(f"Warning: Could not write response cache: {e}")
+    
+    def _evict(self, now: float) -> None:
+        """Drop expired entries, then least recently used ones until under max_bytes."""
+        with self.conn:
+            self.conn.execute(
+                "DELETE FROM responses WHERE created < ?", (now - self.ttl,)
+            )
+            total = self.conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()[0]
+            
+            if total <= self.max_bytes:
+                return
+            
+            rows = self.conn.execute(
+                "SELECT key, size FROM responses ORDER BY accessed ASC"
+            ).fetchall()
+            stale = []
+            for key, size in rows:
+                if total <= self.max_bytes:
+                    break
+                stale.append((key,))
+                total -= size
+            self.conn.executemany("DELETE FROM responses WHERE key = ?", stale)
+            self._bump("evictions", len(stale))
+    
+    def _bump(self, name: str, amount: int = 1) -> None:
+        """Increment a persistent statistics counter."""
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO stats VALUES (?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+                (name, amount)
+            )
+    
+    def stats(self) -> Dict[str, int]:
+        """
+        Get cache statistics.
+        
+        Returns:
+            Dictionary with hit/miss/eviction counters, entry count and size
+        """
+        with self._lock:
+            try:
+                result = {"hits": 0, "misses": 0, "evictions": 0}
+                result.update(dict(self.conn.execute("SELECT name, value FROM stats")))
+                entries, size = self.conn.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+                ).fetchone()
+                result["entries"] = entries
+                result["bytes"] = size
+                return result
+            except sqlite3.Error as e:
+                print(f"Warning: Could not read cache statistics: {e}")
+                return {}
+    
+    def clear(self) -> None:
+        """Remove all cached responses and reset statistics."""
+        with self._lock:
+            try:
+                with self.conn:
+                    self.conn.execute("DELETE FROM responses")
+                    self.conn.execute("DELETE FROM stats")
+                print("✓ Response cache cleared")
+            except sqlite3.Error as e:
+                print(f"Error clearing response cache: {e}")
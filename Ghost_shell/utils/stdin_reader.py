@@ -0,0 +1,200 @@
+"""Bounded, incremental reading of piped standard input."""
+
+import codecs
+import io
+import os
+import queue
+import select
+import stat
+import sys
+import threading
+import time
+from collections import deque
+from typing import BinaryIO, Deque, Iterator, Optional
+
+
+def stdin_is_piped() -> bool:
+    """
+    Check whether standard input is a pipe or a redirected file.
+    
+    Terminals and character devices such as /dev/null (as under cron or
+    systemd) are not treated as input.
+    """
+    try:
+        mode = os.fstat(sys.stdin.fileno()).st_mode
+    except (AttributeError, OSError, ValueError):
+        return False
+    return stat.S_ISFIFO(mode) or stat.S_ISREG(mode) or stat.S_ISSOCK(mode)
+
+
+class StdinReader:
+    """
+    Reads a byte stream line by line without ever holding all of it.
+    
+    Lines longer than line_bytes are split, so a stream without newlines
+    still arrives in bounded pieces. Reading stops after max_bytes, and
+    `truncated` records that the limit was reached.
+    """
+    
+    def __init__(
+        self,
+        stream: Optional[BinaryIO] = None,
+        max_bytes: Optional[int] = None,
+        line_bytes: int = 64 * 1024
+    ):
+        self.stream = stream if stream is not None else sys.stdin.buffer
+        self.max_bytes = max_bytes
+        self.line_bytes = line_bytes
+        self.bytes_read = 0
+        self.truncated = False
+        # First byte, read ahead by at_eof()
+        self._pending = b""
+    
+    def ready(self, timeout: float) -> bool:
+        """
+        Wait up to timeout seconds for input or the end of the stream.
+        
+        A pipe that is open but never written to (as under some CI runners,
+        cron jobs or callers of subprocess.Popen with stdin=PIPE) stays
+        unready, so at_eof() would block on it forever.
+        
+        Args:
+            timeout: Seconds to wait
+            
+        Returns:
+            True if reading would not block
+        """
+        if self._pending:
+            return True
+        try:
+            fd = self.stream.fileno()
+        except (AttributeError, OSError, io.UnsupportedOperation):
+            # In-memory streams never block
+            return True
+        if os.name == "nt":
+            # select() only handles sockets on Windows
+            return True
+        readable, _, _ = select.select([fd], [], [], timeout)
+        return bool(readable)
+    
+    def at_eof(self) -> bool:
+        """
+        Wait for the first byte and check whether the stream ended without any.
+        
+        An upstream command that printed nothing still leaves an open pipe;
+        this tells that apart from real input without losing any of it.
+        
+        Returns:
+            True if the stream is empty
+        """
+        if not self._pending:
+            self._pending = self.stream.read(1)
+        return not self._pending
+    
+    def lines(self) -> Iterator[str]:
+        """
+        Yield decoded lines, including their line endings, as they arrive.
+        
+        Yields:
+            Lines of text
+        """
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        while True:
+            limit = self.line_bytes
+            if self.max_bytes is not None:
+                limit = min(limit, self.max_bytes - self.bytes_read)
+                if limit <= 0:
+                    # Peeking for more data would block on a live stream, so
+                    # reaching the limit counts as truncation
+                    self.truncated = True
+                    break
+            if self._pending:
+                raw, self._pending = self._pending, b""
+                if raw != b"\n" and limit > 1:
+                    raw += self.stream.readline(limit - 1)
+            else:
+                raw = self.stream.readline(limit)
+            if not raw:
+                break
+            self.bytes_read += len(raw)
+            text = decoder.decode(raw)
+            if text:
+                yield text
+        tail = decoder.decode(b"", final=True)
+        if tail:
+            yield tail
+    
+    def read_head(self) -> str:
+        """Read the stream up to max_bytes."""
+        return "".join(self.lines())
+    
+    def read_tail(self, tail_bytes: int) -> str:
+        """
+        Consume the stream, keeping only about its last tail_bytes characters.
+        
+        Whole lines are kept, so memory stays near tail_bytes however long
+        the stream runs.
+        
+        Args:
+            tail_bytes: Amount of trailing text to keep
+            
+        Returns:
+            The end of the stream
+        """
+        kept: Deque[str] = deque()
+        size = 0
+        for line in self.lines():
+            kept.append(line)
+            size += len(line)
+            while len(kept) > 1 and size > tail_bytes:
+                size -= len(kept.popleft())
+        return "".join(kept)[-tail_bytes:]
+    
+    def windows(self, interval: float, max_chars: int) -> Iterator[str]:
+        """
+        Group a live stream into windows by time and size.
+        
+        A window is emitted once interval seconds have passed since the last
+        one (if any text arrived) or when it reaches max_chars, and the rest
+        at the end of the stream. Lines are read on a background thread, so a
+        quiet stream such as `journalctl -f` still produces windows on time.
+        
+        Args:
+            interval: Seconds between windows
+            max_chars: Largest window size in characters
+            
+        Yields:
+            Consecutive windows of text
+        """
+        # Bounded so a fast producer is throttled instead of filling memory
+        lines: "queue.Queue" = queue.Queue(maxsize=1024)
+        
+        def pump() -> None:
+            try:
+                for line in self.lines():
+                    lines.put(line)
+            finally:
+                lines.put(None)
+        
+        threading.Thread(target=pump, daemon=True).start()
+        
+        window = []
+        size = 0
+        deadline = time.monotonic() + interval
+        while True:
+            try:
+                line = lines.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                line = ""
+            if line is None:
+                break
+            if line:
+                window.append(line)
+                size += len(line)
+            if size >= max_chars or (window and time.monotonic() >= deadline):
+                yield "".join(window)
+                window, size = [], 0
+            if time.monotonic() >= deadline:
+                deadline = time.monotonic() + interval
+        if window:
+            yield "".join(window)
@@ -0,0 +1,248 @@
+"""Local similarity index over past prompts and the commands that worked for them."""
+
+import json
+import math
+import re
+import sqlite3
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional, Set, Union
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS suggestions (
+    id INTEGER PRIMARY KEY,
+    prompt TEXT NOT NULL UNIQUE,
+    commands TEXT NOT NULL,
+    grams TEXT NOT NULL,
+    updated REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS suggestion_grams (
+    gram TEXT NOT NULL,
+    suggestion_id INTEGER NOT NULL,
+    PRIMARY KEY (gram, suggestion_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS suggestion_gram_counts (
+    gram TEXT PRIMARY KEY,
+    prompts INTEGER NOT NULL
+) WITHOUT ROWID;
+"""
+
+# Commands remembered per prompt, from its most recent answer
+MAX_COMMANDS = 20
+
+# Grams looked up per query; SQLite limits the number of bound parameters
+MAX_QUERY_GRAMS = 400
+
+# Prompts whose similarity is computed exactly per lookup
+MAX_CANDIDATES = 200
+
+_WORD_PATTERN = re.compile(r"[\w./-]+")
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Lowercase a prompt and reduce it to its words."""
+    return " ".join(_WORD_PATTERN.findall(prompt.lower()))
+
+
+def prompt_grams(prompt: str) -> Set[str]:
+    """Character trigrams of each word, padded so word boundaries count."""
+    grams = set()
+    for word in normalize_prompt(prompt).split():
+        padded = f" {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+@dataclass
+class Suggestion:
+    """Commands that succeeded for an earlier prompt similar to the new one."""
+    
+    prompt: str
+    commands: List[str]
+    # Jaccard similarity of the two prompts' trigram sets, 0 to 1
+    score: float
+
+
+class SuggestionIndex:
+    """
+    Trigram index from prompts to the commands that ran successfully for them.
+    
+    Stored in SQLite tables next to the command history: one row per
+    normalized prompt, an inverted index from trigram to prompt, and the
+    number of prompts containing each trigram. Adding a command touches
+    only that prompt's rows.
+    
+    Lookups use prefix filtering: a prompt with Jaccard similarity of at
+    least t to a query of n trigrams must share one of any n - ceil(t * n)
+    + 1 of them, so only the posting lists of that many of the rarest query
+    trigrams are read. Common trigrams ("the", "how") never need scanning,
+    and lookups stay in the low milliseconds as the history grows.
+    """
+    
+    def __init__(self, db_file: Union[str, Path]):
+        self.db_file = Path(db_file)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.RLock()
+        # Prompts whose next command starts a new answer
+        self._new_answers: Set[str] = set()
+    
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """Open the database on first use."""
+        if self._conn is None:
+            self.db_file.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.db_file), timeout=10, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self._conn = conn
+        return self._conn
+    
+    def begin_answer(self, prompt: str) -> None:
+        """
+        Start a new answer for a prompt.
+        
+        The first command added afterwards replaces the commands stored
+        from earlier answers, so a prompt only ever suggests the commands
+        of one answer.
+        
+        Args:
+            prompt: The user's request
+        """
+        with self._lock:
+            self._new_answers.add(normalize_prompt(prompt))
+    
+    def add(self, prompt: str, command: str) -> None:
+        """
+        Record that a command succeeded for a prompt.
+        
+        Args:
+            prompt: The user's request
+            command: The command that ran successfully
+        """
+        key = normalize_prompt(prompt)
+        command = command.strip()
+        if not key or not command:
+            return
+        
+        with self._lock, self.conn as conn:
+            new_answer = key in self._new_answers
+            self._new_answers.discard(key)
+            row = conn.execute(
+                "SELECT id, commands FROM suggestions WHERE prompt = ?", (key,)
+            ).fetchone()
+            if row is None:
+                grams = sorted(prompt_grams(key))
+                cursor = conn.execute(
+                    "INSERT INTO suggestions (prompt, commands, grams, updated) VALUES (?, ?, ?, ?)",
+                    (key, json.dumps([command]), "\n".join(grams), time.time())
+                )
+                conn.executemany(
+                    "INSERT OR IGNORE INTO suggestion_grams (gram, suggestion_id) VALUES (?, ?)",
+                    [(gram, cursor.lastrowid) for gram in grams]
+                )
+                conn.executemany(
+                    "INSERT INTO suggestion_gram_counts (gram, prompts) VALUES (?, 1) "
+                    "ON CONFLICT(gram) DO UPDATE SET prompts = prompts + 1",
+                    [(gram,) for gram in grams]
+                )
+                return
+            
+            commands = [] if new_answer else [c for c in json.loads(row[1]) if c != command]
+            commands.append(command)
+            conn.execute(
+                "UPDATE suggestions SET commands = ?, updated = ? WHERE id = ?",
+                (json.dumps(commands[-MAX_COMMANDS:]), time.time(), row[0])
+            )
+    
+    def lookup(self, prompt: str, min_score: float = 0.6, limit: int = 1) -> List[Suggestion]:
+        """
+        Find earlier prompts similar to a new one.
+        
+        Args:
+            prompt: The new request
+            min_score: Smallest similarity worth suggesting
+            limit: Maximum number of suggestions
+            
+        Returns:
+            Suggestions, most similar first
+        """
+        grams = prompt_grams(prompt)
+        if not grams or not self.db_file.exists():
+            return []
+        query = sorted(grams)[:MAX_QUERY_GRAMS]
+        
+        with self._lock:
+            conn = self.conn
+            counts = dict(conn.execute(
+                "SELECT gram, prompts FROM suggestion_gram_counts "
+                f"WHERE gram IN ({','.join('?' * len(query))})",
+                query
+            ).fetchall())
+            # Grams no earlier prompt has can't find candidates, but still
+            # count toward the prefix length
+            prefix = len(grams) - math.ceil(min_score * len(grams)) + 1
+            probe = sorted(counts, key=counts.get)[:prefix]
+            if not probe:
+                return []
+            rows = conn.execute(
+                "SELECT prompt, commands, grams FROM suggestions WHERE id IN ("
+                "SELECT DISTINCT suggestion_id FROM suggestion_grams "
+                f"WHERE gram IN ({','.join('?' * len(probe))}) LIMIT {MAX_CANDIDATES})",
+                probe
+            ).fetchall()
+        
+        suggestions = []
+        for previous, commands, previous_grams in rows:
+            other = set(previous_grams.split("\n"))
+            shared = len(grams & other)
+            score = shared / (len(grams) + len(other) - shared)
+            if score >= min_score:
+                suggestions.append(Suggestion(previous, json.loads(commands), score))
+        suggestions.sort(key=lambda suggestion: suggestion.score, reverse=True)
+        return suggestions[:limit]
+    
+    def compact(self) -> int:
+        """
+        Forget the least recently updated tenth of the prompts.
+        
+        Returns:
+            Number of prompts removed
+        """
+        if not self.db_file.exists():
+            return 0
+        with self._lock, self.conn as conn:
+            rows = conn.execute(
+                "SELECT id, grams FROM suggestions ORDER BY updated "
+                "LIMIT (SELECT (COUNT(*) + 9) / 10 FROM suggestions)"
+            ).fetchall()
+            counts: Counter = Counter()
+            for suggestion_id, grams in rows:
+                grams = grams.split("\n")
+                counts.update(grams)
+                conn.executemany(
+                    "DELETE FROM suggestion_grams WHERE gram = ? AND suggestion_id = ?",
+                    [(gram, suggestion_id) for gram in grams]
+                )
+            conn.executemany(
+                "UPDATE suggestion_gram_counts SET prompts = prompts - ? WHERE gram = ?",
+                [(count, gram) for gram, count in counts.items()]
+            )
+            conn.executemany(
+                "DELETE FROM suggestion_gram_counts WHERE gram = ? AND prompts <= 0",
+                [(gram,) for gram in counts]
+            )
+            conn.executemany("DELETE FROM suggestions WHERE id = ?", [(row[0],) for row in rows])
+        return len(rows)
+    
+    def clear(self) -> None:
+        """Forget every prompt."""
+        if not self.db_file.exists():
+            return
+        with self._lock, self.conn as conn:
+            conn.execute("DELETE FROM suggestion_grams")
+            conn.execute("DELETE FROM suggestion_gram_counts")
+            conn.execute("DELETE FROM suggestions")
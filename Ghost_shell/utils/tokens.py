@@ -0,0 +1,48 @@
+"""Fast local token estimation."""
+
+import re
+from typing import Any, Iterable
+
+_WORD_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate how many model tokens a text uses, without calling the API.
+    
+    Averages a character-based estimate (about four characters per token)
+    with a count of words and punctuation, which tracks code and prose
+    reasonably well. Very long texts use the character estimate only.
+    
+    Args:
+        text: Text to measure
+        
+    Returns:
+        Estimated token count
+    """
+    if not text:
+        return 0
+    by_chars = len(text) / 4
+    if len(text) > 1_000_000:
+        return int(by_chars)
+    by_words = len(_WORD_PATTERN.findall(text))
+    return int((by_chars + by_words) / 2) + 1
+
+
+def estimate_history_tokens(history: Iterable[Any]) -> int:
+    """
+    Estimate tokens for chat history items given as SDK Content objects or dicts.
+    
+    Args:
+        history: Chat history entries
+        
+    Returns:
+        Estimated token count
+    """
+    total = 0
+    for item in history:
+        parts = item.get("parts", []) if isinstance(item, dict) else (item.parts or [])
+        for part in parts:
+            text = part.get("text") if isinstance(part, dict) else getattr(part, "text", None)
+            total += estimate_tokens(text or "")
+    return total
@@ -0,0 +1,93 @@
+"""Concurrency benchmark for the async library API, offline.
+
+Streams many requests at once through AsyncGhostShell against the fake
+backend's async stream and reports wall time against the simulated model
+time, per-chunk overhead and the number of threads alive during the run.
+Fails if requests spawned threads, or if a cancelled stream kept running.
+
+Usage:
+    python benchmarks/bench_async.py [--requests N] [--ttft S] [--delay S]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from Ghost_shell.core.async_api import AsyncGhostShell  # noqa: E402
+from Ghost_shell.core.backends import FakeBackend  # noqa: E402
+from Ghost_shell.core.config import Config  # noqa: E402
+
+
+async def run(args):
+    backend = FakeBackend(args.ttft, args.delay, args.chunk_chars)
+    shell = AsyncGhostShell(Config(), backend=backend, max_concurrency=args.requests)
+    threads = [threading.active_count()]
+
+    async def one(i):
+        chars = 0
+        async for text in shell.stream("command", f"benchmark request {i}"):
+            chars += len(text)
+            threads.append(threading.active_count())
+        return chars
+
+    start = time.perf_counter()
+    sizes = await asyncio.gather(*(one(i) for i in range(args.requests)))
+    wall = time.perf_counter() - start
+
+    # A cancelled stream must stop pulling chunks from the backend
+    received = []
+
+    async def cancelled():
+        async for text in shell.stream("command", "cancel me"):
+            received.append(text)
+
+    task = asyncio.ensure_future(cancelled())
+    await asyncio.sleep(args.ttft + args.delay * 3)
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+    await asyncio.sleep(args.delay * 5)
+
+    simulated = backend.ttft + backend.delay * (len(backend.chunks) - 1)
+    chunks = args.requests * len(backend.chunks)
+    print(f"{args.requests} concurrent streams of {len(backend.chunks)} chunks, "
+          f"ttft {args.ttft * 1000:.0f} ms, delay {args.delay * 1000:.1f} ms/chunk\n")
+    print(f"{'wall time':<24} {wall * 1000:8.1f} ms (simulated {simulated * 1000:.1f} ms)")
+    print(f"{'overhead per chunk':<24} {(wall - simulated) / chunks * 1e6:8.1f} us")
+    print(f"{'peak threads':<24} {max(threads):8d}")
+    print(f"{'cancelled stream chunks':<24} {len(received):8d}")
+
+    ok = len(set(sizes)) == 1 and max(threads) <= threads[0]
+    if len(received) >= len(backend.chunks):
+        ok = False
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--ttft", type=float, default=0.05)
+    parser.add_argument("--delay", type=float, default=0.002)
+    parser.add_argument("--chunk-chars", type=int, default=24)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["GHOSTSHELL_HOME"] = tmp
+        ok = asyncio.run(run(args))
+    if not ok:
+        print("FAILED: requests spawned threads or a cancelled stream kept running")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
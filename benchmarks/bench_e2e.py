@@ -0,0 +1,125 @@
+"""End-to-end client latency and memory benchmark, offline.
+
+Runs full requests through GeminiModel against the fake backend, which
+streams a synthetic (or recorded) reply with a fixed time to first token
+and inter-chunk delay. Subtracting that simulated latency leaves
+GhostShell's own overhead: delay from the first chunk to the first paint,
+time added over the whole stream, and peak Python memory. Also times a complete
+cold `gsh --backend fake` run in a fresh interpreter.
+
+Usage:
+    python benchmarks/bench_e2e.py [--requests N] [--ttft S] [--delay S] [--record chunks.json]
+"""
+
+import argparse
+import io
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from rich.console import Console  # noqa: E402
+
+from Ghost_shell.core.ai_model import GeminiModel  # noqa: E402
+from Ghost_shell.core.backends import FakeBackend  # noqa: E402
+from Ghost_shell.core.config import Config  # noqa: E402
+
+
+class _TimedFile(io.StringIO):
+    """In-memory console output that remembers its first write after being armed."""
+
+    armed = None
+    first_write = None
+
+    def write(self, s):
+        if self.armed is not None and self.first_write is None and s.strip():
+            self.first_write = time.perf_counter()
+        return super().write(s)
+
+
+def run_request(model, backend, prompt):
+    """Return (first chunk to first paint, overhead over the stream, peak KiB)."""
+    out = _TimedFile()
+    model.console = Console(file=out, force_terminal=True, width=100)
+    simulated = backend.ttft + backend.delay * (len(backend.chunks) - 1)
+    stream_chat = FakeBackend.stream_chat
+
+    def timed_stream_chat(*args, **kwargs):
+        for index, chunk in enumerate(stream_chat(backend, *args, **kwargs)):
+            if index == 0:
+                out.armed = time.perf_counter()
+            yield chunk
+
+    backend.stream_chat = timed_stream_chat
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    model.generate_response(prompt, use_cache=False)
+    end = time.perf_counter()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    first_paint = (out.first_write or end) - (out.armed or start)
+    return first_paint, (end - start) - simulated, peak / 1024
+
+
+def cold_run_ms(tmp, ttft, delay):
+    """Wall time of one complete CLI request in a new interpreter."""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = str(ROOT) + os.pathsep + env.get("PYTHONPATH", "")
+    env.update(
+        GHOSTSHELL_HOME=tmp,
+        GHOSTSHELL_FAKE_TTFT=str(ttft),
+        GHOSTSHELL_FAKE_DELAY=str(delay),
+    )
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "-m", "Ghost_shell.cli", "--backend", "fake", "--no-daemon",
+         "--no-cache", "hello"],
+        env=env,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        check=True
+    )
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=10)
+    parser.add_argument("--ttft", type=float, default=0.05)
+    parser.add_argument("--delay", type=float, default=0.002)
+    parser.add_argument("--chunk-chars", type=int, default=24)
+    parser.add_argument("--record", help="JSON list of recorded chunks to replay")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["GHOSTSHELL_HOME"] = tmp
+        backend = FakeBackend(args.ttft, args.delay, args.chunk_chars, recording=args.record)
+        model = GeminiModel(Config())
+        model.backend = backend
+
+        results = []
+        for i in range(args.requests):
+            # A fresh history each time keeps requests comparable
+            model.history = []
+            results.append(run_request(model, backend, f"benchmark request {i}"))
+
+        chars = sum(len(c) for c in backend.chunks)
+        print(f"{len(backend.chunks)} chunks, {chars} chars, ttft {args.ttft * 1000:.0f} ms, "
+              f"delay {args.delay * 1000:.1f} ms/chunk\n")
+        print(f"{'first chunk to paint':<24} {statistics.median(r[0] for r in results) * 1000:8.1f} ms")
+        print(f"{'stream overhead':<24} {statistics.median(r[1] for r in results) * 1000:8.1f} ms")
+        print(f"{'peak Python memory':<24} {max(r[2] for r in results):8.0f} KiB")
+        print(f"{'cold CLI request':<24} {cold_run_ms(tmp, args.ttft, args.delay):8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Command execution benchmark.
+
+Measures the per-command overhead of run_command on a trivial command,
+output streaming throughput on a command that prints many lines, and the
+wall time of independent sleeps run sequentially versus in parallel.
+
+Usage:
+    python benchmarks/bench_execute.py [--commands N] [--lines N] [--parallel N]
+"""
+
+import argparse
+import io
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from rich.console import Console  # noqa: E402
+
+from Ghost_shell.utils.command_executor import CommandExecutor  # noqa: E402
+from Ghost_shell.utils.logger import CommandLogger  # noqa: E402
+from Ghost_shell.utils.process_runner import run_command  # noqa: E402
+
+
+def bench_overhead(count):
+    """Median milliseconds to run `true`, including process-group setup and teardown."""
+    times = []
+    for _ in range(count):
+        start = time.perf_counter()
+        run_command("true", timeout=10, idle_timeout=10)
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+def bench_streaming(lines):
+    """Lines per second delivered to an on_line callback."""
+    received = [0]
+
+    def on_line(stream, line):
+        received[0] += 1
+
+    start = time.perf_counter()
+    result = run_command(f"seq 1 {lines}", on_line=on_line)
+    elapsed = time.perf_counter() - start
+    if received[0] != lines or result.output_lines != lines:
+        print(f"  FAIL: expected {lines} lines, got {received[0]}")
+        return None
+    return lines / elapsed
+
+
+def bench_parallel(workers, tmp):
+    """Wall time of eight 0.2 s sleeps through the executor with the given worker count."""
+    console = Console(file=io.StringIO(), force_terminal=True, width=100)
+    logger = CommandLogger(str(Path(tmp) / f"history-{workers}.db"))
+    executor = CommandExecutor(logger, parallel=workers)
+    executor.console = console
+    # "&&" would make each command a barrier, so use ";"
+    commands = [f"sleep 0.2; echo {i}" for i in range(8)]
+    start = time.perf_counter()
+    executor.execute_commands("\n".join(f"`{c}`" for c in commands), auto_execute=True)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--commands", type=int, default=50)
+    parser.add_argument("--lines", type=int, default=200_000)
+    parser.add_argument("--parallel", type=int, default=4)
+    args = parser.parse_args()
+
+    print(f"{'per-command overhead':<24} {bench_overhead(args.commands):8.2f} ms")
+    rate = bench_streaming(args.lines)
+    if rate is None:
+        sys.exit(1)
+    print(f"{'output streaming':<24} {rate:8,.0f} lines/s")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        sequential = bench_parallel(1, tmp)
+        parallel = bench_parallel(args.parallel, tmp)
+    print(f"{'8 x sleep 0.2, 1 worker':<24} {sequential * 1000:8.1f} ms")
+    print(f"{f'8 x sleep 0.2, {args.parallel} workers':<24} {parallel * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""Command extraction benchmark.
+
+Compares the single-pass CommandParser against the previous two-regex
+extractor: first checks both agree on a golden corpus of typical
+/command answers, then measures throughput on large multi-block responses.
+
+Usage:
+    python benchmarks/bench_extract.py [--blocks N] [--repeat N]
+"""
+
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from Ghost_shell.utils.command_parser import extract_commands  # noqa: E402
+
+
+def legacy_extract_commands(text):
+    """The extractor as it was before the single-pass parser."""
+    inline_commands = re.findall(r'`([^`\n]+)`', text)
+    block_commands = re.findall(r'```(?:bash|sh|shell)?\n?(.*?)\n?```', text, re.DOTALL)
+    commands = []
+    for cmd in inline_commands:
+        cmd = cmd.strip()
+        if cmd and legacy_is_safe_command(cmd):
+            commands.append(cmd)
+    for block in block_commands:
+        for line in block.split('\n'):
+            cmd = line.strip()
+            if cmd and not cmd.startswith('#') and legacy_is_safe_command(cmd):
+                commands.append(cmd)
+    return commands
+
+
+def legacy_is_safe_command(command):
+    dangerous_patterns = [
+        r'rm\s+-rf\s+/',
+        r'>\s*/dev/sd[a-z]',
+        r'dd\s+if=.*of=/dev/',
+        r'mkfs\.',
+        r'fdisk',
+        r'format\s+c:',
+        r'del\s+/s\s+/q\s+c:\\',
+    ]
+    for pattern in dangerous_patterns:
+        if re.search(pattern, command, re.IGNORECASE):
+            return False
+    return True
+
+
+# Answers on which both extractors must produce the same set of commands
+GOLDEN_CORPUS = [
+    "```bash\nsudo apt update\nsudo apt install -y nodejs\n```",
+    "Run `ls -la` to list files.",
+    "```sh\n# update first\nbrew update\n\nbrew install jq\n```\nThen check with `jq --version`.",
+    "```\ngit fetch origin\ngit rebase origin/main\n```",
+    "```bash\nrm -rf /\nls\n```",
+    "```bash\nmkdir -p build\ncd build\ncmake ..\nmake -j8\n```\n\nDone.",
+    "First:\n\n```bash\npip install requests\n```\n\nThen:\n\n```bash\npython app.py\n```",
+]
+
+# Cases where the new extractor deliberately differs from the old one
+BEHAVIOR_CHANGES = [
+    # Duplicates between prose and a block are reported once
+    ("Run `npm ci`:\n```bash\nnpm ci\n```", ["npm ci"]),
+    # Backslash continuations are joined into one command
+    ("```bash\ndocker run \\\n  -p 80:80 \\\n  nginx\n```", ["docker run -p 80:80 nginx"]),
+    # Non-shell fences are not commands
+    ("```python\nprint('hi')\n```", []),
+    # Inline code inside a fence is not a separate command
+    ("```bash\necho `date`\n```", ["echo `date`"]),
+    # A "shell" fence tag no longer leaks a stray "ell" inline match
+    (
+        "Use `docker ps` and `docker logs -f web`.\n\n```shell\ndocker compose up -d\n```",
+        ["docker ps", "docker logs -f web", "docker compose up -d"],
+    ),
+    # Shell prompts are stripped
+    ("```console\n$ uname -a\n```", ["uname -a"]),
+    # Tilde fences are recognized
+    ("~~~bash\nmake test\n~~~", ["make test"]),
+]
+
+
+def check_golden():
+    ok = True
+    for text in GOLDEN_CORPUS:
+        new = extract_commands(text)
+        old = list(dict.fromkeys(legacy_extract_commands(text)))
+        if sorted(new) != sorted(old):
+            print(f"MISMATCH on {text!r}:\n  new={new}\n  old={old}")
+            ok = False
+    for text, expected in BEHAVIOR_CHANGES:
+        new = extract_commands(text)
+        if new != expected:
+            print(f"UNEXPECTED on {text!r}:\n  got={new}\n  want={expected}")
+            ok = False
+    print(f"golden corpus: {'ok' if ok else 'FAILED'} "
+          f"({len(GOLDEN_CORPUS)} compatible cases, {len(BEHAVIOR_CHANGES)} intentional changes)")
+    return ok
+
+
+def large_response(blocks):
+    parts = ["Here is the full setup. Run `sudo -v` first.\n\n"]
+    for i in range(blocks):
+        parts.append(f"### Step {i}\n\nInstall package `pkg{i}` and configure it:\n\n")
+        parts.append("```bash\n# fetch\n")
+        for j in range(8):
+            parts.append(f"curl -fsSL https://example.com/{i}/{j}.tar.gz -o /tmp/{i}_{j}.tgz\n")
+        parts.append(f"tar xzf /tmp/{i}_0.tgz -C /opt/pkg{i}\n```\n\n")
+        parts.append("```python\nprint('not a command')\n```\n\n")
+    return "".join(parts)
+
+
+def bench(func, text, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--blocks", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    ok = check_golden()
+
+    text = large_response(args.blocks)
+    size_mb = len(text.encode("utf-8")) / 1e6
+    print(f"\nresponse: {args.blocks} blocks, {size_mb:.2f} MB")
+    for name, func in (("single-pass", extract_commands), ("legacy", legacy_extract_commands)):
+        elapsed = bench(func, text, args.repeat)
+        count = len(func(text))
+        print(f"{name:<12} {elapsed * 1000:8.1f} ms  {size_mb / elapsed:8.1f} MB/s  {count} commands")
+
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
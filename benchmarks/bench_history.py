@@ -0,0 +1,74 @@
+"""Command history benchmark.
+
+Fills a fresh history database and measures append rate, the latency of
+reading the last entries, of searching and of looking up command
+suggestions for a prompt, and the database size.
+
+Usage:
+    python benchmarks/bench_history.py [--rows N] [--repeat N]
+"""
+
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from Ghost_shell.utils.logger import CommandLogger  # noqa: E402
+from Ghost_shell.utils.suggestions import SuggestionIndex  # noqa: E402
+
+TOPICS = ["disk usage", "open ports", "docker images", "git branches", "large files", "cpu load"]
+
+
+def timed(func, repeat):
+    """Median milliseconds of repeated calls."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "history.db"
+        logger = CommandLogger(str(path), compact_every=10 ** 9)
+
+        start = time.perf_counter()
+        for i in range(args.rows):
+            logger.log_command(
+                f"git commit -m 'change {i}' && docker build -t app:{i % 97} .",
+                status="ok" if i % 7 else "failed",
+                exit_code=0 if i % 7 else 1,
+                duration=0.1,
+                cwd="/home/user/project",
+                prompt=f"show {TOPICS[i % len(TOPICS)]} for project {i % 1000}"
+            )
+        append_rate = args.rows / (time.perf_counter() - start)
+
+        print(f"{'rows':<24} {args.rows:>10,}")
+        print(f"{'append':<24} {append_rate:>10,.0f} rows/s")
+        print(f"{'last 20 entries':<24} {timed(lambda: logger.get_history(20), args.repeat):>10.2f} ms")
+        print(f"{'search (indexed)':<24} {timed(lambda: logger.search('app:42'), args.repeat):>10.2f} ms")
+        print(f"{'search (2 chars)':<24} {timed(lambda: logger.search('-m'), args.repeat):>10.2f} ms")
+        index = SuggestionIndex(path)
+        lookup = timed(lambda: index.lookup("show the disk usage for project 42"), args.repeat)
+        cold = timed(lambda: SuggestionIndex(path).lookup("list open ports on project 7"), args.repeat)
+        print(f"{'suggestion lookup':<24} {lookup:>10.2f} ms")
+        print(f"{'suggestion (cold open)':<24} {cold:>10.2f} ms")
+        size = sum(p.stat().st_size for p in Path(tmp).glob("history.db*"))
+        print(f"{'database size':<24} {size / 1e6:>10.2f} MB")
+        logger.conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""Rendering benchmark for streamed markdown responses.
+
+Replays a chunk stream through the StreamingMarkdownRenderer and through
+the previous approach (one Markdown parse and print per chunk) and reports
+render time per chunk/token and time-to-first-paint.
+
+The per-chunk path looks cheap because it renders fragments: a 24-character
+chunk never holds a whole code fence, so nothing is syntax highlighted and
+the output is broken markdown. The "render-once" row prints the finished
+answer in a single pass, the least any correct renderer can spend; the
+incremental renderer's cost is best read as overhead above that line.
+
+The stream is either synthetic (a long /code style answer with fenced
+blocks) or a recording: a JSON list of chunk strings.
+
+With --delay the chunks arrive that many seconds apart, as from the API,
+so the live region's timed refreshes take part; CPU time (all threads,
+including Live's refresh thread) is then the figure to compare.
+
+Usage:
+    python benchmarks/bench_render.py [--record chunks.json] [--repeat N] [--delay S]
+"""
+
+import argparse
+import io
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from rich.console import Console  # noqa: E402
+from rich.markdown import Markdown  # noqa: E402
+
+from Ghost_shell.utils.markdown_stream import StreamingMarkdownRenderer  # noqa: E402
+
+
+class _TimedFile(io.StringIO):
+    """In-memory console output that remembers when it was first written."""
+
+    first_write = None
+
+    def write(self, s):
+        if self.first_write is None and s.strip():
+            self.first_write = time.perf_counter()
+        return super().write(s)
+
+
+def synthetic_chunks(sections=40, chunk_size=24):
+    """Build a long markdown answer and split it into fixed-size chunks."""
+    parts = ["# Generated project\n\nThis answer mixes prose, lists and code.\n\n"]
+    for i in range(sections):
+        parts.append(f"## Step {i + 1}\n\nInstall the dependencies and run the check:\n\n")
+        parts.append("- first item\n- second item with `inline code`\n\n")
+        parts.append("```python\n")
+        for j in range(12):
+            parts.append(f"def handler_{i}_{j}(event):\n    return process(event, retries={j})\n")
+        parts.append("```\n\n")
+    text = "".join(parts)
+    return [text[i:i + chunk_size] for i in range(0, len(text), chunk_size)]
+
+
+def paced(chunks, delay):
+    for chunk in chunks:
+        if delay:
+            time.sleep(delay)
+        yield chunk
+
+
+def run_incremental(chunks, delay):
+    out = _TimedFile()
+    console = Console(file=out, force_terminal=True, width=100)
+    start, cpu = time.perf_counter(), time.process_time()
+    with StreamingMarkdownRenderer(console) as renderer:
+        for chunk in paced(chunks, delay):
+            renderer.feed(chunk)
+    end = time.perf_counter()
+    return end - start, (out.first_write or end) - start, time.process_time() - cpu
+
+
+def run_legacy(chunks, delay):
+    out = _TimedFile()
+    console = Console(file=out, force_terminal=True, width=100)
+    start, cpu = time.perf_counter(), time.process_time()
+    full_response = ""
+    for chunk in paced(chunks, delay):
+        console.print(Markdown(chunk), end="")
+        full_response += chunk
+    end = time.perf_counter()
+    return end - start, (out.first_write or end) - start, time.process_time() - cpu
+
+
+def run_once(chunks, delay):
+    out = _TimedFile()
+    console = Console(file=out, force_terminal=True, width=100)
+    start, cpu = time.perf_counter(), time.process_time()
+    console.print(Markdown("".join(chunks)))
+    end = time.perf_counter()
+    return end - start, (out.first_write or end) - start, time.process_time() - cpu
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--record", help="JSON file with a list of recorded chunks")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--delay", type=float, default=0.0, help="seconds between chunks")
+    args = parser.parse_args()
+
+    if args.record:
+        chunks = json.loads(Path(args.record).read_text(encoding="utf-8"))
+    else:
+        chunks = synthetic_chunks()
+
+    tokens = max(1, sum(len(c.split()) for c in chunks))
+    total_chars = sum(len(c) for c in chunks)
+    print(f"{len(chunks)} chunks, ~{tokens} tokens, {total_chars} chars\n")
+    print(
+        f"{'renderer':<14} {'total ms':>10} {'CPU ms':>10} {'us/chunk':>10} "
+        f"{'us/token':>10} {'TTFP ms':>10}"
+    )
+
+    runners = (
+        ("incremental", run_incremental),
+        ("per-chunk", run_legacy),
+        ("render-once", run_once),
+    )
+    for name, runner in runners:
+        results = [runner(chunks, args.delay) for _ in range(args.repeat)]
+        total = statistics.median(r[0] for r in results)
+        ttfp = statistics.median(r[1] for r in results)
+        cpu = statistics.median(r[2] for r in results)
+        print(
+            f"{name:<14} {total * 1000:>10.1f} {cpu * 1000:>10.1f} "
+            f"{cpu / len(chunks) * 1e6:>10.1f} {cpu / tokens * 1e6:>10.1f} {ttfp * 1000:>10.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Startup benchmark for the GhostShell CLI fast paths.
+
+Measures wall time of ``gsh --history``/``--clear-history``/``--help``/``--version``
+in fresh interpreters and checks that none of them import the Gemini SDK,
+rich or python-dotenv. Exits non-zero on a regression so it can run in CI.
+
+Usage:
+    python benchmarks/bench_startup.py [--runs N] [--max-ms MS]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+HEAVY_MODULES = ["google.genai", "rich", "dotenv"]
+
+FAST_PATHS = [
+    ["--history", "5"],
+    ["--clear-history"],
+    ["--help"],
+    ["--version"],
+]
+
+# Runs the CLI in-process and reports any heavy module that got imported
+PROBE = """
+import sys
+sys.argv = ["gsh"] + sys.argv[1:]
+try:
+    from Ghost_shell.cli import main
+    main()
+except SystemExit:
+    pass
+finally:
+    loaded = [m for m in {heavy!r} if m in sys.modules]
+    sys.stderr.write("HEAVY:" + ",".join(loaded) + "\\n")
+"""
+
+
+def run_once(args, env, cwd):
+    """Run one CLI invocation and return (elapsed_ms, heavy_modules)."""
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-c", PROBE.format(heavy=HEAVY_MODULES), *args],
+        env=env,
+        cwd=cwd,
+        capture_output=True,
+        text=True
+    )
+    elapsed = (time.perf_counter() - start) * 1000
+    heavy = ""
+    for line in proc.stderr.splitlines():
+        if line.startswith("HEAVY:"):
+            heavy = line[len("HEAVY:"):]
+    return elapsed, [m for m in heavy.split(",") if m]
+
+
+def baseline_ms(env, runs):
+    """Median time of a bare interpreter start, for reference."""
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", "pass"], env=env)
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument(
+        "--max-ms",
+        type=float,
+        default=150.0,
+        help="Fail if any fast path's median exceeds interpreter start by this much"
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ)
+        env["PYTHONPATH"] = str(ROOT) + os.pathsep + env.get("PYTHONPATH", "")
+        env["GHOSTSHELL_HOME"] = tmp
+        env.pop("GEMINI_API", None)
+
+        base = baseline_ms(env, args.runs)
+        print(f"{'python -c pass':<24} {base:8.1f} ms (baseline)")
+
+        failed = False
+        for cli_args in FAST_PATHS:
+            times = []
+            heavy = []
+            for _ in range(args.runs):
+                elapsed, loaded = run_once(cli_args, env, tmp)
+                times.append(elapsed)
+                heavy = loaded or heavy
+            median = statistics.median(times)
+            label = "gsh " + " ".join(cli_args)
+            print(f"{label:<24} {median:8.1f} ms (+{median - base:.1f} ms)")
+            if heavy:
+                print(f"  FAIL: imported {', '.join(heavy)}")
+                failed = True
+            if median - base > args.max_ms:
+                print(f"  FAIL: over budget of {args.max_ms:.0f} ms")
+                failed = True
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Run the whole benchmark suite offline, e.g. in CI.
+
+Every benchmark runs in its own interpreter with a throwaway
+GHOSTSHELL_HOME and no API key; requests go to the fake backend. Exits
+non-zero if any benchmark fails its own checks.
+
+Usage:
+    python benchmarks/run_all.py [--quick]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+
+# (script, full arguments, --quick arguments)
+SUITE = [
+    ("bench_startup.py", [], ["--runs", "3"]),
+    ("bench_render.py", [], ["--repeat", "1"]),
+    ("bench_extract.py", [], ["--blocks", "100", "--repeat", "1"]),
+    ("bench_execute.py", [], ["--commands", "10", "--lines", "20000"]),
+    ("bench_history.py", [], ["--rows", "5000", "--repeat", "5"]),
+    ("bench_e2e.py", [], ["--requests", "3"]),
+    ("bench_async.py", [], ["--requests", "200"]),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--quick", action="store_true", help="Smaller workloads for fast CI runs")
+    args = parser.parse_args()
+
+    failed = []
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ)
+        env["GHOSTSHELL_HOME"] = tmp
+        env["GHOSTSHELL_BACKEND"] = "fake"
+        env.pop("GEMINI_API", None)
+
+        for script, full_args, quick_args in SUITE:
+            print(f"== {script}", flush=True)
+            start = time.perf_counter()
+            proc = subprocess.run(
+                [sys.executable, str(HERE / script), *(quick_args if args.quick else full_args)],
+                env=env,
+                stdin=subprocess.DEVNULL
+            )
+            print(f"   ({time.perf_counter() - start:.1f} s)\n", flush=True)
+            if proc.returncode != 0:
+                failed.append(script)
+
+    if failed:
+        print(f"FAILED: {', '.join(failed)}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,13 @@
+"""Shared fixtures for the GhostShell test suite."""
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def ghostshell_home(tmp_path, monkeypatch):
+    """Keep caches, history and sessions out of the real data directory."""
+    home = tmp_path / "ghostshell"
+    monkeypatch.setenv("GHOSTSHELL_HOME", str(home))
+    monkeypatch.delenv("GHOSTSHELL_ROUTING", raising=False)
+    monkeypatch.delenv("GHOSTSHELL_BACKEND", raising=False)
+    return home
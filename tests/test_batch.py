@@ -0,0 +1,68 @@
+"""Tests for running JSONL prompt files."""
+
+import json
+
+from Ghost_shell.core.ai_model import GeminiModel
+from Ghost_shell.core.backends import FakeBackend
+from Ghost_shell.core.batch import BatchRunner
+from Ghost_shell.core.config import Config
+
+
+def _model(max_input_tokens=200_000):
+    config = Config()
+    config.max_input_tokens = max_input_tokens
+    model = GeminiModel(config)
+    model.backend = FakeBackend(ttft=0, delay=0, response="it lists numbers")
+    return model
+
+
+def _record(path, task="explain", prompt="what is in this file"):
+    return {"id": "1", "task": task, "prompt": prompt, "file": str(path)}
+
+
+def test_batch_record_reuses_a_single_request_cache_entry(tmp_path):
+    path = tmp_path / "data.txt"
+    path.write_text("".join(f"{i}\n" for i in range(500)), encoding="utf-8")
+    model = _model()
+    model.generate_response("what is in this file", "explain", input_file=str(path), execute=False)
+
+    result = BatchRunner(model)._process(_record(path))
+    assert result["error"] is None
+    assert result["cached"]
+    assert result["response"] == "it lists numbers"
+
+
+def test_large_batch_files_are_budgeted(tmp_path):
+    path = tmp_path / "big.log"
+    path.write_text("".join(f"event {i} at {i * 7} ok\n" for i in range(50_000)), encoding="utf-8")
+    model = _model(max_input_tokens=2_000)
+    sent = []
+    generate = model.backend.generate
+
+    def record_generate(name, system_prompt, content, thinking_budget=None):
+        sent.append(content)
+        return generate(name, system_prompt, content, thinking_budget)
+
+    model.backend.generate = record_generate
+    result = BatchRunner(model)._process(_record(path))
+
+    assert result["error"] is None
+    assert len(sent) == 1
+    assert len(sent[0]) < 2_000 * 8
+
+
+def test_results_are_written_as_jsonl(tmp_path):
+    records = tmp_path / "in.jsonl"
+    records.write_text(
+        "\n".join(json.dumps({"id": str(i), "prompt": f"question {i}"}) for i in range(3)),
+        encoding="utf-8"
+    )
+    out = tmp_path / "out.jsonl"
+    counts = BatchRunner(_model(), concurrency=2).run(str(records), str(out))
+
+    assert counts["succeeded"] == 3
+    results = [json.loads(line) for line in out.read_text(encoding="utf-8").splitlines()]
+    assert sorted(result["id"] for result in results) == ["0", "1", "2"]
+
+    # Finished ids are skipped on a rerun
+    assert BatchRunner(_model()).run(str(records), str(out))["skipped"] == 3
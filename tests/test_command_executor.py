@@ -0,0 +1,63 @@
+"""Tests for planning parallel command stages."""
+
+from Ghost_shell.utils.command_executor import CommandExecutor, command_access
+
+
+def test_independent_downloads_share_a_stage():
+    commands = [
+        "wget https://example.com/a.tgz",
+        "wget https://example.com/b.tgz",
+        "curl -sSLO https://example.com/c.zip",
+    ]
+    assert CommandExecutor.plan_stages(commands) == [commands]
+
+
+def test_read_only_commands_share_a_stage():
+    commands = ["du -sh /var", "df -h", "uname -a", "sleep 0.1"]
+    assert CommandExecutor.plan_stages(commands) == [commands]
+
+
+def test_package_managers_and_vcs_run_alone():
+    commands = ["apt update", "apt install -y curl", "git init", "git add .", "pip install flask"]
+    assert CommandExecutor.plan_stages(commands) == [[cmd] for cmd in commands]
+
+
+def test_writes_to_a_later_commands_path_are_ordered():
+    commands = ["mkdir build", "cp config.ini build/", "ls build/"]
+    assert CommandExecutor.plan_stages(commands) == [[cmd] for cmd in commands]
+
+
+def test_redirection_targets_are_writes():
+    commands = ["df -h", "ls > files.txt", "wc -l files.txt"]
+    assert CommandExecutor.plan_stages(commands) == [
+        ["df -h", "ls > files.txt"],
+        ["wc -l files.txt"],
+    ]
+
+
+def test_listing_conflicts_with_writes_in_the_directory():
+    assert CommandExecutor.plan_stages(["touch a", "ls"]) == [["touch a"], ["ls"]]
+
+
+def test_unknown_and_compound_commands_run_alone():
+    commands = [
+        "echo start", "cd app", "make && make install", "echo $HOME", "./configure",
+        "find . -delete",
+    ]
+    assert CommandExecutor.plan_stages(commands) == [[cmd] for cmd in commands]
+    for cmd in commands[1:]:
+        assert command_access(cmd) is None
+
+
+def test_command_access():
+    assert command_access("cp a.txt b.txt docs/") == ({"a.txt", "b.txt"}, {"docs/"})
+    assert command_access("grep -n error app.log | sort > errors.txt") == (
+        {"error", "app.log"},
+        {"errors.txt"},
+    )
+    assert command_access("wget -O data.csv https://example.com/export") == (set(), {"data.csv"})
+    assert command_access("curl -s https://example.com/api") == (set(), set())
+
+
+def test_no_commands():
+    assert CommandExecutor.plan_stages([]) == []
@@ -0,0 +1,51 @@
+"""Tests for extracting shell commands from markdown."""
+
+from Ghost_shell.utils.command_parser import CommandParser, extract_commands, is_safe_command
+
+
+def test_extracts_shell_blocks_in_order():
+    text = "Install it:\n\n```bash\napt update\napt install -y git\n```\n\nThen `git --version`.\n"
+    assert extract_commands(text) == ["apt update", "apt install -y git", "git --version"]
+
+
+def test_skips_non_shell_blocks():
+    text = "```python\nprint('hi')\n```\n\n```sh\nls -la\n```\n"
+    assert extract_commands(text) == ["ls -la"]
+
+
+def test_strips_prompts_and_comments_and_joins_continuations():
+    text = "```console\n# update first\n$ sudo apt \\\n    install curl\n```\n"
+    assert extract_commands(text) == ["sudo apt install curl"]
+
+
+def test_emits_each_command_once():
+    text = "`ls`\n\n```bash\nls\npwd\n```\n"
+    assert extract_commands(text) == ["ls", "pwd"]
+
+
+def test_drops_dangerous_commands():
+    assert not is_safe_command("sudo rm -rf / --no-preserve-root")
+    assert not is_safe_command("MKFS.ext4 /dev/sdb1")
+    assert is_safe_command("rm -rf ./build")
+    assert extract_commands("```bash\nrm -rf /\necho ok\n```\n") == ["echo ok"]
+
+
+def test_tilde_fences_and_longer_closing_fences():
+    text = "~~~bash\necho a\n~~~~\n\n````sh\necho b\n````\n\n```python\nx = 1\n```\n"
+    assert extract_commands(text) == ["echo a", "echo b"]
+
+
+def test_incremental_feed_reports_block_when_it_closes():
+    parser = CommandParser()
+    assert parser.feed("```bash") == []
+    assert parser.in_fence
+    assert parser.feed("echo one") == []
+    assert parser.feed("```") == ["echo one"]
+    assert not parser.in_fence
+
+
+def test_close_flushes_an_unterminated_block():
+    parser = CommandParser()
+    for line in ("```sh", "make \\"):
+        parser.feed(line)
+    assert parser.close() == ["make"]
@@ -0,0 +1,38 @@
+"""Tests for reading settings from the environment."""
+
+import os
+
+import dotenv
+import pytest
+
+from Ghost_shell.core import config as config_module
+from Ghost_shell.core.config import Config
+
+
+def test_settings_from_dotenv_are_read(monkeypatch, tmp_path):
+    monkeypatch.setattr(os, "environ", os.environ.copy())
+    monkeypatch.setattr(config_module, "_dotenv_loaded", False)
+    calls = []
+
+    def load_dotenv():
+        calls.append(True)
+        os.environ["GHOSTSHELL_CHUNK_TIMEOUT"] = "7"
+        os.environ["GHOSTSHELL_HOME"] = str(tmp_path / "from-dotenv")
+
+    monkeypatch.setattr(dotenv, "load_dotenv", load_dotenv)
+    monkeypatch.delenv("GHOSTSHELL_HOME")
+
+    config = Config()
+    assert config.chunk_timeout == 7
+    assert config.data_dir == tmp_path / "from-dotenv"
+
+    # Loaded once per process
+    Config()
+    assert calls == [True]
+
+
+def test_api_key_is_required(monkeypatch):
+    monkeypatch.setattr(config_module, "_dotenv_loaded", True)
+    monkeypatch.delenv("GEMINI_API", raising=False)
+    with pytest.raises(ValueError, match="GEMINI_API"):
+        Config().api_key
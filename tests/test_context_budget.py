@@ -0,0 +1,55 @@
+"""Tests for fitting file content into the input token budget."""
+
+import pytest
+
+from Ghost_shell.utils.context_budget import ContextBudgeter
+from Ghost_shell.utils.tokens import estimate_tokens
+
+
+def test_content_within_budget_is_untouched():
+    result = ContextBudgeter(1000).fit("short file\n")
+    assert result.text == "short file\n"
+    assert not result.trimmed
+
+
+def test_collapse_folds_repeated_lines():
+    text = "start\n" + "".join(f"retry {i} failed\n" for i in range(500)) + "end\n"
+    result = ContextBudgeter(200, ["collapse"]).fit(text)
+
+    assert result.text == "start\nretry 0 failed\n[... previous line repeated 499 more times ...]\nend\n"
+    assert any("Collapsed 499" in note for note in result.notes)
+
+
+def test_drop_pattern_runs_first():
+    text = "".join(f"DEBUG noise {i}\n" for i in range(400)) + "ERROR the real problem\n"
+    budgeter = ContextBudgeter(100, ["head-tail"], drop_pattern="DEBUG")
+    result = budgeter.fit(text)
+
+    assert budgeter.strategies == ["drop", "head-tail"]
+    assert result.text == "ERROR the real problem\n"
+
+
+def test_head_tail_keeps_both_ends_within_budget():
+    text = "".join(f"line {i} with some distinct words {i * 7}\n" for i in range(2000))
+    result = ContextBudgeter(500, ["head-tail"]).fit(text)
+
+    assert result.tokens <= 500
+    assert estimate_tokens(result.text) <= 500
+    assert result.text.startswith("line 0 ")
+    assert result.text.rstrip().endswith(f"{1999 * 7}")
+
+
+def test_reserved_tokens_shrink_the_budget():
+    text = "x " * 400
+    assert not ContextBudgeter(1000).fit(text).trimmed
+    assert ContextBudgeter(1000).fit(text, reserved_tokens=950).trimmed
+
+
+def test_chunk_strategy_hands_off():
+    result = ContextBudgeter(10, ["chunk"]).fit("word " * 1000)
+    assert result.needs_chunking
+
+
+def test_unknown_strategy():
+    with pytest.raises(ValueError):
+        ContextBudgeter(10, ["shrink"])
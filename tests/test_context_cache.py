@@ -0,0 +1,90 @@
+"""Tests for reusing server-side caches of large inputs."""
+
+from Ghost_shell.core.ai_model import GeminiModel
+from Ghost_shell.core.backends import FakeBackend
+from Ghost_shell.core.config import Config
+from Ghost_shell.core.context_cache import ContextCacheRegistry
+from Ghost_shell.core.routing import ModelRouter
+
+
+class _RecordingBackend(FakeBackend):
+    """Fake backend that remembers which models were asked and cached for."""
+
+    def __init__(self):
+        super().__init__(ttft=0, delay=0, response="answer")
+        self.cached_for = []
+        self.streamed = []
+
+    def create_context_cache(self, model, content, ttl):
+        self.cached_for.append(model)
+        return super().create_context_cache(model, content, ttl)
+
+    def stream_chat(self, model, system_prompt, history, message, usage=None,
+                    thinking_budget=None, cached_context=None):
+        self.streamed.append((model, cached_context is not None))
+        return super().stream_chat(
+            model, system_prompt, history, message, usage, thinking_budget, cached_context
+        )
+
+
+def _model(tmp_path):
+    config = Config()
+    config.context_cache_min_tokens = 100
+    model = GeminiModel(config)
+    model.backend = _RecordingBackend()
+    model._router = ModelRouter([{"task": "summarize", "model": "gemini-2.5-pro"}])
+    path = tmp_path / "notes.txt"
+    path.write_text("".join(f"note {i}: something happened\n" for i in range(300)), encoding="utf-8")
+    return model, str(path)
+
+
+def _ask(model, path, task, question="what happened"):
+    # Cached contexts are only used for requests without a conversation
+    model.history = []
+    model.generate_response(question, task, input_file=path, use_cache=False, execute=False)
+
+
+def test_registry_is_keyed_by_content_not_model(tmp_path):
+    registry = ContextCacheRegistry(tmp_path / "caches.json")
+    key = ContextCacheRegistry.key("gemini", "big input")
+    assert ContextCacheRegistry.key("fake", "big input") != key
+
+    assert registry.get(key) is None
+    assert not registry.seen(key, 3600)
+    assert registry.seen(key, 3600)
+    registry.add(key, "cachedContents/1", "gemini-2.5-flash", 3600)
+    assert registry.get(key) == ("cachedContents/1", "gemini-2.5-flash")
+
+    registry.forget("cachedContents/1")
+    assert registry.get(key) is None
+
+
+def test_cache_is_created_on_the_second_sighting(tmp_path):
+    model, path = _model(tmp_path)
+    _ask(model, path, "explain")
+    _ask(model, path, "explain")
+    _ask(model, path, "explain", "anything odd?")
+
+    assert model.backend.cached_for == ["gemini-2.5-flash"]
+    assert [cached for _, cached in model.backend.streamed] == [False, True, True]
+
+
+def test_other_tasks_use_the_model_that_owns_the_cache(tmp_path):
+    model, path = _model(tmp_path)
+    _ask(model, path, "explain")
+    _ask(model, path, "explain")
+    _ask(model, path, "summarize")
+
+    assert model.backend.cached_for == ["gemini-2.5-flash"]
+    assert model.backend.streamed[-1] == ("gemini-2.5-flash", True)
+
+
+def test_pinned_model_sends_the_input_inline(tmp_path):
+    model, path = _model(tmp_path)
+    _ask(model, path, "explain")
+    _ask(model, path, "explain")
+    model.config.set_model("gemini-2.5-pro")
+    _ask(model, path, "explain")
+
+    assert model.backend.cached_for == ["gemini-2.5-flash"]
+    assert model.backend.streamed[-1] == ("gemini-2.5-pro", False)
@@ -0,0 +1,76 @@
+"""Tests for the daemon's socket protocol."""
+
+import socketserver
+import threading
+import time
+
+import pytest
+
+from Ghost_shell.core.ai_model import GeminiModel
+from Ghost_shell.core.backends import FakeBackend
+from Ghost_shell.core.config import Config
+from Ghost_shell.core.daemon import DaemonClient, GhostShellDaemon
+
+pytestmark = pytest.mark.skipif(
+    not hasattr(socketserver, "UnixStreamServer"), reason="needs Unix domain sockets"
+)
+
+
+@pytest.fixture
+def daemon(tmp_path):
+    """Run a daemon over the fake backend in a background thread."""
+    model = GeminiModel(Config())
+    model.backend = FakeBackend(ttft=0, delay=0, response="pong " * 20)
+    socket_path = str(tmp_path / "d.sock")
+    thread = threading.Thread(
+        target=GhostShellDaemon(model, socket_path).serve_forever, daemon=True
+    )
+    thread.start()
+
+    client = None
+    for _ in range(100):
+        client = DaemonClient.connect(socket_path)
+        if client is not None:
+            break
+        time.sleep(0.05)
+    assert client is not None, "daemon did not start"
+    yield model, client
+    client.shutdown()
+    thread.join(5)
+
+
+def test_streams_reply_and_usage(daemon):
+    _, client = daemon
+    usage = {}
+    text = "".join(client.stream("hello", "system", "gemini-2.5-flash", [], usage))
+
+    assert text == "pong " * 20
+    assert usage["output_tokens"] > 0
+
+
+def test_requests_are_stateless(daemon):
+    model, client = daemon
+    counts = []
+    for _ in range(3):
+        usage = {}
+        "".join(client.stream("same message " * 50, "system", "gemini-2.5-flash", None, usage))
+        counts.append(usage["prompt_tokens"])
+
+    assert len(set(counts)) == 1
+    assert model.history == []
+
+
+def test_client_history_is_sent(daemon):
+    _, client = daemon
+    history = [
+        {"role": "user", "parts": [{"text": "earlier " * 200}]},
+        {"role": "model", "parts": [{"text": "ok"}]},
+    ]
+    without, with_history = {}, {}
+    "".join(client.stream("hi", "system", "gemini-2.5-flash", [], without))
+    "".join(client.stream("hi", "system", "gemini-2.5-flash", history, with_history))
+    assert with_history["prompt_tokens"] > without["prompt_tokens"]
+
+
+def test_connect_without_daemon(tmp_path):
+    assert DaemonClient.connect(str(tmp_path / "none.sock")) is None
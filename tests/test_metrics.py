@@ -0,0 +1,79 @@
+"""Tests for --profile phase timings and the JSONL export."""
+
+import json
+
+from Ghost_shell.utils.metrics import Metrics
+
+
+def test_disabled_metrics_record_nothing():
+    metrics = Metrics()
+    with metrics.span("request") as span:
+        pass
+
+    assert span is None
+    assert metrics.span("request") is metrics.span("parse")
+    metrics.add_time("render", 1.0)
+    metrics.record_command("ls", "ok", 0.1)
+    metrics.record_stream(0.0, 0.5, 1.0, 3, 10, 5, 0.1)
+    assert (metrics.spans, metrics.values, metrics.commands) == ({}, {}, [])
+
+
+def test_spans_add_up():
+    metrics = Metrics()
+    metrics.enable()
+    for _ in range(3):
+        with metrics.span("parse"):
+            pass
+    metrics.add_time("parse", 2.0)
+
+    seconds, calls = metrics.spans["parse"]
+    assert calls == 4
+    assert seconds >= 2.0
+
+
+def test_record_stream_derives_ttft_and_throughput():
+    metrics = Metrics()
+    metrics.enable()
+    metrics.record_stream(
+        request_start=10.0,
+        first_chunk=10.25,
+        end=12.25,
+        chunks=40,
+        bytes_streamed=4000,
+        output_tokens=1000,
+        render_seconds=0.5
+    )
+
+    assert metrics.values == {
+        "ttft_ms": 250.0,
+        "chunks": 40,
+        "bytes": 4000,
+        "output_tokens": 1000,
+        "tokens_per_s": 500.0,
+    }
+    assert metrics.spans["render"] == [0.5, 1]
+
+
+def test_stream_without_chunks_has_no_ttft():
+    metrics = Metrics()
+    metrics.enable()
+    metrics.record_stream(1.0, None, 1.0, 0, 0, 0, 0.0)
+    assert metrics.values["ttft_ms"] is None
+    assert metrics.values["tokens_per_s"] is None
+
+
+def test_jsonl_lines_round_trip(tmp_path):
+    path = tmp_path / "nested" / "metrics.jsonl"
+    for run in range(2):
+        metrics = Metrics()
+        metrics.enable()
+        metrics.add_time("request", 0.125)
+        metrics.set("run", run)
+        metrics.record_command("echo hi", "ok", 0.01234)
+        metrics.write_jsonl(str(path))
+
+    records = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    assert [record["values"]["run"] for record in records] == [0, 1]
+    assert records[0]["spans"] == {"request": {"ms": 125.0, "calls": 1}}
+    assert records[0]["commands"] == [{"command": "echo hi", "status": "ok", "seconds": 0.0123}]
+    assert records[0]["total_ms"] >= 0
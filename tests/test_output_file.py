@@ -0,0 +1,107 @@
+"""Tests for streaming a response into an atomically replaced file."""
+
+import os
+import stat
+
+import pytest
+
+from Ghost_shell.utils.output_file import OutputFile
+
+
+@pytest.fixture(autouse=True)
+def umask_untouched(monkeypatch):
+    """Fail if the process-wide umask is read, which means changing it."""
+    def umask(mask):
+        raise AssertionError("os.umask() called")
+    monkeypatch.setattr(os, "umask", umask)
+
+
+def _default_mode(tmp_path):
+    """Permissions a new file gets under the current umask."""
+    probe = tmp_path / "probe"
+    os.close(os.open(probe, os.O_WRONLY | os.O_CREAT, 0o666))
+    mode = stat.S_IMODE(probe.stat().st_mode)
+    probe.unlink()
+    return mode
+
+
+def test_commit_replaces_target_only_when_finished(tmp_path):
+    target = tmp_path / "answer.md"
+    target.write_text("old", encoding="utf-8")
+
+    output = OutputFile(target)
+    output.write("new ")
+    output.write("content")
+    assert target.read_text(encoding="utf-8") == "old"
+    output.commit()
+
+    assert target.read_text(encoding="utf-8") == "new content"
+    assert [path.name for path in tmp_path.iterdir()] == ["answer.md"]
+
+
+def test_commit_keeps_existing_permissions(tmp_path):
+    target = tmp_path / "run.sh"
+    target.write_text("", encoding="utf-8")
+    os.chmod(target, 0o640)
+
+    output = OutputFile(target)
+    output.write("echo hi\n")
+    output.commit()
+
+    assert stat.S_IMODE(target.stat().st_mode) == 0o640
+
+
+def test_abort_keeps_partial_file_and_leaves_target_alone(tmp_path):
+    target = tmp_path / "answer.md"
+    target.write_text("old", encoding="utf-8")
+
+    output = OutputFile(target)
+    output.write("half an ans")
+    partial = output.abort()
+
+    assert partial == tmp_path / "answer.md.partial"
+    assert partial.read_text(encoding="utf-8") == "half an ans"
+    assert target.read_text(encoding="utf-8") == "old"
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["answer.md", "answer.md.partial"]
+
+
+def test_abort_without_output_leaves_nothing(tmp_path):
+    output = OutputFile(tmp_path / "answer.md")
+    assert output.abort() is None
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_code_only_writes_block_contents(tmp_path):
+    target = tmp_path / "setup.sh"
+    default = _default_mode(tmp_path)
+    output = OutputFile(target, code_only=True)
+    # Chunks split lines and fences anywhere
+    for chunk in ("Run this:\n\n``", "`bash\n#!/bin/sh\nec", "ho one\n```\n\nAnd:\n```sh\necho two\n```"):
+        output.write(chunk)
+    output.commit()
+
+    assert target.read_text(encoding="utf-8") == "#!/bin/sh\necho one\n\necho two\n"
+    assert output.blocks == 2
+    assert stat.S_IMODE(target.stat().st_mode) == default | (default & 0o444) >> 2
+
+
+def test_new_files_get_umask_defaults(tmp_path):
+    target = tmp_path / "answer.md"
+    default = _default_mode(tmp_path)
+    output = OutputFile(target)
+    output.write("text")
+    output.commit()
+    assert stat.S_IMODE(target.stat().st_mode) == default
+
+
+def test_code_only_without_blocks_leaves_target_alone(tmp_path):
+    target = tmp_path / "setup.sh"
+    target.write_text("keep", encoding="utf-8")
+
+    output = OutputFile(target, code_only=True)
+    output.write("No code here, just prose.\n")
+    with pytest.raises(ValueError):
+        output.commit()
+
+    assert target.read_text(encoding="utf-8") == "keep"
+    assert [path.name for path in tmp_path.iterdir()] == ["setup.sh"]
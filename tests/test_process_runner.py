@@ -0,0 +1,69 @@
+"""Tests for running generated commands with limits."""
+
+import sys
+import threading
+import time
+
+import pytest
+
+from Ghost_shell.utils.process_runner import run_command
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="uses POSIX shell commands")
+
+
+def test_streams_output_and_keeps_tail():
+    lines = []
+    result = run_command("seq 1 50", tail_lines=5, on_line=lambda stream, line: lines.append(line))
+
+    assert result.succeeded
+    assert result.returncode == 0
+    assert result.output_lines == 50
+    assert result.output_tail == ["46", "47", "48", "49", "50"]
+    assert lines == [str(i) for i in range(1, 51)]
+
+
+def test_failure_records_exit_code():
+    result = run_command("echo oops >&2; exit 3")
+    assert result.status == "failed"
+    assert result.returncode == 3
+    assert result.output_tail == ["oops"]
+
+
+def test_timeout_kills_the_whole_process_group():
+    start = time.monotonic()
+    # The background sleep keeps the pipe open unless its group is killed
+    result = run_command("sleep 30 & sleep 30", timeout=0.5)
+
+    assert result.status == "timeout"
+    assert time.monotonic() - start < 10
+
+
+def test_idle_timeout_stops_silent_commands():
+    result = run_command("echo start; sleep 30", idle_timeout=0.5)
+    assert result.status == "idle-timeout"
+    assert result.output_tail == ["start"]
+
+
+def test_output_resets_the_idle_timer():
+    result = run_command("for i in 1 2 3 4; do echo $i; sleep 0.2; done", idle_timeout=0.6)
+    assert result.succeeded
+    assert result.output_lines == 4
+
+
+def test_stop_event_interrupts():
+    stop = threading.Event()
+    threading.Timer(0.3, stop.set).start()
+    result = run_command("sleep 30", stop_event=stop)
+    assert result.status == "interrupted"
+
+
+def test_non_interactive_commands_get_no_stdin():
+    result = run_command("cat")
+    assert result.succeeded
+    assert result.output_lines == 0
+
+
+def test_missing_command_fails():
+    result = run_command("definitely-not-a-command-ghostshell")
+    assert result.status == "failed"
+    assert result.returncode == 127
@@ -0,0 +1,33 @@
+"""Tests for streaming deadlines and retries."""
+
+import pytest
+
+from Ghost_shell.core.backends import FakeBackend
+from Ghost_shell.core.resilience import ResilientBackend, StreamTimeout
+
+
+def _stream(backend, **limits):
+    resilient = ResilientBackend(backend, **limits)
+    return "".join(resilient.stream_chat("gemini-2.5-flash", "system", [], "hello"))
+
+
+def test_chunk_timeout_does_not_cap_time_to_first_chunk():
+    backend = FakeBackend(ttft=0.4, delay=0, response="slow start")
+    assert _stream(backend, chunk_timeout=0.1, retries=0) == "slow start"
+
+
+def test_first_chunk_timeout_retries_then_fails():
+    backend = FakeBackend(ttft=0.5, delay=0, response="too slow")
+    with pytest.raises(StreamTimeout):
+        _stream(backend, first_chunk_timeout=0.1, retries=1)
+
+
+def test_chunk_timeout_catches_a_stalled_stream():
+    backend = FakeBackend(ttft=0, delay=0.5, chunk_chars=2, response="abcdef")
+    with pytest.raises(StreamTimeout):
+        _stream(backend, chunk_timeout=0.1)
+
+
+def test_transient_failures_are_retried():
+    backend = FakeBackend(ttft=0, delay=0, response="ok", failures=1)
+    assert _stream(backend, retries=1) == "ok"
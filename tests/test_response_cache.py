@@ -0,0 +1,40 @@
+"""Tests for the on-disk response cache."""
+
+from Ghost_shell.utils.response_cache import ResponseCache
+
+
+def test_key_depends_on_every_input():
+    base = ("gemini-2.5-flash", "code", "system", "prompt", ["file"])
+    key = ResponseCache.make_key(*base)
+
+    assert ResponseCache.make_key(*base) == key
+    for i in range(4):
+        changed = list(base)
+        changed[i] = changed[i] + "!"
+        assert ResponseCache.make_key(*changed) != key
+    assert ResponseCache.make_key(*base[:4], ["other file"]) != key
+    assert ResponseCache.make_key(*base[:4]) != key
+
+
+def test_key_field_boundaries_cannot_shift():
+    assert ResponseCache.make_key("m", "t", "s", "ab", ["c"]) != ResponseCache.make_key(
+        "m", "t", "s", "a", ["bc"]
+    )
+
+
+def test_put_and_get(tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache.db"))
+    key = ResponseCache.make_key("m", "t", "s", "p")
+
+    assert cache.get(key) is None
+    cache.put(key, "answer")
+    assert cache.get(key) == "answer"
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
+
+
+def test_expired_entries_are_misses(tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache.db"), ttl=-1)
+    cache.put("key", "answer")
+    assert cache.get("key") is None
@@ -0,0 +1,59 @@
+"""Tests for choosing a model per request."""
+
+import json
+
+import pytest
+
+from Ghost_shell.core.routing import DEFAULT_MODEL, ModelRouter, Route
+
+
+def test_default_rules():
+    router = ModelRouter()
+    short = router.route("command", 500)
+    assert (short.model, short.thinking_budget, short.rule) == (
+        "gemini-2.5-flash-lite", 0, "short-command"
+    )
+    assert router.route("command", 5_000).model == DEFAULT_MODEL
+    assert router.route("code", 60_000).model == "gemini-2.5-pro"
+    assert router.route("explain", 60_000).model == DEFAULT_MODEL
+    assert router.route("explain", 100, latency_target=2).rule == "low-latency"
+    assert router.route("explain", 100, latency_target=30).rule == "default"
+
+
+def test_heavy_route_gets_a_longer_first_chunk_budget():
+    heavy = ModelRouter().route("summarize", 80_000)
+    assert heavy.first_chunk_timeout >= 120
+    assert heavy.first_chunk_deadline(30) == heavy.first_chunk_timeout
+    # No configured limit stays unlimited rather than shrinking to the route's budget
+    assert heavy.first_chunk_deadline(0) is None
+    assert heavy.first_chunk_deadline(600) == 600
+    assert Route("gemini-2.5-flash").first_chunk_deadline(30) == 30
+
+
+def test_first_match_wins():
+    router = ModelRouter([
+        {"task": "code", "model": "a"},
+        {"task": ["code", "explain"], "model": "b", "first_chunk_timeout": 90},
+    ], default_model="c")
+    assert router.route("code", 10) == Route("a", None, "rule 1")
+    assert router.route("explain", 10) == Route("b", None, "rule 2", 90)
+    assert router.route("default", 10) == Route("c")
+
+
+def test_routing_file(tmp_path):
+    path = tmp_path / "routing.json"
+    path.write_text(json.dumps({
+        "default": "gemini-2.5-flash-lite",
+        "rules": [{"name": "big", "min_tokens": 1000, "model": "gemini-2.5-pro"}],
+    }), encoding="utf-8")
+    router = ModelRouter.from_file(path)
+    assert router.route("code", 2000).rule == "big"
+    assert router.route("code", 10).model == "gemini-2.5-flash-lite"
+
+
+def test_missing_and_invalid_files(tmp_path):
+    assert ModelRouter.from_file(tmp_path / "missing.json").rules is not None
+    with pytest.raises(FileNotFoundError):
+        ModelRouter.from_file(tmp_path / "missing.json", required=True)
+    with pytest.raises(ValueError):
+        ModelRouter([{"task": "code"}])
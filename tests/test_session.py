@@ -0,0 +1,74 @@
+"""Tests for named sessions and their compaction."""
+
+from Ghost_shell.core.session import Session, SessionStore
+
+
+def _session(exchanges, size=400):
+    session = Session("work")
+    for i in range(exchanges):
+        session.add_exchange(f"question {i} " + "q" * size, f"answer {i} " + "a" * size)
+    return session
+
+
+def test_under_budget_is_left_alone():
+    session = _session(3)
+    assert session.compact(10_000) == 0
+    assert len(session.turns) == 6
+
+
+def test_compaction_folds_oldest_exchanges_into_summary():
+    session = _session(10)
+    seen = []
+
+    def summarize(text):
+        seen.append(text)
+        return "they asked ten questions"
+
+    folded = session.compact(budget=1000, summarize=summarize)
+
+    assert folded > 0
+    assert len(session.turns) == 2 * (10 - folded)
+    assert session.turns[-1][1].startswith("answer 9 ")
+    assert session.summary == "they asked ten questions"
+    assert "QUESTION 0" in seen[0].upper()
+    assert session.tokens() <= 1000
+
+
+def test_failed_summary_still_drops_turns():
+    session = _session(10)
+
+    def summarize(text):
+        raise RuntimeError("API down")
+
+    assert session.compact(budget=1000, summarize=summarize) > 0
+    assert session.summary == ""
+    assert session.tokens() <= 1000
+
+
+def test_newest_exchange_is_always_kept():
+    session = _session(2, size=4000)
+    session.compact(budget=100)
+    assert [role for role, _ in session.turns] == ["user", "model"]
+    assert session.turns[0][1].startswith("question 1 ")
+
+
+def test_history_starts_with_summary():
+    session = Session("work", summary="earlier context")
+    session.add_exchange("hi", "hello")
+    history = session.history()
+
+    assert [item["role"] for item in history] == ["user", "model", "user", "model"]
+    assert "earlier context" in history[0]["parts"][0]["text"]
+
+
+def test_store_round_trip(tmp_path):
+    store = SessionStore(tmp_path / "sessions")
+    session = _session(2, size=10)
+    session.summary = "so far"
+    store.save(session)
+
+    loaded = store.load("work")
+    assert (loaded.summary, loaded.turns) == ("so far", session.turns)
+    assert store.names() == ["work"]
+    assert store.delete("work")
+    assert store.load("work").turns == []
@@ -0,0 +1,63 @@
+"""Tests for bounded reading of piped input."""
+
+import io
+import os
+import sys
+
+import pytest
+
+from Ghost_shell.utils.stdin_reader import StdinReader
+
+
+def test_empty_stream_is_eof():
+    assert StdinReader(io.BytesIO(b"")).at_eof()
+
+
+def test_peeking_loses_no_input():
+    reader = StdinReader(io.BytesIO(b"abc\ndef"))
+    assert not reader.at_eof()
+    assert reader.read_head() == "abc\ndef"
+
+
+def test_peeked_newline_is_its_own_line():
+    reader = StdinReader(io.BytesIO(b"\nnext\n"))
+    assert not reader.at_eof()
+    assert list(reader.lines()) == ["\n", "next\n"]
+
+
+def test_max_bytes_truncates():
+    reader = StdinReader(io.BytesIO(b"0123456789\n" * 10), max_bytes=25)
+    text = reader.read_head()
+    assert len(text) == 25
+    assert reader.truncated
+
+
+def test_long_lines_are_split():
+    reader = StdinReader(io.BytesIO(b"x" * 10), line_bytes=4)
+    assert list(reader.lines()) == ["xxxx", "xxxx", "xx"]
+
+
+def test_tail_keeps_the_end():
+    data = "".join(f"line {i}\n" for i in range(1000)).encode()
+    assert StdinReader(io.BytesIO(data)).read_tail(20).endswith("line 999\n")
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="select() needs sockets on Windows")
+def test_ready_does_not_block_on_a_silent_pipe():
+    read_fd, write_fd = os.pipe()
+    with os.fdopen(read_fd, "rb") as stream:
+        reader = StdinReader(stream)
+        assert not reader.ready(0.05)
+        os.write(write_fd, b"late\n")
+        assert reader.ready(0.05)
+        os.close(write_fd)
+        assert reader.read_head() == "late\n"
+
+
+def test_closed_pipe_is_ready_and_empty():
+    read_fd, write_fd = os.pipe()
+    os.close(write_fd)
+    with os.fdopen(read_fd, "rb") as stream:
+        reader = StdinReader(stream)
+        assert reader.ready(0.05)
+        assert reader.at_eof()
@@ -0,0 +1,75 @@
+"""Tests for the local prompt similarity index."""
+
+from Ghost_shell.utils.logger import CommandLogger
+from Ghost_shell.utils.suggestions import SuggestionIndex, normalize_prompt
+
+
+def _gram_counts_match(index):
+    """Check suggestion_gram_counts against the posting lists it summarizes."""
+    conn = index.conn
+    actual = dict(conn.execute(
+        "SELECT gram, COUNT(*) FROM suggestion_grams GROUP BY gram"
+    ).fetchall())
+    stored = dict(conn.execute("SELECT gram, prompts FROM suggestion_gram_counts").fetchall())
+    return actual == stored
+
+
+def test_normalize_prompt():
+    assert normalize_prompt("  Show DISK usage, please!  ") == "show disk usage please"
+
+
+def test_lookup_finds_similar_prompt(tmp_path):
+    index = SuggestionIndex(tmp_path / "history.db")
+    index.add("show disk usage of my home directory", "du -sh ~")
+    index.add("list running docker containers", "docker ps")
+
+    matches = index.lookup("show the disk usage of my home dir")
+    assert [match.commands for match in matches] == [["du -sh ~"]]
+    assert 0.6 <= matches[0].score < 1.0
+    assert index.lookup("compile the kernel") == []
+
+
+def test_exact_prompt_scores_one(tmp_path):
+    index = SuggestionIndex(tmp_path / "history.db")
+    index.add("Free up disk space", "docker system prune")
+    assert index.lookup("free up disk space")[0].score == 1.0
+
+
+def test_lookup_without_database(tmp_path):
+    assert SuggestionIndex(tmp_path / "missing.db").lookup("anything") == []
+
+
+def test_new_answer_replaces_earlier_commands(tmp_path):
+    index = SuggestionIndex(tmp_path / "history.db")
+    index.begin_answer("clean the build")
+    index.add("clean the build", "rm -rf build")
+    index.add("clean the build", "mkdir build")
+    assert index.lookup("clean the build")[0].commands == ["rm -rf build", "mkdir build"]
+
+    index.begin_answer("clean the build")
+    index.add("clean the build", "make clean")
+    assert index.lookup("clean the build")[0].commands == ["make clean"]
+
+
+def test_compact_drops_oldest_prompts_and_fixes_counts(tmp_path):
+    index = SuggestionIndex(tmp_path / "history.db")
+    for i in range(20):
+        index.add(f"print number {i} twice", f"echo {i} {i}")
+
+    assert index.compact() == 2
+    assert index.conn.execute("SELECT COUNT(*) FROM suggestions").fetchone()[0] == 18
+    assert _gram_counts_match(index)
+    assert index.lookup("print number 0 twice", min_score=1.0) == []
+    assert index.lookup("print number 19 twice")[0].commands == ["echo 19 19"]
+
+
+def test_history_compaction_shrinks_suggestions(tmp_path):
+    logger = CommandLogger(tmp_path / "history.db", max_bytes=10 ** 9)
+    for i in range(30):
+        logger.log_command(f"echo {i}", prompt=f"say the number {i}")
+
+    logger.max_bytes = 0
+    logger.compact()
+
+    assert logger.suggestions.conn.execute("SELECT COUNT(*) FROM suggestions").fetchone()[0] == 27
+    assert _gram_counts_match(logger.suggestions)